@@ -25,9 +25,88 @@ You are encouraged to write your own algorithms in order to make them do what
 you really want them to do.
 """
 
-import random
+from concurrent.futures import as_completed
+from functools import partial
 
 from . import tools
+from .rng import get_rng
+
+
+def _save(checkpoint, gen, population, halloffame, logbook, **objects):
+    checkpoint.save(gen, population, halloffame=halloffame, logbook=logbook, **objects)
+
+
+def _restore(checkpoint, halloffame, **objects):
+    """Load the latest snapshot of *checkpoint* and restore the hall of fame
+    and the *objects* in place. Returns the population, the logbook and the
+    generation to start from."""
+    state = checkpoint.load()
+    if halloffame is not None and state["halloffame"] is not None:
+        halloffame.__dict__.update(state["halloffame"].__dict__)
+    for name, obj in objects.items():
+        if obj is not None and state.get(name) is not None:
+            obj.__dict__.update(state[name].__dict__)
+    return state["population"], state["logbook"], state["generation"] + 1
+
+
+def _map_record(toolbox):
+    """Return the fields recorded by the map of *toolbox* for its last call,
+    when it provides a :meth:`record` method taking no argument and returning
+    a dictionary."""
+    map_ = getattr(toolbox.map, "func", toolbox.map)
+    record = getattr(map_, "record", None)
+    return record() if record is not None else {}
+
+
+def _compile(toolbox, stats, population):
+    record = _map_record(toolbox)
+    if stats is not None:
+        record.update(stats.compile(population))
+    return record
+
+
+def _log(logbook, toolbox, stats, verbose, gen, nevals, population):
+    record = _compile(toolbox, stats, population)
+    logbook.record(gen=gen, nevals=nevals, **record)
+    if verbose:
+        print(logbook.stream)
+
+
+def _pipeline(population, toolbox, start_gen, ngen, produce, replace, executor,
+              stats, halloffame, verbose, checkpoint, logbook):
+    """Generational loop submitting each offspring to the *executor* as soon
+    as *produce* yields it. The previous generation is logged while the
+    offspring are evaluated. The hall of fame is updated with the offspring
+    in the order they were produced, as without executor, so that ties are
+    broken deterministically."""
+    deferred = None
+    for gen in range(start_gen, ngen + 1):
+        offspring, futures = [], {}
+        for ind in produce(population):
+            offspring.append(ind)
+            if not ind.fitness.valid:
+                futures[executor.submit(toolbox.evaluate, ind)] = ind
+
+        if deferred is not None:
+            deferred()
+
+        for future in as_completed(futures):
+            futures[future].fitness.values = future.result()
+        if halloffame is not None:
+            halloffame.update(offspring)
+
+        population[:] = replace(population, offspring)
+
+        deferred = partial(_log, logbook, toolbox, stats, verbose, gen, len(futures),
+                           list(population))
+        if checkpoint is not None and gen % checkpoint.freq == 0:
+            deferred()
+            deferred = None
+            _save(checkpoint, gen, population, halloffame, logbook)
+
+    if deferred is not None:
+        deferred()
+    return population, logbook
 
 
 def varAnd(population, toolbox, cxpb, mutpb):
@@ -65,25 +144,45 @@ def varAnd(population, toolbox, cxpb, mutpb):
     according to the given probabilities. Both probabilities should be in
     :math:`[0, 1]`.
     """
+    rng = get_rng()
     offspring = [toolbox.clone(ind) for ind in population]
 
     # Apply crossover and mutation on the offspring
     for i in range(1, len(offspring), 2):
-        if random.random() < cxpb:
+        if rng.random() < cxpb:
             offspring[i - 1], offspring[i] = toolbox.mate(offspring[i - 1],
                                                           offspring[i])
             del offspring[i - 1].fitness.values, offspring[i].fitness.values
 
     for i in range(len(offspring)):
-        if random.random() < mutpb:
+        if rng.random() < mutpb:
             offspring[i], = toolbox.mutate(offspring[i])
             del offspring[i].fitness.values
 
     return offspring
 
 
+def _varAnd(population, toolbox, cxpb, mutpb):
+    """Generator version of :func:`varAnd` yielding each offspring as soon as
+    it is mutated. The random numbers are drawn in the same order as
+    :func:`varAnd`, all the crossovers being made before the mutations."""
+    rng = get_rng()
+    offspring = [toolbox.clone(ind) for ind in population]
+    for i in range(1, len(offspring), 2):
+        if rng.random() < cxpb:
+            offspring[i - 1], offspring[i] = toolbox.mate(offspring[i - 1],
+                                                          offspring[i])
+            del offspring[i - 1].fitness.values, offspring[i].fitness.values
+
+    for i in range(len(offspring)):
+        if rng.random() < mutpb:
+            offspring[i], = toolbox.mutate(offspring[i])
+            del offspring[i].fitness.values
+        yield offspring[i]
+
+
 def eaSimple(population, toolbox, cxpb, mutpb, ngen, stats=None,
-             halloffame=None, verbose=__debug__):
+             halloffame=None, verbose=__debug__, checkpoint=None, executor=None):
     """This algorithm reproduce the simplest evolutionary algorithm as
     presented in chapter 7 of [Back2000]_.
 
@@ -98,6 +197,18 @@ def eaSimple(population, toolbox, cxpb, mutpb, ngen, stats=None,
     :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
                        contain the best individuals, optional.
     :param verbose: Whether or not to log the statistics.
+    :param checkpoint: A :class:`~deap.tools.Checkpoint` object to save the
+                       state of the evolution every :attr:`freq` generations
+                       and to resume from its latest snapshot, optional.
+    :param executor: A :class:`concurrent.futures.Executor` to evaluate the
+                     offspring in a pipeline, optional. Each offspring is
+                     submitted as soon as it is produced and the statistics
+                     of a generation are logged while the next one is
+                     evaluated. The :meth:`toolbox.map` is then only used for
+                     the initial population. The random numbers are drawn
+                     and the hall of fame is updated in the same order as
+                     without executor, a seeded run gives the same results
+                     when the evaluation does not draw random numbers.
     :returns: The final population
     :returns: A class:`~deap.tools.Logbook` with the statistics of the
               evolution
@@ -107,7 +218,10 @@ def eaSimple(population, toolbox, cxpb, mutpb, ngen, stats=None,
     :class:`~deap.tools.Logbook` with the statistics of the evolution. The
     logbook will contain the generation number, the number of evaluations for
     each generation and the statistics if a :class:`~deap.tools.Statistics` is
-    given as argument. The *cxpb* and *mutpb* arguments are passed to the
+    given as argument. When the :meth:`toolbox.map` has a :meth:`record`
+    method, like :class:`~deap.parallel.TimeoutMap`, the dictionary it
+    returns after each call is also recorded. The *cxpb* and *mutpb*
+    arguments are passed to the
     :func:`varAnd` function. The pseudocode goes as follow ::
 
         evaluate(population)
@@ -143,24 +257,41 @@ def eaSimple(population, toolbox, cxpb, mutpb, ngen, stats=None,
        Basic Algorithms and Operators", 2000.
     """
     logbook = tools.Logbook()
-    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+    logbook.header = ['gen', 'nevals'] + list(_map_record(toolbox)) + (stats.fields if stats else [])
 
-    # Evaluate the individuals with an invalid fitness
-    invalid_ind = [ind for ind in population if not ind.fitness.valid]
-    fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-    for ind, fit in zip(invalid_ind, fitnesses):
-        ind.fitness.values = fit
+    start_gen = 1
+    if checkpoint is not None and checkpoint.latest() is not None:
+        # Resume the evolution from the latest snapshot
+        population[:], logbook, start_gen = _restore(checkpoint, halloffame)
+    else:
+        # Evaluate the individuals with an invalid fitness
+        invalid_ind = [ind for ind in population if not ind.fitness.valid]
+        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
 
-    if halloffame is not None:
-        halloffame.update(population)
+        if halloffame is not None:
+            halloffame.update(population)
 
-    record = stats.compile(population) if stats else {}
-    logbook.record(gen=0, nevals=len(invalid_ind), **record)
-    if verbose:
-        print(logbook.stream)
+        record = _compile(toolbox, stats, population)
+        logbook.record(gen=0, nevals=len(invalid_ind), **record)
+        if verbose:
+            print(logbook.stream)
+
+        if checkpoint is not None:
+            _save(checkpoint, 0, population, halloffame, logbook)
+
+    if executor is not None:
+        def produce(population):
+            offspring = toolbox.select(population, len(population))
+            return _varAnd(offspring, toolbox, cxpb, mutpb)
+
+        return _pipeline(population, toolbox, start_gen, ngen, produce,
+                         lambda population, offspring: offspring, executor,
+                         stats, halloffame, verbose, checkpoint, logbook)
 
     # Begin the generational process
-    for gen in range(1, ngen + 1):
+    for gen in range(start_gen, ngen + 1):
         # Select the next generation individuals
         offspring = toolbox.select(population, len(population))
 
@@ -181,11 +312,14 @@ def eaSimple(population, toolbox, cxpb, mutpb, ngen, stats=None,
         population[:] = offspring
 
         # Append the current generation statistics to the logbook
-        record = stats.compile(population) if stats else {}
+        record = _compile(toolbox, stats, population)
         logbook.record(gen=gen, nevals=len(invalid_ind), **record)
         if verbose:
             print(logbook.stream)
 
+        if checkpoint is not None and gen % checkpoint.freq == 0:
+            _save(checkpoint, gen, population, halloffame, logbook)
+
     return population, logbook
 
 
@@ -226,27 +360,32 @@ def varOr(population, toolbox, lambda_, cxpb, mutpb):
         "The sum of the crossover and mutation probabilities must be smaller "
         "or equal to 1.0.")
 
-    offspring = []
+    return list(_varOr(population, toolbox, lambda_, cxpb, mutpb))
+
+
+def _varOr(population, toolbox, lambda_, cxpb, mutpb):
+    """Generator version of :func:`varOr` yielding each offspring as soon as
+    it is produced."""
+    rng = get_rng()
     for _ in range(lambda_):
-        op_choice = random.random()
+        op_choice = rng.random()
         if op_choice < cxpb:            # Apply crossover
-            ind1, ind2 = [toolbox.clone(i) for i in random.sample(population, 2)]
+            ind1, ind2 = [toolbox.clone(i) for i in rng.sample(population, 2)]
             ind1, ind2 = toolbox.mate(ind1, ind2)
             del ind1.fitness.values
-            offspring.append(ind1)
+            yield ind1
         elif op_choice < cxpb + mutpb:  # Apply mutation
-            ind = toolbox.clone(random.choice(population))
+            ind = toolbox.clone(rng.choice(population))
             ind, = toolbox.mutate(ind)
             del ind.fitness.values
-            offspring.append(ind)
+            yield ind
         else:                           # Apply reproduction
-            offspring.append(random.choice(population))
-
-    return offspring
+            yield rng.choice(population)
 
 
 def eaMuPlusLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
-                   stats=None, halloffame=None, verbose=__debug__):
+                   stats=None, halloffame=None, verbose=__debug__,
+                   checkpoint=None, executor=None):
     r"""This is the :math:`(\mu + \lambda)` evolutionary algorithm.
 
     :param population: A list of individuals.
@@ -262,6 +401,18 @@ def eaMuPlusLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
     :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
                        contain the best individuals, optional.
     :param verbose: Whether or not to log the statistics.
+    :param checkpoint: A :class:`~deap.tools.Checkpoint` object to save the
+                       state of the evolution every :attr:`freq` generations
+                       and to resume from its latest snapshot, optional.
+    :param executor: A :class:`concurrent.futures.Executor` to evaluate the
+                     offspring in a pipeline, optional. Each offspring is
+                     submitted as soon as it is produced and the statistics
+                     of a generation are logged while the next one is
+                     evaluated. The :meth:`toolbox.map` is then only used for
+                     the initial population. The random numbers are drawn
+                     and the hall of fame is updated in the same order as
+                     without executor, a seeded run gives the same results
+                     when the evaluation does not draw random numbers.
     :returns: The final population
     :returns: A class:`~deap.tools.Logbook` with the statistics of the
               evolution.
@@ -271,7 +422,10 @@ def eaMuPlusLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
     :class:`~deap.tools.Logbook` with the statistics of the evolution. The
     logbook will contain the generation number, the number of evaluations for
     each generation and the statistics if a :class:`~deap.tools.Statistics` is
-    given as argument. The *cxpb* and *mutpb* arguments are passed to the
+    given as argument. When the :meth:`toolbox.map` has a :meth:`record`
+    method, like :class:`~deap.parallel.TimeoutMap`, the dictionary it
+    returns after each call is also recorded. The *cxpb* and *mutpb*
+    arguments are passed to the
     :func:`varOr` function. The pseudocode goes as follow ::
 
         evaluate(population)
@@ -294,24 +448,41 @@ def eaMuPlusLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
     variation.
     """
     logbook = tools.Logbook()
-    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+    logbook.header = ['gen', 'nevals'] + list(_map_record(toolbox)) + (stats.fields if stats else [])
 
-    # Evaluate the individuals with an invalid fitness
-    invalid_ind = [ind for ind in population if not ind.fitness.valid]
-    fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-    for ind, fit in zip(invalid_ind, fitnesses):
-        ind.fitness.values = fit
+    start_gen = 1
+    if checkpoint is not None and checkpoint.latest() is not None:
+        # Resume the evolution from the latest snapshot
+        population[:], logbook, start_gen = _restore(checkpoint, halloffame)
+    else:
+        # Evaluate the individuals with an invalid fitness
+        invalid_ind = [ind for ind in population if not ind.fitness.valid]
+        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
 
-    if halloffame is not None:
-        halloffame.update(population)
+        if halloffame is not None:
+            halloffame.update(population)
 
-    record = stats.compile(population) if stats is not None else {}
-    logbook.record(gen=0, nevals=len(invalid_ind), **record)
-    if verbose:
-        print(logbook.stream)
+        record = _compile(toolbox, stats, population)
+        logbook.record(gen=0, nevals=len(invalid_ind), **record)
+        if verbose:
+            print(logbook.stream)
+
+        if checkpoint is not None:
+            _save(checkpoint, 0, population, halloffame, logbook)
+
+    if executor is not None:
+        assert (cxpb + mutpb) <= 1.0, (
+            "The sum of the crossover and mutation probabilities must be smaller "
+            "or equal to 1.0.")
+        return _pipeline(population, toolbox, start_gen, ngen,
+                         partial(_varOr, toolbox=toolbox, lambda_=lambda_, cxpb=cxpb, mutpb=mutpb),
+                         lambda population, offspring: toolbox.select(population + offspring, mu),
+                         executor, stats, halloffame, verbose, checkpoint, logbook)
 
     # Begin the generational process
-    for gen in range(1, ngen + 1):
+    for gen in range(start_gen, ngen + 1):
         # Vary the population
         offspring = varOr(population, toolbox, lambda_, cxpb, mutpb)
 
@@ -329,16 +500,20 @@ def eaMuPlusLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
         population[:] = toolbox.select(population + offspring, mu)
 
         # Update the statistics with the new population
-        record = stats.compile(population) if stats is not None else {}
+        record = _compile(toolbox, stats, population)
         logbook.record(gen=gen, nevals=len(invalid_ind), **record)
         if verbose:
             print(logbook.stream)
 
+        if checkpoint is not None and gen % checkpoint.freq == 0:
+            _save(checkpoint, gen, population, halloffame, logbook)
+
     return population, logbook
 
 
 def eaMuCommaLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
-                    stats=None, halloffame=None, verbose=__debug__):
+                    stats=None, halloffame=None, verbose=__debug__,
+                    checkpoint=None):
     r"""This is the :math:`(\mu~,~\lambda)` evolutionary algorithm.
 
     :param population: A list of individuals.
@@ -354,6 +529,9 @@ def eaMuCommaLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
     :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
                        contain the best individuals, optional.
     :param verbose: Whether or not to log the statistics.
+    :param checkpoint: A :class:`~deap.tools.Checkpoint` object to save the
+                       state of the evolution every :attr:`freq` generations
+                       and to resume from its latest snapshot, optional.
     :returns: The final population
     :returns: A class:`~deap.tools.Logbook` with the statistics of the
               evolution
@@ -363,7 +541,10 @@ def eaMuCommaLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
     :class:`~deap.tools.Logbook` with the statistics of the evolution. The
     logbook will contain the generation number, the number of evaluations for
     each generation and the statistics if a :class:`~deap.tools.Statistics` is
-    given as argument. The *cxpb* and *mutpb* arguments are passed to the
+    given as argument. When the :meth:`toolbox.map` has a :meth:`record`
+    method, like :class:`~deap.parallel.TimeoutMap`, the dictionary it
+    returns after each call is also recorded. The *cxpb* and *mutpb*
+    arguments are passed to the
     :func:`varOr` function. The pseudocode goes as follow ::
 
         evaluate(population)
@@ -394,25 +575,33 @@ def eaMuCommaLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
     """
     assert lambda_ >= mu, "lambda must be greater or equal to mu."
 
-    # Evaluate the individuals with an invalid fitness
-    invalid_ind = [ind for ind in population if not ind.fitness.valid]
-    fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-    for ind, fit in zip(invalid_ind, fitnesses):
-        ind.fitness.values = fit
+    logbook = tools.Logbook()
+    logbook.header = ['gen', 'nevals'] + list(_map_record(toolbox)) + (stats.fields if stats else [])
 
-    if halloffame is not None:
-        halloffame.update(population)
+    start_gen = 1
+    if checkpoint is not None and checkpoint.latest() is not None:
+        # Resume the evolution from the latest snapshot
+        population[:], logbook, start_gen = _restore(checkpoint, halloffame)
+    else:
+        # Evaluate the individuals with an invalid fitness
+        invalid_ind = [ind for ind in population if not ind.fitness.valid]
+        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
 
-    logbook = tools.Logbook()
-    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+        if halloffame is not None:
+            halloffame.update(population)
 
-    record = stats.compile(population) if stats is not None else {}
-    logbook.record(gen=0, nevals=len(invalid_ind), **record)
-    if verbose:
-        print(logbook.stream)
+        record = _compile(toolbox, stats, population)
+        logbook.record(gen=0, nevals=len(invalid_ind), **record)
+        if verbose:
+            print(logbook.stream)
+
+        if checkpoint is not None:
+            _save(checkpoint, 0, population, halloffame, logbook)
 
     # Begin the generational process
-    for gen in range(1, ngen + 1):
+    for gen in range(start_gen, ngen + 1):
         # Vary the population
         offspring = varOr(population, toolbox, lambda_, cxpb, mutpb)
 
@@ -430,15 +619,18 @@ def eaMuCommaLambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
         population[:] = toolbox.select(offspring, mu)
 
         # Update the statistics with the new population
-        record = stats.compile(population) if stats is not None else {}
+        record = _compile(toolbox, stats, population)
         logbook.record(gen=gen, nevals=len(invalid_ind), **record)
         if verbose:
             print(logbook.stream)
+
+        if checkpoint is not None and gen % checkpoint.freq == 0:
+            _save(checkpoint, gen, population, halloffame, logbook)
     return population, logbook
 
 
 def eaGenerateUpdate(toolbox, ngen, halloffame=None, stats=None,
-                     verbose=__debug__):
+                     verbose=__debug__, checkpoint=None):
     """This is algorithm implements the ask-tell model proposed in
     [Colette2010]_, where ask is called `generate` and tell is called `update`.
 
@@ -450,6 +642,9 @@ def eaGenerateUpdate(toolbox, ngen, halloffame=None, stats=None,
     :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
                        contain the best individuals, optional.
     :param verbose: Whether or not to log the statistics.
+    :param checkpoint: A :class:`~deap.tools.Checkpoint` object to save the
+                       state of the evolution every :attr:`freq` generations
+                       and to resume from its latest snapshot, optional.
     :returns: The final population
     :returns: A class:`~deap.tools.Logbook` with the statistics of the
               evolution
@@ -460,7 +655,10 @@ def eaGenerateUpdate(toolbox, ngen, halloffame=None, stats=None,
     :class:`~deap.tools.Logbook` with the statistics of the evolution. The
     logbook will contain the generation number, the number of evaluations for
     each generation and the statistics if a :class:`~deap.tools.Statistics` is
-    given as argument. The pseudocode goes as follow ::
+    given as argument. When the :meth:`toolbox.map` has a :meth:`record`
+    method, like :class:`~deap.parallel.TimeoutMap`, the dictionary it
+    returns after each call is also recorded. The pseudocode goes as
+    follow ::
 
         for g in range(ngen):
             population = toolbox.generate()
@@ -479,9 +677,19 @@ def eaGenerateUpdate(toolbox, ngen, halloffame=None, stats=None,
 
     """
     logbook = tools.Logbook()
-    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+    logbook.header = ['gen', 'nevals'] + list(_map_record(toolbox)) + (stats.fields if stats else [])
+
+    # The strategy is the object owning the registered update method
+    strategy = getattr(getattr(toolbox, "update", None), "func", None)
+    strategy = getattr(strategy, "__self__", None)
 
-    for gen in range(ngen):
+    start_gen = 0
+    population = None
+    if checkpoint is not None and checkpoint.latest() is not None:
+        # Resume the evolution from the latest snapshot
+        population, logbook, start_gen = _restore(checkpoint, halloffame, strategy=strategy)
+
+    for gen in range(start_gen, ngen):
         # Generate a new population
         population = toolbox.generate()
         # Evaluate the individuals
@@ -495,9 +703,12 @@ def eaGenerateUpdate(toolbox, ngen, halloffame=None, stats=None,
         # Update the strategy with the evaluated individuals
         toolbox.update(population)
 
-        record = stats.compile(population) if stats is not None else {}
+        record = _compile(toolbox, stats, population)
         logbook.record(gen=gen, nevals=len(population), **record)
         if verbose:
             print(logbook.stream)
 
+        if checkpoint is not None and gen % checkpoint.freq == 0:
+            _save(checkpoint, gen, population, halloffame, logbook, strategy=strategy)
+
     return population, logbook
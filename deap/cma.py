@@ -21,13 +21,131 @@
 Evolution Strategy.
 """
 import copy
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
 from math import sqrt, log, exp
 from itertools import cycle
+import multiprocessing
+import random
+import time
 import warnings
 
 import numpy
 
 from . import tools
+from .rng import get_numpy_rng, using_rng
+
+
+def _recombination_weights(mu, rweights):
+    """Return the normalized recombination weights of the *mu* best
+    individuals."""
+    if rweights == "superlinear":
+        weights = log(mu + 0.5) - numpy.log(numpy.arange(1, mu + 1))
+    elif rweights == "linear":
+        weights = mu + 0.5 - numpy.arange(1, mu + 1)
+    elif rweights == "equal":
+        weights = numpy.ones(mu)
+    else:
+        raise RuntimeError("Unknown weights : %s" % rweights)
+    return weights / sum(weights)
+
+
+def _standard_normal(rng, lambda_, dim, sampling):
+    """Return *lambda_* standard normal vectors drawn according to the
+    *sampling* mode."""
+    if sampling == "independent":
+        return rng.standard_normal((lambda_, dim))
+    elif sampling == "mirrored":
+        # Pairs of opposite vectors, the last one is alone if lambda_ is odd
+        arz = rng.standard_normal(((lambda_ + 1) // 2, dim))
+        return numpy.stack((arz, -arz), axis=1).reshape(-1, dim)[:lambda_]
+    elif sampling == "orthogonal":
+        # Orthogonal directions by blocks of dim vectors, keeping the chi
+        # distributed lengths of the original vectors
+        arz = rng.standard_normal((lambda_, dim))
+        for start in range(0, lambda_, dim):
+            block = arz[start:start + dim]
+            q, r = numpy.linalg.qr(block.T)
+            # Fixing the signs makes q uniformly distributed
+            q *= numpy.sign(numpy.diag(r))
+            block[:] = q.T * numpy.linalg.norm(block, axis=1)[:, numpy.newaxis]
+        return arz
+    raise RuntimeError("Unknown sampling : %s" % sampling)
+
+
+def _pairwise_selection(population, generated):
+    """Move the worse individual of each mirrored pair of the sorted
+    *population* after all the others, the pairs being consecutive in the
+    *generated* individuals."""
+    pairs = dict((id(ind), i // 2) for i, ind in enumerate(generated))
+    seen = set()
+    better, worse = list(), list()
+    for ind in population:
+        pair = pairs.get(id(ind))
+        if pair is not None and pair in seen:
+            worse.append(ind)
+        else:
+            better.append(ind)
+            seen.add(pair)
+    population[:] = better + worse
+
+
+def _rank_one_update(invCholesky, A, alpha, beta, v):
+    r"""Batched rank-one update, in place and in :math:`O(N^2)` per factor,
+    of the stacked factors *A* and of their inverses *invCholesky* so that
+    each covariance matrix :math:`C = A A^T` becomes
+    :math:`\alpha C + \beta v v^T` ([Igel2007]_), with the rows of *v* and
+    the vector of weights *alpha*. The updated factors are square roots of
+    the covariance matrices, but not triangular."""
+    # The factors are updated by blocks that fit in the cache
+    size = max(1, 65536 // v.shape[1] ** 2)
+    for start in range(0, len(v), size):
+        block = slice(start, start + size)
+        iC, A_, v_, alpha_ = invCholesky[block], A[block], v[block], alpha[block]
+        w = numpy.matmul(iC, v_[:, :, numpy.newaxis])[:, :, 0]
+
+        # Under this threshold, the update is mostly noise
+        update = numpy.abs(w).max(axis=1) > 1e-20
+        w_inv = numpy.matmul(w[:, numpy.newaxis, :], iC)[:, 0, :]
+        norm_w2 = numpy.where(update, numpy.sum(w ** 2, axis=1), 1.0)
+        a = numpy.where(update, numpy.sqrt(alpha_), 1.0)
+        root = numpy.sqrt(1 + beta / alpha_ * norm_w2)
+        b = numpy.where(update, a / norm_w2 * (root - 1), 0.0)
+        c = b / (a ** 2 + a * b * norm_w2)
+
+        A_ *= a[:, numpy.newaxis, numpy.newaxis]
+        A_ += (b[:, numpy.newaxis] * v_)[:, :, numpy.newaxis] * w[:, numpy.newaxis, :]
+        iC /= a[:, numpy.newaxis, numpy.newaxis]
+        iC -= (c[:, numpy.newaxis] * w)[:, :, numpy.newaxis] * w_inv[:, numpy.newaxis, :]
+
+    return invCholesky, A
+
+
+def _individuals(ind_init, samples):
+    """Initialize an individual from each row of the *samples* matrix. When
+    *ind_init* is a subclass of :class:`numpy.ndarray`, the individuals are
+    views of the rows and the matrix is not copied. Return the individuals
+    and whether or not they are views."""
+    if isinstance(ind_init, type) and issubclass(ind_init, numpy.ndarray):
+        population = list(samples.view(ind_init))
+        for ind in population:
+            ind.__init__()
+        return population, True
+    return [ind_init(a) for a in samples], False
+
+
+def _matrix(population, samples):
+    """Return the matrix of the *population*. When the individuals are views
+    of the rows of the last generated samples, given as a tuple of the
+    matrix and the generated individuals, the rows are gathered from the
+    matrix directly."""
+    if samples is not None:
+        matrix, generated = samples
+        index = dict((id(ind), i) for i, ind in enumerate(generated))
+        rows = [index.get(id(ind)) for ind in population]
+        if None not in rows and all(generated[r] is ind for r, ind in zip(rows, population)):
+            return matrix[rows]
+    return numpy.array(population)
 
 
 class Strategy(object):
@@ -79,10 +197,38 @@ class Strategy(object):
     |                | mueff) / ((N + 2)^2 +     | update.                    |
     |                | mueff)``                  |                            |
     +----------------+---------------------------+----------------------------+
+    | ``eigen_       | ``max(1, int(1 / (10 * N  | Number of generations      |
+    | interval``     | * (ccov1 + ccovmu))))``   | between two                |
+    |                |                           | eigendecompositions of the |
+    |                |                           | covariance matrix.         |
+    +----------------+---------------------------+----------------------------+
+    | ``sampling``   | ``"independent"``         | Sampling of the population,|
+    |                |                           | can be ``"independent"``,  |
+    |                |                           | ``"mirrored"`` or          |
+    |                |                           | ``"orthogonal"``.          |
+    +----------------+---------------------------+----------------------------+
+
+    The eigendecomposition of the covariance matrix costs :math:`O(N^3)`. As
+    in the reference implementation of CMA-ES, it is only computed every
+    ``eigen_interval`` generations, which is 1 in small dimensions, and the
+    distribution is sampled with the last decomposition in between. The
+    attributes :attr:`eigen_count` and :attr:`eigen_time` hold the number of
+    decompositions and the total time spent computing them in seconds.
+
+    With the ``"mirrored"`` sampling, the individuals are generated by pairs
+    of opposite steps and only the better individual of each pair is used
+    in the recombination ([Auger2011]_), therefore ``mu`` must be at most
+    ``lambda_ / 2``. With the ``"orthogonal"`` sampling, the steps are
+    orthogonal by blocks of ``N`` with the lengths of independent normal
+    vectors.
 
     .. [Hansen2001] Hansen and Ostermeier, 2001. Completely Derandomized
        Self-Adaptation in Evolution Strategies. *Evolutionary Computation*
 
+    .. [Auger2011] Auger, Brockhoff and Hansen, 2011. Mirrored Sampling in
+       Evolution Strategies with Weighted Recombination. *Genetic and
+       Evolutionary Computation Conference*
+
     """
     def __init__(self, centroid, sigma, **kargs):
         self.params = kargs
@@ -98,18 +244,31 @@ class Strategy(object):
                                       + 1. / (21. * self.dim ** 2))
 
         self.C = self.params.get("cmatrix", numpy.identity(self.dim))
-        self.diagD, self.B = numpy.linalg.eigh(self.C)
+        self.eigen_count = 0
+        self.eigen_time = 0.0
+        self.update_count = 0
+        self._samples = None
+        self._mirrored = None
+        self._decompose()
 
+        self.lambda_ = self.params.get("lambda_", int(4 + 3 * log(self.dim)))
+        self.computeParams(self.params)
+
+    def _decompose(self):
+        """Compute the eigendecomposition of the covariance matrix."""
+        start = time.perf_counter()
+        self.diagD, self.B = numpy.linalg.eigh(self.C)
         indx = numpy.argsort(self.diagD)
+
+        self.cond = self.diagD[indx[-1]] / self.diagD[indx[0]]
+
         self.diagD = self.diagD[indx] ** 0.5
         self.B = self.B[:, indx]
         self.BD = self.B * self.diagD
 
-        self.cond = self.diagD[indx[-1]] / self.diagD[indx[0]]
-
-        self.lambda_ = self.params.get("lambda_", int(4 + 3 * log(self.dim)))
-        self.update_count = 0
-        self.computeParams(self.params)
+        self.eigen_update = self.update_count
+        self.eigen_count += 1
+        self.eigen_time += time.perf_counter() - start
 
     def generate(self, ind_init):
         r"""Generate a population of :math:`\lambda` individuals of type
@@ -118,10 +277,20 @@ class Strategy(object):
         :param ind_init: A function object that is able to initialize an
                          individual from a list.
         :returns: A list of individuals.
+
+        When *ind_init* is a subclass of :class:`numpy.ndarray`, for example
+        a class created with :mod:`~deap.creator` from :class:`numpy.ndarray`,
+        the individuals are views of the rows of a single sample matrix and
+        :meth:`update` reads the matrix directly instead of converting the
+        individuals.
         """
-        arz = numpy.random.standard_normal((self.lambda_, self.dim))
+        rng = get_numpy_rng()
+        arz = _standard_normal(rng, self.lambda_, self.dim, self.sampling)
         arz = self.centroid + self.sigma * numpy.dot(arz, self.BD.T)
-        return [ind_init(a) for a in arz]
+        population, views = _individuals(ind_init, arz)
+        self._samples = (arz, tuple(population)) if views else None
+        self._mirrored = tuple(population) if self.sampling == "mirrored" else None
+        return population
 
     def update(self, population):
         """Update the current covariance matrix strategy from the
@@ -131,9 +300,15 @@ class Strategy(object):
                            parameters.
         """
         population.sort(key=lambda ind: ind.fitness, reverse=True)
+        if self._mirrored is not None:
+            _pairwise_selection(population, self._mirrored)
+            self._mirrored = None
+
+        arx = _matrix(population[0:self.mu], self._samples)
+        self._samples = None
 
         old_centroid = self.centroid
-        self.centroid = numpy.dot(self.weights, population[0:self.mu])
+        self.centroid = numpy.dot(self.weights, arx)
 
         c_diff = self.centroid - old_centroid
 
@@ -154,7 +329,7 @@ class Strategy(object):
             * c_diff
 
         # Update covariance matrix
-        artmp = population[0:self.mu] - old_centroid
+        artmp = arx - old_centroid
         self.C = (1 - self.ccov1 - self.ccovmu + (1 - hsig)
                   * self.ccov1 * self.cc * (2 - self.cc)) * self.C \
             + self.ccov1 * numpy.outer(self.pc, self.pc) \
@@ -164,14 +339,8 @@ class Strategy(object):
         self.sigma *= numpy.exp((numpy.linalg.norm(self.ps) / self.chiN - 1.)
                                 * self.cs / self.damps)
 
-        self.diagD, self.B = numpy.linalg.eigh(self.C)
-        indx = numpy.argsort(self.diagD)
-
-        self.cond = self.diagD[indx[-1]] / self.diagD[indx[0]]
-
-        self.diagD = self.diagD[indx] ** 0.5
-        self.B = self.B[:, indx]
-        self.BD = self.B * self.diagD
+        if self.update_count - self.eigen_update >= self.eigen_interval:
+            self._decompose()
 
     def computeParams(self, params):
         r"""Computes the parameters depending on :math:`\lambda`. It needs to
@@ -180,18 +349,7 @@ class Strategy(object):
         :param params: A dictionary of the manually set parameters.
         """
         self.mu = params.get("mu", int(self.lambda_ / 2))
-        rweights = params.get("weights", "superlinear")
-        if rweights == "superlinear":
-            self.weights = log(self.mu + 0.5) - \
-                numpy.log(numpy.arange(1, self.mu + 1))
-        elif rweights == "linear":
-            self.weights = self.mu + 0.5 - numpy.arange(1, self.mu + 1)
-        elif rweights == "equal":
-            self.weights = numpy.ones(self.mu)
-        else:
-            raise RuntimeError("Unknown weights : %s" % rweights)
-
-        self.weights /= sum(self.weights)
+        self.weights = _recombination_weights(self.mu, params.get("weights", "superlinear"))
         self.mueff = 1. / sum(self.weights ** 2)
 
         self.cc = params.get("ccum", 4. / (self.dim + 4.))
@@ -206,6 +364,643 @@ class Strategy(object):
         self.damps = 1. + 2. * max(0, sqrt((self.mueff - 1.)
                                            / (self.dim + 1.)) - 1.) + self.cs
         self.damps = params.get("damps", self.damps)
+        self.eigen_interval = params.get("eigen_interval", max(1, int(
+            1. / (10. * self.dim * (self.ccov1 + self.ccovmu)))))
+        self.sampling = params.get("sampling", "independent")
+        if self.sampling == "mirrored" and self.mu > self.lambda_ // 2:
+            raise ValueError("The mirrored sampling requires mu <= lambda_ / 2, got "
+                             "mu = %d and lambda_ = %d." % (self.mu, self.lambda_))
+
+
+class StrategySeparable(Strategy):
+    r"""
+    A CMA-ES strategy adapting a diagonal covariance matrix, the
+    separable CMA-ES ([Ros2008]_). The covariance matrix is stored as the
+    vector of its :math:`N` variances, which makes the memory and the
+    sampling costs linear in :math:`N` and the strategy usable on very
+    large problems. In exchange, the distribution can only learn the
+    scaling of the variables, not their correlations.
+
+    :param centroid: An iterable object that indicates where to start the
+                     evolution.
+    :param sigma: The initial standard deviation of the distribution.
+    :param parameter: One or more parameter to pass to the strategy as
+                      described in the following table, optional.
+
+    The parameters are the ones of :class:`Strategy` except that
+    ``cmatrix`` is replaced by the vector ``cdiag`` of the initial variances,
+    that defaults to ones, and that the default learning rates ``ccov1`` and
+    ``ccovmu`` are multiplied by :math:`(N + 2) / 3` as the diagonal has
+    fewer degrees of freedom to learn. There is no eigendecomposition, the
+    ``eigen_interval`` parameter is ignored.
+
+    .. [Ros2008] Ros and Hansen, 2008. A Simple Modification in CMA-ES
+       Achieving Linear Time and Space Complexity. *Parallel Problem Solving
+       from Nature*
+    """
+    def __init__(self, centroid, sigma, **kargs):
+        self.params = kargs
+
+        # Create a centroid as a numpy array
+        self.centroid = numpy.array(centroid, dtype=float)
+
+        self.dim = len(self.centroid)
+        self.sigma = sigma
+        self.pc = numpy.zeros(self.dim)
+        self.ps = numpy.zeros(self.dim)
+        self.chiN = sqrt(self.dim) * (1 - 1. / (4. * self.dim)
+                                      + 1. / (21. * self.dim ** 2))
+
+        self.C = numpy.array(self.params.get("cdiag", numpy.ones(self.dim)), dtype=float)
+        self.diagD = numpy.sqrt(self.C)
+        self.cond = self.C.max() / self.C.min()
+        self.update_count = 0
+        self._samples = None
+        self._mirrored = None
+
+        self.lambda_ = self.params.get("lambda_", int(4 + 3 * log(self.dim)))
+        self.computeParams(self.params)
+
+    def generate(self, ind_init):
+        r"""Generate a population of :math:`\lambda` individuals of type
+        *ind_init* from the current strategy.
+
+        :param ind_init: A function object that is able to initialize an
+                         individual from a list.
+        :returns: A list of individuals.
+
+        When *ind_init* is a subclass of :class:`numpy.ndarray`, for example
+        a class created with :mod:`~deap.creator` from :class:`numpy.ndarray`,
+        the individuals are views of the rows of a single sample matrix and
+        :meth:`update` reads the matrix directly instead of converting the
+        individuals.
+        """
+        rng = get_numpy_rng()
+        arz = _standard_normal(rng, self.lambda_, self.dim, self.sampling)
+        arz = self.centroid + self.sigma * self.diagD * arz
+        population, views = _individuals(ind_init, arz)
+        self._samples = (arz, tuple(population)) if views else None
+        self._mirrored = tuple(population) if self.sampling == "mirrored" else None
+        return population
+
+    def update(self, population):
+        """Update the current covariance matrix strategy from the
+        *population*.
+
+        :param population: A list of individuals from which to update the
+                           parameters.
+        """
+        population.sort(key=lambda ind: ind.fitness, reverse=True)
+        if self._mirrored is not None:
+            _pairwise_selection(population, self._mirrored)
+            self._mirrored = None
+
+        arx = _matrix(population[0:self.mu], self._samples)
+        self._samples = None
+
+        old_centroid = self.centroid
+        self.centroid = numpy.dot(self.weights, arx)
+
+        c_diff = self.centroid - old_centroid
+
+        # Cumulation : update evolution path
+        self.ps = (1 - self.cs) * self.ps \
+            + sqrt(self.cs * (2 - self.cs) * self.mueff) / self.sigma \
+            * c_diff / self.diagD
+
+        hsig = float((numpy.linalg.norm(self.ps)
+                      / sqrt(1. - (1. - self.cs) ** (2. * (self.update_count + 1.))) / self.chiN
+                      < (1.4 + 2. / (self.dim + 1.))))
+
+        self.update_count += 1
+
+        self.pc = (1 - self.cc) * self.pc + hsig \
+            * sqrt(self.cc * (2 - self.cc) * self.mueff) / self.sigma \
+            * c_diff
+
+        # Update the diagonal of the covariance matrix
+        artmp = (arx - old_centroid) / self.sigma
+        self.C = (1 - self.ccov1 - self.ccovmu + (1 - hsig)
+                  * self.ccov1 * self.cc * (2 - self.cc)) * self.C \
+            + self.ccov1 * self.pc ** 2 \
+            + self.ccovmu * numpy.dot(self.weights, artmp ** 2)
+
+        self.sigma *= numpy.exp((numpy.linalg.norm(self.ps) / self.chiN - 1.)
+                                * self.cs / self.damps)
+
+        self.diagD = numpy.sqrt(self.C)
+        self.cond = self.C.max() / self.C.min()
+
+    def computeParams(self, params):
+        r"""Computes the parameters depending on :math:`\lambda`. It needs to
+        be called again if :math:`\lambda` changes during evolution.
+
+        :param params: A dictionary of the manually set parameters.
+        """
+        Strategy.computeParams(self, params)
+        # The diagonal is used directly, there is no eigendecomposition
+        del self.eigen_interval
+        scale = (self.dim + 2.) / 3.
+        self.ccov1 = params.get("ccov1", min(1., scale * 2. / ((self.dim + 1.3) ** 2
+                                                            + self.mueff)))
+        self.ccovmu = params.get("ccovmu", scale * 2. * (self.mueff - 2. + 1. / self.mueff)
+                                 / ((self.dim + 2.) ** 2 + self.mueff))
+        self.ccovmu = min(1 - self.ccov1, self.ccovmu)
+
+
+class StrategyBatch(object):
+    r"""
+    :math:`K` independent CMA-ES strategies ([Hansen2001]_) of the same
+    dimension and parameters advanced together. The states of the
+    instances are stacked in arrays, the centroids in a :math:`K \times N`
+    matrix and the covariance matrices in a :math:`K \times N \times N`
+    array, so that a generation of all the instances costs a few vectorized
+    operations and a batched eigendecomposition instead of :math:`K` calls
+    to :class:`Strategy`. This is efficient for many small problems, where
+    the Python overhead dominates the linear algebra.
+
+    :param centroids: A :math:`K \times N` matrix of the starting points of
+                      the instances.
+    :param sigma: The initial standard deviation of the distributions, a
+                  scalar or a vector of :math:`K` values.
+    :param parameter: One or more parameter to pass to the strategy as
+                      described in the following table, optional.
+
+    The parameters are the ones of :class:`Strategy`, except ``cmatrix`` and
+    ``sampling``, and the ones of the termination conditions of
+    :class:`Restarts`. After each update, every instance checks the
+    termination conditions of [Hansen2009]_ and is stopped as soon as one
+    of them is met. Stopped instances are frozen and skipped by the
+    following updates. The attributes :attr:`stopped`, :attr:`conditions`
+    and :attr:`ngen` hold the state, the list of conditions met and the
+    number of generations of each instance, while :attr:`best` and
+    :attr:`best_values` hold the best sample of each instance and its
+    weighted value.
+
+    The instances can either be driven with lists of individuals through
+    :meth:`generate` and :meth:`update`, or with arrays through
+    :meth:`sample` and :meth:`tell` when the objective function is itself
+    vectorized ::
+
+        >>> strategy = StrategyBatch(numpy.ones((1000, 10)), 0.5) # doctest: +SKIP
+        >>> while not strategy.stopped.all():                     # doctest: +SKIP
+        ...     X = strategy.sample()
+        ...     strategy.tell(numpy.sum(X ** 2, axis=-1))
+    """
+    def __init__(self, centroids, sigma, **kargs):
+        self.params = kargs
+
+        self.centroids = numpy.array(centroids, dtype=float)
+        self.ninstances, self.dim = self.centroids.shape
+        self.sigma = numpy.array(numpy.broadcast_to(sigma, (self.ninstances,)), dtype=float)
+        self.pc = numpy.zeros((self.ninstances, self.dim))
+        self.ps = numpy.zeros((self.ninstances, self.dim))
+        self.chiN = sqrt(self.dim) * (1 - 1. / (4. * self.dim)
+                                      + 1. / (21. * self.dim ** 2))
+
+        self.C = numpy.tile(numpy.identity(self.dim), (self.ninstances, 1, 1))
+        self.diagD = numpy.ones((self.ninstances, self.dim))
+        self.B = numpy.array(self.C)
+        self.BD = numpy.array(self.C)
+        self.cond = numpy.ones(self.ninstances)
+        self.eigen_count = 0
+        self.eigen_time = 0.0
+        self.update_count = 0
+        self.eigen_update = 0
+        self._samples = None
+        self._generated = None
+        self._views = False
+
+        self.lambda_ = self.params.get("lambda_", int(4 + 3 * log(self.dim)))
+        self.computeParams(self.params)
+        if self.sampling != "independent":
+            raise RuntimeError("StrategyBatch only supports the independent sampling.")
+
+        # Termination state of the instances, see _Termination
+        self.sigma0 = numpy.array(self.sigma)
+        self.maxiter = self.params.get("maxiter", 100 + 50 * (self.dim + 3) ** 2 / sqrt(self.lambda_))
+        self.tolfun = self.params.get("tolfun", 1e-12)
+        self.tolx = self.params.get("tolx", 1e-12)
+        self.tolupsigma = self.params.get("tolupsigma", 1e20)
+        self.tolconditioncov = self.params.get("tolconditioncov", 1e14)
+        self.stopped = numpy.zeros(self.ninstances, dtype=bool)
+        self.conditions = [list() for _ in range(self.ninstances)]
+        self.ngen = numpy.zeros(self.ninstances, dtype=int)
+        self.best = numpy.array(self.centroids)
+        self.best_values = numpy.full(self.ninstances, -numpy.inf)
+        self._history = numpy.full((self.ninstances, 10 + int(numpy.ceil(30. * self.dim / self.lambda_))),
+                                   numpy.nan)
+        self._equalfunvals = numpy.zeros((self.ninstances, self.dim), dtype=bool)
+        # Ring buffers of the best and median values of the generations, long
+        # enough for the largest stagnation window before maxiter
+        nrows = int(numpy.ceil(0.2 * min(self.maxiter, 1e5) + 120 + 30. * self.dim / self.lambda_))
+        self._bests = numpy.full((nrows, self.ninstances), numpy.nan)
+        self._medians = numpy.full((nrows, self.ninstances), numpy.nan)
+
+    def computeParams(self, params):
+        r"""Computes the parameters depending on :math:`\lambda`, see
+        :meth:`Strategy.computeParams`.
+
+        :param params: A dictionary of the manually set parameters.
+        """
+        # The instances share the parameters of a single Strategy
+        Strategy.computeParams(self, params)
+
+    def _decompose(self, active):
+        """Compute the eigendecompositions of the covariance matrices of the
+        *active* instances."""
+        start = time.perf_counter()
+        # The eigenvalues are in ascending order
+        diagD, B = numpy.linalg.eigh(self.C[active])
+        self.cond[active] = diagD[:, -1] / diagD[:, 0]
+        diagD = diagD ** 0.5
+        self.diagD[active] = diagD
+        self.B[active] = B
+        self.BD[active] = B * diagD[:, numpy.newaxis, :]
+
+        self.eigen_update = self.update_count
+        self.eigen_count += 1
+        self.eigen_time += time.perf_counter() - start
+
+    def sample(self):
+        r"""Sample :math:`\lambda` points from the distribution of each
+        instance.
+
+        :returns: A :math:`K \times \lambda \times N` array. The samples of
+                  the stopped instances are ignored by :meth:`tell`.
+        """
+        rng = get_numpy_rng()
+        arz = rng.standard_normal((self.ninstances, self.lambda_, self.dim))
+        self._samples = self.centroids[:, numpy.newaxis, :] \
+            + self.sigma[:, numpy.newaxis, numpy.newaxis] * numpy.matmul(arz, self.BD.transpose(0, 2, 1))
+        return self._samples
+
+    def generate(self, ind_init):
+        r"""Generate a population of :math:`\lambda` individuals of type
+        *ind_init* for each instance, the populations of the stopped
+        instances being empty.
+
+        :param ind_init: A function object that is able to initialize an
+                         individual from a list.
+        :returns: A list of :math:`K` lists of individuals.
+
+        When *ind_init* is a subclass of :class:`numpy.ndarray`, the
+        individuals are views of the rows of the samples, otherwise
+        :meth:`update` reads the individuals back, so that they can be
+        repaired in place before the update.
+        """
+        samples = self.sample()
+        populations = list()
+        for k in range(self.ninstances):
+            if self.stopped[k]:
+                populations.append(list())
+            else:
+                population, self._views = _individuals(ind_init, samples[k])
+                populations.append(population)
+        self._generated = [dict((id(ind), i) for i, ind in enumerate(population))
+                           for population in populations]
+        return populations
+
+    def update(self, populations):
+        """Update the instances from the evaluated *populations* returned by
+        :meth:`generate`. The populations of the stopped instances are
+        ignored.
+
+        :param populations: A list of :math:`K` lists of individuals from
+                            which to update the parameters.
+        """
+        if self._generated is None:
+            raise RuntimeError("The populations must be generated before updating the strategy.")
+        wvalues = numpy.full((self.ninstances, self.lambda_), -numpy.inf)
+        for k, (population, rows) in enumerate(zip(populations, self._generated)):
+            if not self.stopped[k]:
+                for ind in population:
+                    wvalues[k, rows[id(ind)]] = ind.fitness.wvalues[0]
+                    if not self._views:
+                        # The individual may have been modified after its generation
+                        self._samples[k, rows[id(ind)]] = ind
+        self._generated = None
+        self._update(wvalues)
+
+    def tell(self, values, weight=-1.0):
+        r"""Update the instances from the *values* of the samples returned
+        by :meth:`sample`. The values of the stopped instances are ignored.
+
+        :param values: A :math:`K \times \lambda` array of the objective
+                       values of the samples.
+        :param weight: The weight of the objective as in
+                       :attr:`~deap.base.Fitness.weights`, optional. By
+                       default the objective is minimized.
+        """
+        if self._samples is None:
+            raise RuntimeError("The points must be sampled before updating the strategy.")
+        self._update(weight * numpy.asarray(values, dtype=float))
+
+    def _update(self, wvalues):
+        active = numpy.flatnonzero(~self.stopped)
+        if len(active) == 0:
+            return
+        wvalues = wvalues[active]
+        order = numpy.argsort(-wvalues, axis=1, kind="stable")
+        wvalues = numpy.take_along_axis(wvalues, order, axis=1)
+        samples = self._samples[active]
+        self._samples = None
+
+        better = wvalues[:, 0] > self.best_values[active]
+        self.best_values[active[better]] = wvalues[better, 0]
+        self.best[active[better]] = samples[better, order[better, 0]]
+
+        arx = numpy.take_along_axis(samples, order[:, :self.mu, numpy.newaxis], axis=1)
+        sigma = self.sigma[active, numpy.newaxis]
+        B, diagD = self.B[active], self.diagD[active]
+
+        old_centroids = self.centroids[active]
+        centroids = numpy.einsum("i,kij->kj", self.weights, arx)
+        c_diff = centroids - old_centroids
+
+        # Cumulation : update evolution paths
+        invsqrtC_diff = numpy.einsum("kij,kj->ki", B, numpy.einsum("kji,kj->ki", B, c_diff) / diagD)
+        ps = (1 - self.cs) * self.ps[active] \
+            + sqrt(self.cs * (2 - self.cs) * self.mueff) / sigma * invsqrtC_diff
+
+        hsig = (numpy.linalg.norm(ps, axis=1)
+                / sqrt(1. - (1. - self.cs) ** (2. * (self.update_count + 1.))) / self.chiN
+                < (1.4 + 2. / (self.dim + 1.))).astype(float)
+
+        self.update_count += 1
+
+        pc = (1 - self.cc) * self.pc[active] + hsig[:, numpy.newaxis] \
+            * sqrt(self.cc * (2 - self.cc) * self.mueff) / sigma * c_diff
+
+        # Update covariance matrices
+        artmp = (arx - old_centroids[:, numpy.newaxis, :]) / sigma[:, :, numpy.newaxis]
+        C = (1 - self.ccov1 - self.ccovmu + (1 - hsig)
+             * self.ccov1 * self.cc * (2 - self.cc))[:, numpy.newaxis, numpy.newaxis] * self.C[active] \
+            + self.ccov1 * pc[:, :, numpy.newaxis] * pc[:, numpy.newaxis, :] \
+            + self.ccovmu * numpy.einsum("i,kij,kil->kjl", self.weights, artmp, artmp)
+
+        self.centroids[active] = centroids
+        self.ps[active] = ps
+        self.pc[active] = pc
+        self.C[active] = C
+        self.sigma[active] *= numpy.exp((numpy.linalg.norm(ps, axis=1) / self.chiN - 1.)
+                                        * self.cs / self.damps)
+
+        if self.update_count - self.eigen_update >= self.eigen_interval:
+            self._decompose(active)
+
+        self._terminate(active, wvalues)
+
+    def _terminate(self, active, wvalues):
+        """Check the termination conditions of the *active* instances from
+        their sorted weighted values and stop the ones meeting any."""
+        self.ngen[active] += 1
+        ngen = self.update_count
+        lambda_, dim = self.lambda_, self.dim
+        sigma = self.sigma[active]
+        centroids = self.centroids[active]
+        diagC = numpy.sqrt(numpy.diagonal(self.C[active], axis1=1, axis2=2))
+        history = self._history[active]
+        history[:, (ngen - 1) % history.shape[1]] = wvalues[:, 0]
+        self._history[active] = history
+        equalfunvals = self._equalfunvals[active]
+        equalfunvals[:, (ngen - 1) % dim] = wvalues[:, 0] == wvalues[:, int(numpy.ceil(0.1 + lambda_ / 4.)) - 1]
+        self._equalfunvals[active] = equalfunvals
+        nrows = len(self._bests)
+        self._bests[(ngen - 1) % nrows, active] = wvalues[:, 0]
+        self._medians[(ngen - 1) % nrows, active] = wvalues[:, lambda_ // 2]
+
+        met = dict()
+        met["MaxIter"] = self.ngen[active] >= self.maxiter
+        if ngen >= history.shape[1]:
+            met["TolFun"] = numpy.maximum(history.max(axis=1), wvalues.max(axis=1)) \
+                - numpy.minimum(history.min(axis=1), wvalues.min(axis=1)) < self.tolfun
+        if ngen > dim:
+            met["EqualFunVals"] = equalfunvals.sum(axis=1) > dim / 3.
+        met["TolX"] = numpy.all(sigma[:, numpy.newaxis] * numpy.abs(self.pc[active]) < self.tolx, axis=1) \
+            & numpy.all(sigma[:, numpy.newaxis] * diagC < self.tolx, axis=1)
+        met["TolUpSigma"] = sigma / self.sigma0[active] > self.tolupsigma * self.diagD[active, -1]
+        stagnation = int(numpy.ceil(0.2 * ngen + 120 + 30. * dim / lambda_))
+        if stagnation < ngen and stagnation <= nrows:
+            # The last 20 generations and the 20 first of the window
+            last = numpy.arange(ngen - 20, ngen) % nrows
+            first = numpy.arange(ngen - stagnation, ngen - stagnation + 20) % nrows
+            median = lambda values, rows: numpy.median(values[numpy.ix_(rows, active)], axis=0)
+            met["Stagnation"] = (median(self._bests, last) <= median(self._bests, first)) \
+                & (median(self._medians, last) <= median(self._medians, first))
+        met["ConditionCov"] = self.cond[active] > self.tolconditioncov
+        i = ngen % dim
+        met["NoEffectAxis"] = numpy.all(centroids == centroids + 0.1 * (sigma * self.diagD[active, i])[:, numpy.newaxis]
+                                        * self.B[active, :, i], axis=1)
+        met["NoEffectCoor"] = numpy.any(centroids == centroids + 0.2 * sigma[:, numpy.newaxis] * diagC, axis=1)
+
+        for name, mask in met.items():
+            for k in active[mask]:
+                self.conditions[k].append(name)
+        self.stopped[active] = [len(self.conditions[k]) > 0 for k in active]
+
+
+class StrategyLimitedMemory(object):
+    r"""
+    A limited memory CMA-ES strategy ([Loshchilov2017]_). The Cholesky factor
+    of the covariance matrix is never stored, it is represented implicitly by
+    the :math:`m` last evolution paths saved every ``nsteps`` generations
+    and by :math:`m` auxiliary vectors. Sampling the population costs
+    :math:`O(\lambda N m)` and the strategy needs :math:`O(N m)` memory,
+    which makes it usable on problems with tens of thousands of variables
+    while still learning the main correlations between them. The step-size
+    is adapted with the population success rule, which compares the
+    fitness of the current population with the one of the previous
+    population.
+
+    :param centroid: An iterable object that indicates where to start the
+                     evolution.
+    :param sigma: The initial standard deviation of the distribution.
+    :param parameter: One or more parameter to pass to the strategy as
+                      described in the following table, optional.
+
+    +----------------+---------------------------+----------------------------+
+    | Parameter      | Default                   | Details                    |
+    +================+===========================+============================+
+    | ``lambda_``    | ``int(4 + 3 * log(N))``   | Number of children to      |
+    |                |                           | produce at each generation,|
+    |                |                           | ``N`` is the individual's  |
+    |                |                           | size (integer).            |
+    +----------------+---------------------------+----------------------------+
+    | ``mu``         | ``int(lambda_ / 2)``      | The number of parents to   |
+    |                |                           | keep from the              |
+    |                |                           | lambda children (integer). |
+    +----------------+---------------------------+----------------------------+
+    | ``weights``    | ``"superlinear"``         | Decrease speed, can be     |
+    |                |                           | ``"superlinear"``,         |
+    |                |                           | ``"linear"`` or            |
+    |                |                           | ``"equal"``.               |
+    +----------------+---------------------------+----------------------------+
+    | ``m``          | ``4 + int(3 * log(N))``   | Number of direction        |
+    |                |                           | vectors kept in memory.    |
+    +----------------+---------------------------+----------------------------+
+    | ``nsteps``     | ``max(1, int(1 / ccum))`` | Number of generations      |
+    |                |                           | between two saved          |
+    |                |                           | directions.                |
+    +----------------+---------------------------+----------------------------+
+    | ``ccum``       | ``0.5 / sqrt(N)``         | Cumulation constant for    |
+    |                |                           | the evolution path.        |
+    +----------------+---------------------------+----------------------------+
+    | ``ccov1``      | ``0.1 / log(N + 1)``      | Learning rate of a saved   |
+    |                |                           | direction.                 |
+    +----------------+---------------------------+----------------------------+
+    | ``cs``         | ``0.3``                   | Cumulation constant for    |
+    |                |                           | step-size.                 |
+    +----------------+---------------------------+----------------------------+
+    | ``damps``      | ``1``                     | Damping for step-size.     |
+    +----------------+---------------------------+----------------------------+
+    | ``ztarget``    | ``0.25``                  | Target success rate of the |
+    |                |                           | population success rule.   |
+    +----------------+---------------------------+----------------------------+
+
+    .. [Loshchilov2017] Loshchilov, 2017. LM-CMA: An Alternative to L-BFGS
+       for Large-Scale Black Box Optimization. *Evolutionary Computation*
+    """
+    def __init__(self, centroid, sigma, **kargs):
+        self.params = kargs
+
+        # Create a centroid as a numpy array
+        self.centroid = numpy.array(centroid, dtype=float)
+
+        self.dim = len(self.centroid)
+        self.sigma = sigma
+        self.pc = numpy.zeros(self.dim)
+        self.s = 0.0
+
+        self.m = self.params.get("m", 4 + int(3 * log(self.dim)))
+        # Saved evolution paths and the auxiliary vectors of the implicit
+        # Cholesky factor, only the first nvectors rows are in use
+        self.P = numpy.zeros((self.m, self.dim))
+        self.V = numpy.zeros((self.m, self.dim))
+        self.b = numpy.zeros(self.m)
+        self.d = numpy.zeros(self.m)
+        self.nvectors = 0
+
+        self.update_count = 0
+        self._samples = None
+        self.prev_fitness = None
+
+        self.lambda_ = self.params.get("lambda_", int(4 + 3 * log(self.dim)))
+        self.computeParams(self.params)
+
+    def _Az(self, arz):
+        """Multiply the rows of *arz* by the implicit Cholesky factor."""
+        k = self.nvectors
+        if k == 0:
+            return arz
+        a = sqrt(1. - self.ccov1)
+        coeffs = self.b[:k] * a ** numpy.arange(k - 1, -1, -1)
+        return a ** k * arz + numpy.dot(numpy.dot(arz, self.V[:k].T) * coeffs, self.P[:k])
+
+    def _invAz(self, x, k):
+        """Multiply *x* by the inverse of the Cholesky factor built from the
+        first *k* directions."""
+        a = sqrt(1. - self.ccov1)
+        for j in range(k):
+            x = x / a - self.d[j] * numpy.dot(self.V[j], x) * self.V[j]
+        return x
+
+    def _factorize(self, start):
+        """Recompute the auxiliary vectors from the direction *start*."""
+        a = sqrt(1. - self.ccov1)
+        ratio = self.ccov1 / (1. - self.ccov1)
+        for j in range(start, self.nvectors):
+            self.V[j] = self._invAz(self.P[j], j)
+            norm2 = numpy.dot(self.V[j], self.V[j])
+            root = sqrt(1. + ratio * norm2)
+            self.b[j] = a / norm2 * (root - 1.)
+            self.d[j] = 1. / (a * norm2) * (1. - 1. / root)
+
+    def generate(self, ind_init):
+        r"""Generate a population of :math:`\lambda` individuals of type
+        *ind_init* from the current strategy.
+
+        :param ind_init: A function object that is able to initialize an
+                         individual from a list.
+        :returns: A list of individuals.
+
+        When *ind_init* is a subclass of :class:`numpy.ndarray`, for example
+        a class created with :mod:`~deap.creator` from :class:`numpy.ndarray`,
+        the individuals are views of the rows of a single sample matrix and
+        :meth:`update` reads the matrix directly instead of converting the
+        individuals.
+        """
+        rng = get_numpy_rng()
+        arz = rng.standard_normal((self.lambda_, self.dim))
+        arz = self.centroid + self.sigma * self._Az(arz)
+        population, views = _individuals(ind_init, arz)
+        self._samples = (arz, tuple(population)) if views else None
+        return population
+
+    def update(self, population):
+        """Update the current strategy from the *population*.
+
+        :param population: A list of individuals from which to update the
+                           parameters.
+        """
+        population.sort(key=lambda ind: ind.fitness, reverse=True)
+
+        arx = _matrix(population[0:self.mu], self._samples)
+        self._samples = None
+
+        old_centroid = self.centroid
+        self.centroid = numpy.dot(self.weights, arx)
+
+        self.pc = (1 - self.cc) * self.pc \
+            + sqrt(self.cc * (2 - self.cc) * self.mueff) / self.sigma \
+            * (self.centroid - old_centroid)
+
+        self.update_count += 1
+
+        # Save the evolution path as a new direction
+        if self.update_count % self.nsteps == 0:
+            if self.nvectors == self.m:
+                self.P[:-1] = self.P[1:]
+                self.V[:-1] = self.V[1:]
+                self.b[:-1] = self.b[1:]
+                self.d[:-1] = self.d[1:]
+                self.nvectors -= 1
+                start = 0
+            else:
+                start = self.nvectors
+            self.P[self.nvectors] = self.pc
+            self.nvectors += 1
+            self._factorize(start)
+
+        # Population success rule
+        fitness = [copy.deepcopy(ind.fitness) for ind in population]
+        if self.prev_fitness is not None:
+            merged = sorted([(f, 0) for f in fitness] + [(f, 1) for f in self.prev_fitness],
+                            key=lambda item: item[0], reverse=True)
+            ranks = numpy.zeros(2)
+            for rank, (_, origin) in enumerate(merged):
+                ranks[origin] += rank
+            z = (ranks[1] - ranks[0]) / len(fitness) ** 2 - self.ztarget
+            self.s = (1 - self.cs) * self.s + self.cs * z
+            self.sigma *= exp(self.s / self.damps)
+        self.prev_fitness = fitness
+
+    def computeParams(self, params):
+        r"""Computes the parameters depending on :math:`\lambda`. It needs to
+        be called again if :math:`\lambda` changes during evolution.
+
+        :param params: A dictionary of the manually set parameters.
+        """
+        self.mu = params.get("mu", int(self.lambda_ / 2))
+        self.weights = _recombination_weights(self.mu, params.get("weights", "superlinear"))
+        self.mueff = 1. / sum(self.weights ** 2)
+
+        self.cc = params.get("ccum", 0.5 / sqrt(self.dim))
+        self.ccov1 = params.get("ccov1", 0.1 / log(self.dim + 1.))
+        self.nsteps = params.get("nsteps", max(1, int(1. / self.cc)))
+        self.cs = params.get("cs", 0.3)
+        self.damps = params.get("damps", 1.)
+        self.ztarget = params.get("ztarget", 0.25)
 
 
 class StrategyOnePlusLambda(object):
@@ -241,6 +1036,23 @@ class StrategyOnePlusLambda(object):
     +----------------+---------------------------+----------------------------+
     | ``pthresh``    | ``0.44``                  | Threshold success rate.    |
     +----------------+---------------------------+----------------------------+
+    | ``sampling``   | ``"independent"``         | Sampling of the offspring, |
+    |                |                           | can be ``"independent"``,  |
+    |                |                           | ``"mirrored"`` or          |
+    |                |                           | ``"orthogonal"``.          |
+    +----------------+---------------------------+----------------------------+
+
+    With the ``"mirrored"`` sampling, the offspring are generated by pairs of
+    opposite steps. Combined with the sequential evaluation of
+    :meth:`evaluate`, which stops as soon as an offspring is better than the
+    parent, the mirror of a step is only evaluated when the step failed
+    ([Brockhoff2010]_). Since the step size is then adapted after each
+    evaluation, the default parameters of ``lambda_=1`` for ``d``,
+    ``ptarg`` and ``cp`` usually work best.
+
+    .. [Brockhoff2010] Brockhoff, Auger, Hansen, Arnold and Hohm, 2010.
+       Mirrored Sampling and Sequential Selection for Evolution Strategies.
+       *Parallel Problem Solving from Nature*
 
     .. [Igel2007] Igel, Hansen, Roth, 2007. Covariance matrix adaptation for
        multi-objective optimization. *Evolutionary Computation* Spring;15(1):1-28
@@ -251,14 +1063,28 @@ class StrategyOnePlusLambda(object):
         self.sigma = sigma
         self.dim = len(self.parent)
 
-        self.C = numpy.identity(self.dim)
         self.A = numpy.identity(self.dim)
+        self.invCholesky = numpy.identity(self.dim)
 
         self.pc = numpy.zeros(self.dim)
 
         self.computeParams(kargs)
         self.psucc = self.ptarg
 
+    @property
+    def C(self):
+        """The covariance matrix of the distribution. Only its factor
+        :attr:`A` and the inverse :attr:`invCholesky` are maintained, the
+        matrix is computed, in :math:`O(N^3)`, when requested. Setting it,
+        for example to warm-start the strategy, recomputes the factor and
+        its inverse from the Cholesky decomposition of the new matrix."""
+        return numpy.dot(self.A, self.A.T)
+
+    @C.setter
+    def C(self, C):
+        self.A = numpy.linalg.cholesky(numpy.array(C, dtype=float))
+        self.invCholesky = numpy.linalg.inv(self.A)
+
     def computeParams(self, params):
         r"""Computes the parameters depending on :math:`\lambda`. It needs to
         be called again if :math:`\lambda` changes during evolution.
@@ -277,6 +1103,7 @@ class StrategyOnePlusLambda(object):
         self.cc = params.get("cc", 2.0 / (self.dim + 2.0))
         self.ccov = params.get("ccov", 2.0 / (self.dim ** 2 + 6.0))
         self.pthresh = params.get("pthresh", 0.44)
+        self.sampling = params.get("sampling", "independent")
 
     def generate(self, ind_init):
         r"""Generate a population of :math:`\lambda` individuals of type
@@ -286,10 +1113,33 @@ class StrategyOnePlusLambda(object):
                          individual from a list.
         :returns: A list of individuals.
         """
+        rng = get_numpy_rng()
         # self.y = numpy.dot(self.A, numpy.random.standard_normal(self.dim))
-        arz = numpy.random.standard_normal((self.lambda_, self.dim))
+        arz = _standard_normal(rng, self.lambda_, self.dim, self.sampling)
         arz = self.parent + self.sigma * numpy.dot(arz, self.A.T)
-        return [ind_init(a) for a in arz]
+        return _individuals(ind_init, arz)[0]
+
+    def evaluate(self, population, evaluate):
+        """Evaluate the offspring of *population* one after the other with
+        the function *evaluate* and update the strategy after each of them,
+        as a (1+1) strategy would. The evaluation stops at the first
+        offspring better than the parent, which becomes the new parent, and
+        the remaining offspring are discarded. :meth:`update` must not be
+        called on the returned individuals.
+
+        :param population: A list of individuals from :meth:`generate`.
+        :param evaluate: The evaluation function.
+        :returns: The list of the evaluated individuals.
+        """
+        evaluated = list()
+        for ind in population:
+            ind.fitness.values = evaluate(ind)
+            evaluated.append(ind)
+            improved = self.parent.fitness < ind.fitness
+            self.update([ind])
+            if improved:
+                break
+        return evaluated
 
     def update(self, population):
         """Update the current covariance matrix strategy from the
@@ -300,7 +1150,7 @@ class StrategyOnePlusLambda(object):
         """
         population.sort(key=lambda ind: ind.fitness, reverse=True)
         lambda_succ = sum(self.parent.fitness <= ind.fitness for ind in population)
-        p_succ = float(lambda_succ) / self.lambda_
+        p_succ = float(lambda_succ) / len(population)
         self.psucc = (1 - self.cp) * self.psucc + self.cp * p_succ
 
         if self.parent.fitness <= population[0].fitness:
@@ -308,24 +1158,28 @@ class StrategyOnePlusLambda(object):
             self.parent = copy.deepcopy(population[0])
             if self.psucc < self.pthresh:
                 self.pc = (1 - self.cc) * self.pc + sqrt(self.cc * (2 - self.cc)) * x_step
-                self.C = (1 - self.ccov) * self.C + self.ccov * numpy.outer(self.pc, self.pc)
+                self._rankOneUpdate(1 - self.ccov, self.ccov, self.pc)
             else:
                 self.pc = (1 - self.cc) * self.pc
-                self.C = (1 - self.ccov) * self.C + self.ccov * (numpy.outer(self.pc, self.pc) + self.cc * (2 - self.cc) * self.C)
+                self._rankOneUpdate(1 - self.ccov + self.ccov * self.cc * (2 - self.cc),
+                                    self.ccov, self.pc)
 
         self.sigma = self.sigma * exp(1.0 / self.d * (self.psucc - self.ptarg) / (1.0 - self.ptarg))
 
-        # We use Cholesky since for now we have no use of eigen decomposition
-        # Basically, Cholesky returns a matrix A as C = A*A.T
-        # Eigen decomposition returns two matrix B and D^2 as C = B*D^2*B.T = B*D*D*B.T
-        # So A == B*D
-        # To compute the new individual we need to multiply each vector z by A
-        # as y = centroid + sigma * A*z
-        # So the Cholesky is more straightforward as we don't need to compute
-        # the squareroot of D^2, and multiply B and D in order to get A, we directly get A.
-        # This can't be done (without cost) with the standard CMA-ES as the eigen decomposition is used
-        # to compute covariance matrix inverse in the step-size evolutionary path computation.
-        self.A = numpy.linalg.cholesky(self.C)
+    def _rankOneUpdate(self, alpha, beta, v):
+        """Update the factor :attr:`A` and its inverse :attr:`invCholesky`
+        in place so that the covariance matrix becomes
+        ``alpha * C + beta * outer(v, v)``."""
+        _rank_one_update(self.invCholesky[numpy.newaxis], self.A[numpy.newaxis],
+                         numpy.array([alpha]), beta, v[numpy.newaxis])
+
+    def __setstate__(self, state):
+        # Strategies pickled with the dense covariance matrix have no inverse
+        # factor, the Cholesky factor is inverted once
+        if "invCholesky" not in state:
+            state.pop("C", None)
+            state["invCholesky"] = numpy.linalg.inv(state["A"])
+        self.__dict__.update(state)
 
 
 class StrategyMultiObjective(object):
@@ -361,6 +1215,13 @@ class StrategyMultiObjective(object):
     | ``pthresh``    | ``0.44``                  | Threshold success rate.    |
     +----------------+---------------------------+----------------------------+
 
+    The step sizes :attr:`sigmas`, the Cholesky factors :attr:`A` and their
+    inverses :attr:`invCholesky`, the evolution paths :attr:`pc` and the
+    success rates :attr:`psucc` of the parents are stacked in arrays along
+    their first axis, in the order of :attr:`parents`. The offspring are
+    sampled and the factors of the successful offspring are updated with
+    batched matrix products.
+
     .. [Voss2010] Voss, Hansen, Igel, "Improved Step Size Adaptation
        for the MO-CMA-ES", 2010.
 
@@ -383,14 +1244,15 @@ class StrategyMultiObjective(object):
         self.ccov = params.get("ccov", 2.0 / (self.dim ** 2 + 6.0))
         self.pthresh = params.get("pthresh", 0.44)
 
-        # Internal parameters associated to the mu parent
-        self.sigmas = [sigma] * len(population)
+        # Internal parameters associated to the mu parent, stacked along the
+        # first axis
+        self.sigmas = numpy.full(len(population), float(sigma))
         # Lower Cholesky matrix (Sampling matrix)
-        self.A = [numpy.identity(self.dim) for _ in range(len(population))]
+        self.A = numpy.tile(numpy.identity(self.dim), (len(population), 1, 1))
         # Inverse Cholesky matrix (Used in the update of A)
-        self.invCholesky = [numpy.identity(self.dim) for _ in range(len(population))]
-        self.pc = [numpy.zeros(self.dim) for _ in range(len(population))]
-        self.psucc = [self.ptarg] * len(population)
+        self.invCholesky = numpy.tile(numpy.identity(self.dim), (len(population), 1, 1))
+        self.pc = numpy.zeros((len(population), self.dim))
+        self.psucc = numpy.full(len(population), self.ptarg)
 
         self.indicator = params.get("indicator", tools.hypervolume)
 
@@ -405,8 +1267,8 @@ class StrategyMultiObjective(object):
                   indicates that the individual is an offspring and the index
                   of its parent.
         """
-        arz = numpy.random.randn(self.lambda_, self.dim)
-        individuals = list()
+        rng = get_numpy_rng()
+        arz = rng.randn(self.lambda_, self.dim)
 
         # Make sure every parent has a parent tag and index
         for i, p in enumerate(self.parents):
@@ -414,19 +1276,22 @@ class StrategyMultiObjective(object):
 
         # Each parent produce an offspring
         if self.lambda_ == self.mu:
-            for i in range(self.lambda_):
-                # print "Z", list(arz[i])
-                individuals.append(ind_init(self.parents[i] + self.sigmas[i] * numpy.dot(self.A[i], arz[i])))
-                individuals[-1]._ps = "o", i
+            indices = list(range(self.lambda_))
 
         # Parents producing an offspring are chosen at random from the first front
         else:
             ndom = tools.sortLogNondominated(self.parents, len(self.parents), first_front_only=True)
-            for i in range(self.lambda_):
-                j = numpy.random.randint(0, len(ndom))
-                _, p_idx = ndom[j]._ps
-                individuals.append(ind_init(self.parents[p_idx] + self.sigmas[p_idx] * numpy.dot(self.A[p_idx], arz[i])))
-                individuals[-1]._ps = "o", p_idx
+            indices = [ndom[rng.randint(0, len(ndom))]._ps[1] for _ in range(self.lambda_)]
+
+        # The offspring are sampled in a single matrix, the factors are only
+        # gathered when the parents are not taken in order
+        A = self.A if indices == list(range(len(self.parents))) else self.A[indices]
+        samples = numpy.array(self.parents)[indices] \
+            + self.sigmas[indices, numpy.newaxis] * numpy.einsum("kij,kj->ki", A, arz)
+
+        individuals = _individuals(ind_init, samples)[0]
+        for ind, p_idx in zip(individuals, indices):
+            ind._ps = "o", p_idx
 
         return individuals
 
@@ -471,22 +1336,6 @@ class StrategyMultiObjective(object):
 
         return chosen, not_chosen
 
-    def _rankOneUpdate(self, invCholesky, A, alpha, beta, v):
-        w = numpy.dot(invCholesky, v)
-
-        # Under this threshold, the update is mostly noise
-        if w.max() > 1e-20:
-            w_inv = numpy.dot(w, invCholesky)
-            norm_w2 = numpy.sum(w ** 2)
-            a = sqrt(alpha)
-            root = numpy.sqrt(1 + beta / alpha * norm_w2)
-            b = a / norm_w2 * (root - 1)
-
-            A = a * A + b * numpy.outer(v, w)
-            invCholesky = 1.0 / a * invCholesky - b / (a ** 2 + a * b * norm_w2) * numpy.outer(w, w_inv)
-
-        return invCholesky, A
-
     def update(self, population):
         """Update the current covariance matrix strategies from the
         *population*.
@@ -499,55 +1348,75 @@ class StrategyMultiObjective(object):
         cp, cc, ccov = self.cp, self.cc, self.ccov
         d, ptarg, pthresh = self.d, self.ptarg, self.pthresh
 
-        # Make copies for chosen offspring only
-        last_steps = [self.sigmas[ind._ps[1]] if ind._ps[0] == "o" else None for ind in chosen]
-        sigmas = [self.sigmas[ind._ps[1]] if ind._ps[0] == "o" else None for ind in chosen]
-        invCholesky = [self.invCholesky[ind._ps[1]].copy() if ind._ps[0] == "o" else None for ind in chosen]
-        A = [self.A[ind._ps[1]].copy() if ind._ps[0] == "o" else None for ind in chosen]
-        pc = [self.pc[ind._ps[1]].copy() if ind._ps[0] == "o" else None for ind in chosen]
-        psucc = [self.psucc[ind._ps[1]] if ind._ps[0] == "o" else None for ind in chosen]
-
-        # Update the internal parameters for successful offspring
+        offspring = [i for i, ind in enumerate(chosen) if ind._ps[0] == "o"]
+        o_idx = numpy.array([chosen[i]._ps[1] for i in offspring], dtype=int)
+
+        # Update the internal parameters of the chosen offspring from the ones
+        # of their parent (Success = 1 since they are chosen)
+        last_steps = self.sigmas[o_idx]
+        psucc = (1.0 - cp) * self.psucc[o_idx] + cp
+        sigmas = last_steps * numpy.exp((psucc - ptarg) / (d * (1.0 - ptarg)))
+
+        succ = psucc < pthresh
+        xp = numpy.array([chosen[i] for i in offspring]).reshape(len(offspring), self.dim)
+        x = numpy.array([self.parents[j] for j in o_idx]).reshape(len(offspring), self.dim)
+        pc = (1.0 - cc) * self.pc[o_idx] \
+            + numpy.where(succ, sqrt(cc * (2.0 - cc)) / last_steps, 0.0)[:, numpy.newaxis] * (xp - x)
+        alpha = numpy.where(succ, 1 - ccov, 1 - ccov + cc * (2.0 - cc))
+        invCholesky, A = _rank_one_update(self.invCholesky[o_idx], self.A[o_idx], alpha, ccov, pc)
+
+        # The parents are updated with the success of each of their
+        # offspring, in order. It is unnecessary to update the entire
+        # parameter set for not chosen individuals, their parameters will not
+        # make it to the next generation
+        events = [(chosen[i]._ps[1], 1.0) for i in offspring]
+        events += [(ind._ps[1], 0.0) for ind in not_chosen if ind._ps[0] == "o"]
+        for p_idx, success in events:
+            self.psucc[p_idx] = (1.0 - cp) * self.psucc[p_idx] + cp * success
+            self.sigmas[p_idx] = self.sigmas[p_idx] * exp((self.psucc[p_idx] - ptarg) / (d * (1.0 - ptarg)))
+
+        # The chosen parents keep their slot in the stacked parameters and the
+        # chosen offspring take the slots of the discarded parents, so that
+        # only the parameters of the offspring are written
+        kept = set(ind._ps[1] for ind in chosen if ind._ps[0] == "p")
+        free = [j for j in range(len(self.parents)) if j not in kept]
+        if len(offspring) > len(free):
+            extra = len(offspring) - len(free)
+            free += list(range(len(self.parents), len(self.parents) + extra))
+            self.sigmas = numpy.concatenate((self.sigmas, numpy.zeros(extra)))
+            self.psucc = numpy.concatenate((self.psucc, numpy.zeros(extra)))
+            self.pc = numpy.concatenate((self.pc, numpy.zeros((extra, self.dim))))
+            self.A = numpy.concatenate((self.A, numpy.zeros((extra, self.dim, self.dim))))
+            self.invCholesky = numpy.concatenate((self.invCholesky,
+                                                  numpy.zeros((extra, self.dim, self.dim))))
+        slots, unused = free[:len(offspring)], free[len(offspring):]
+
+        if len(offspring) > 0:
+            self.sigmas[slots] = sigmas
+            self.invCholesky[slots] = invCholesky
+            self.A[slots] = A
+            self.pc[slots] = pc
+            self.psucc[slots] = psucc
+
+        parents = [None] * len(self.sigmas)
         for i, ind in enumerate(chosen):
-            t, p_idx = ind._ps
-
-            # Only the offspring update the parameter set
-            if t == "o":
-                # Update (Success = 1 since it is chosen)
-                psucc[i] = (1.0 - cp) * psucc[i] + cp
-                sigmas[i] = sigmas[i] * exp((psucc[i] - ptarg) / (d * (1.0 - ptarg)))
-
-                if psucc[i] < pthresh:
-                    xp = numpy.array(ind)
-                    x = numpy.array(self.parents[p_idx])
-                    pc[i] = (1.0 - cc) * pc[i] + sqrt(cc * (2.0 - cc)) * (xp - x) / last_steps[i]
-                    invCholesky[i], A[i] = self._rankOneUpdate(invCholesky[i], A[i], 1 - ccov, ccov, pc[i])
-                else:
-                    pc[i] = (1.0 - cc) * pc[i]
-                    pc_weight = cc * (2.0 - cc)
-                    invCholesky[i], A[i] = self._rankOneUpdate(invCholesky[i], A[i], 1 - ccov + pc_weight, ccov, pc[i])
-
-                self.psucc[p_idx] = (1.0 - cp) * self.psucc[p_idx] + cp
-                self.sigmas[p_idx] = self.sigmas[p_idx] * exp((self.psucc[p_idx] - ptarg) / (d * (1.0 - ptarg)))
-
-        # It is unnecessary to update the entire parameter set for not chosen individuals
-        # Their parameters will not make it to the next generation
-        for ind in not_chosen:
-            t, p_idx = ind._ps
-
-            # Only the offspring update the parameter set
-            if t == "o":
-                self.psucc[p_idx] = (1.0 - cp) * self.psucc[p_idx]
-                self.sigmas[p_idx] = self.sigmas[p_idx] * exp((self.psucc[p_idx] - ptarg) / (d * (1.0 - ptarg)))
-
-        # Make a copy of the internal parameters
-        # The parameter is in the temporary variable for offspring and in the original one for parents
-        self.parents = chosen
-        self.sigmas = [sigmas[i] if ind._ps[0] == "o" else self.sigmas[ind._ps[1]] for i, ind in enumerate(chosen)]
-        self.invCholesky = [invCholesky[i] if ind._ps[0] == "o" else self.invCholesky[ind._ps[1]] for i, ind in enumerate(chosen)]
-        self.A = [A[i] if ind._ps[0] == "o" else self.A[ind._ps[1]] for i, ind in enumerate(chosen)]
-        self.pc = [pc[i] if ind._ps[0] == "o" else self.pc[ind._ps[1]] for i, ind in enumerate(chosen)]
-        self.psucc = [psucc[i] if ind._ps[0] == "o" else self.psucc[ind._ps[1]] for i, ind in enumerate(chosen)]
+            if ind._ps[0] == "p":
+                parents[ind._ps[1]] = ind
+        for slot, i in zip(slots, offspring):
+            parents[slot] = chosen[i]
+
+        # Less parents than slots, only when mu is lower than the initial
+        # population size
+        if len(unused) > 0:
+            used = [j for j in range(len(parents)) if parents[j] is not None]
+            parents = [parents[j] for j in used]
+            self.sigmas = self.sigmas[used]
+            self.invCholesky = self.invCholesky[used]
+            self.A = self.A[used]
+            self.pc = self.pc[used]
+            self.psucc = self.psucc[used]
+
+        self.parents = parents
 
 
 class StrategyActiveOnePlusLambda(object):
@@ -672,8 +1541,9 @@ class StrategyActiveOnePlusLambda(object):
                          individual from a list.
         :returns: A list of individuals.
         """
+        rng = get_numpy_rng()
         # Generate individuals
-        z = numpy.random.standard_normal((self.lambda_, self.dim))
+        z = rng.standard_normal((self.lambda_, self.dim))
         y = numpy.dot(self.A, z.T).T
         x = self.parent + self.sigma * y + self.S_int * self._integer_mutation()
 
@@ -693,6 +1563,7 @@ class StrategyActiveOnePlusLambda(object):
         return population
 
     def _integer_mutation(self):
+        rng = get_numpy_rng()
         n_I_R = self.i_I_R.shape[0]
 
         # Mixed integer CMA-ES is developed for (mu/mu , lambda)
@@ -720,11 +1591,11 @@ class StrategyActiveOnePlusLambda(object):
         # differs at most by one
         for i, j in zip(range(self.lambda_), cycle(self.i_I_R)):
             # Probabilistically choose lambda_int individuals
-            if numpy.random.rand() < p:
+            if rng.rand() < p:
                 Rp[i, j] = 1
-                Rpp[i, j] = numpy.random.geometric(p=0.7**(1.0 / n_I_R)) - 1
+                Rpp[i, j] = rng.geometric(p=0.7**(1.0 / n_I_R)) - 1
 
-        I_pm1 = (-1)**numpy.random.randint(0, 2, (self.lambda_, self.dim))
+        I_pm1 = (-1)**rng.randint(0, 2, (self.lambda_, self.dim))
         R_int = I_pm1 * (Rp + Rpp)
 
         # Usually in mu/mu, lambda the last individual is set to the step taken.
@@ -866,3 +1737,711 @@ class StrategyActiveOnePlusLambda(object):
         C = numpy.dot(self.A, self.A.T)
         self.i_I_R = numpy.flatnonzero(2 * self.sigma * numpy.diag(C)**0.5
                                        < self.S_int)
+
+
+######################################
+# Restarts                           #
+######################################
+
+class _Termination(object):
+    """Standard termination conditions of CMA-ES ([Hansen2009]_) evaluated
+    on a :class:`Strategy` after each update. Calling the object with the
+    updated population, sorted best first, returns the list of the names of
+    the conditions met."""
+    def __init__(self, strategy, params):
+        dim, lambda_ = strategy.dim, strategy.lambda_
+        self.strategy = strategy
+        self.sigma0 = strategy.sigma
+        self.maxiter = params.get("maxiter", 100 + 50 * (dim + 3) ** 2 / sqrt(lambda_))
+        self.tolfun = params.get("tolfun", 1e-12)
+        self.tolx = params.get("tolx", 1e-12)
+        self.tolupsigma = params.get("tolupsigma", 1e20)
+        self.tolconditioncov = params.get("tolconditioncov", 1e14)
+        self.ngen = 0
+        self.history = deque(maxlen=10 + int(numpy.ceil(30. * dim / lambda_)))
+        self.equalfunvals = deque(maxlen=dim)
+        self.bests = list()
+        self.medians = list()
+
+    def __call__(self, population):
+        strategy = self.strategy
+        conditions = list()
+        self.ngen += 1
+        values = [ind.fitness.wvalues[0] for ind in population]
+        self.history.append(values[0])
+        self.bests.append(values[0])
+        self.medians.append(values[len(values) // 2])
+        self.equalfunvals.append(values[0] == values[int(numpy.ceil(0.1 + len(values) / 4.)) - 1])
+
+        if self.ngen >= self.maxiter:
+            conditions.append("MaxIter")
+
+        if len(self.history) == self.history.maxlen \
+                and max(max(self.history), max(values)) \
+                - min(min(self.history), min(values)) < self.tolfun:
+            conditions.append("TolFun")
+
+        if self.ngen > strategy.dim \
+                and sum(self.equalfunvals) > len(self.equalfunvals) / 3.:
+            conditions.append("EqualFunVals")
+
+        if numpy.all(strategy.sigma * numpy.abs(strategy.pc) < self.tolx) \
+                and numpy.all(strategy.sigma * numpy.sqrt(numpy.diag(strategy.C)) < self.tolx):
+            conditions.append("TolX")
+
+        if strategy.sigma / self.sigma0 > self.tolupsigma * strategy.diagD[-1]:
+            conditions.append("TolUpSigma")
+
+        # Stagnation, the medians of the best and median values of the last
+        # 20 generations are not better than those of an earlier window
+        stagnation = int(numpy.ceil(0.2 * self.ngen + 120 + 30. * strategy.dim / strategy.lambda_))
+        if self.ngen > stagnation \
+                and numpy.median(self.bests[-20:]) <= numpy.median(self.bests[-stagnation:-stagnation + 20]) \
+                and numpy.median(self.medians[-20:]) <= numpy.median(self.medians[-stagnation:-stagnation + 20]):
+            conditions.append("Stagnation")
+
+        if strategy.cond > self.tolconditioncov:
+            conditions.append("ConditionCov")
+
+        i = self.ngen % strategy.dim
+        if numpy.all(strategy.centroid == strategy.centroid + 0.1 * strategy.sigma
+                     * strategy.diagD[i] * strategy.B[:, i]):
+            conditions.append("NoEffectAxis")
+
+        if numpy.any(strategy.centroid == strategy.centroid + 0.2 * strategy.sigma
+                     * numpy.sqrt(numpy.diag(strategy.C))):
+            conditions.append("NoEffectCoor")
+
+        return conditions
+
+
+def _optimize(strategy, ind_init, evaluate, map, halloffame, params, maxevals, poll=None):
+    """Run *strategy* until a termination condition is met and return the
+    number of generations, the number of evaluations and the conditions."""
+    termination = _Termination(strategy, params)
+    nevals = 0
+    conditions = list()
+    while not conditions:
+        population = strategy.generate(ind_init)
+        fitnesses = map(evaluate, population)
+        for ind, fit in zip(population, fitnesses):
+            ind.fitness.values = fit
+        nevals += len(population)
+        halloffame.update(population)
+
+        strategy.update(population)
+        conditions = termination(population)
+        if maxevals is not None and nevals >= maxevals:
+            conditions.append("MaxEvals")
+
+        if poll is not None:
+            poll(len(population))
+
+    return termination.ngen, nevals, conditions
+
+
+def _restart(ind_init, evaluate, centroid, sigma, params, maxevals, seed):
+    """Run a complete restart in a worker process with its own generators."""
+    with using_rng(random.Random(seed), numpy.random.RandomState(seed)):
+        strategy = Strategy(centroid, sigma, **params)
+        halloffame = tools.HallOfFame(1)
+        ngen, nevals, conditions = _optimize(strategy, ind_init, evaluate, map,
+                                             halloffame, params, maxevals)
+    return halloffame[0], ngen, nevals, conditions
+
+
+class Restarts(object):
+    r"""
+    Restart driver of :class:`Strategy` implementing the IPOP-CMA-ES
+    ([Auger2005]_) and BIPOP-CMA-ES ([Hansen2009]_) population schedules.
+    Each restart runs a new strategy until one of the standard termination
+    conditions is met, then the next restart begins with a new centroid.
+
+    :param ind_init: A function object that is able to initialize an
+                     individual from a list.
+    :param centroid: An iterable object that indicates where to start each
+                     restart or a function returning one, called at each
+                     restart.
+    :param sigma: The initial standard deviation of the large population
+                  restarts.
+    :param regime: The population schedule, ``"ipop"`` or ``"bipop"``
+                   (default).
+    :param nrestarts: The number of large population restarts after the
+                      first run, optional.
+    :param maxevals: The total budget of evaluations, optional.
+    :param processes: The number of processes running the small population
+                      restarts of the BIPOP schedule concurrently with the
+                      large population restarts, optional. By default,
+                      they run sequentially between the large restarts.
+    :param parameter: One or more parameter to pass to the strategies or to
+                      the termination conditions as described in the
+                      following table, optional.
+
+    +---------------------+------------------------------+-------------------------+
+    | Parameter           | Default                      | Details                 |
+    +=====================+==============================+=========================+
+    | ``lambda_``         | ``int(4 + 3 * log(N))``      | Population size of the  |
+    |                     |                              | first run, doubled at   |
+    |                     |                              | each large restart.     |
+    +---------------------+------------------------------+-------------------------+
+    | ``maxiter``         | ``100 + 50 * (N + 3)^2 /     | Maximum number of       |
+    |                     | sqrt(lambda_)``              | generations of a run.   |
+    +---------------------+------------------------------+-------------------------+
+    | ``tolfun``          | ``1e-12``                    | Stop when the range of  |
+    |                     |                              | the recent best values  |
+    |                     |                              | and of the population   |
+    |                     |                              | values is smaller.      |
+    +---------------------+------------------------------+-------------------------+
+    | ``tolx``            | ``1e-12``                    | Stop when the standard  |
+    |                     |                              | deviations and the      |
+    |                     |                              | evolution path are all  |
+    |                     |                              | smaller.                |
+    +---------------------+------------------------------+-------------------------+
+    | ``tolupsigma``      | ``1e20``                     | Stop when the step-size |
+    |                     |                              | increased by more.      |
+    +---------------------+------------------------------+-------------------------+
+    | ``tolconditioncov`` | ``1e14``                     | Stop when the condition |
+    |                     |                              | number of the covariance|
+    |                     |                              | matrix is larger.       |
+    +---------------------+------------------------------+-------------------------+
+
+    The other parameters are given to every :class:`Strategy`. The runs also
+    stop on stagnation of the best and median values, when adding a tenth of
+    a standard deviation along a principal axis (NoEffectAxis) or a fifth of
+    a standard deviation along a coordinate (NoEffectCoor) does not change
+    the centroid, and when a quarter of the population has the same value
+    in a third of the last generations (EqualFunVals).
+
+    In the BIPOP schedule, a small population restart with a random
+    population size and step-size runs whenever the evaluations spent in
+    the small restarts are fewer than those spent in the large restarts,
+    excluding the first run. Its budget is half the budget of the last large
+    restart. With *processes*, the small restarts are independent runs sent
+    to a process pool while the large restarts continue in the main process,
+    therefore the evaluation function and *ind_init* must be picklable.
+
+    .. [Auger2005] Auger and Hansen, 2005. A Restart CMA Evolution Strategy
+       With Increasing Population Size. *IEEE Congress on Evolutionary
+       Computation*
+
+    .. [Hansen2009] Hansen, 2009. Benchmarking a BI-Population CMA-ES on the
+       BBOB-2009 Function Testbed. *GECCO Workshop*
+    """
+    def __init__(self, ind_init, centroid, sigma, regime="bipop", nrestarts=9,
+                 maxevals=None, processes=None, **params):
+        if regime not in ("ipop", "bipop"):
+            raise ValueError("Unknown regime : %s" % regime)
+        self.ind_init = ind_init
+        self.centroid = centroid
+        self.sigma = sigma
+        self.regime = regime
+        self.nrestarts = nrestarts
+        self.maxevals = maxevals
+        self.processes = processes
+        self.params = params
+
+    def _centroid(self):
+        if callable(self.centroid):
+            return numpy.array(self.centroid())
+        return numpy.array(self.centroid)
+
+    def _small(self, dim, lambda_large):
+        """Return the parameters of a small population restart."""
+        rng = get_numpy_rng()
+        lambda0 = self.params.get("lambda_", int(4 + 3 * log(dim)))
+        lambda_ = int(lambda0 * (0.5 * lambda_large / lambda0) ** (rng.uniform() ** 2))
+        sigma = self.sigma * 10 ** (-2 * rng.uniform())
+        return max(lambda_, 2), sigma
+
+    def run(self, toolbox, halloffame=None, verbose=__debug__):
+        """Run the restarts and return the hall of fame and a logbook with
+        one record per restart.
+
+        :param toolbox: A :class:`~deap.base.Toolbox` that contains the
+                        evaluation function, and optionally a map used by the
+                        large population restarts.
+        :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
+                           contain the best individuals, optional. By
+                           default, it keeps the best individual.
+        :param verbose: Whether or not to log the restarts.
+        :returns: The hall of fame and a :class:`~deap.tools.Logbook`.
+        """
+        if halloffame is None:
+            halloffame = tools.HallOfFame(1)
+        logbook = tools.Logbook()
+        logbook.header = ["restart", "regime", "lambda", "sigma", "gen", "nevals", "best", "stop"]
+
+        dim = len(self._centroid())
+        lambda0 = self.params.get("lambda_", int(4 + 3 * log(dim)))
+        budget = dict(large=0, small=0, total=0)
+        state = dict(restart=0, restart_large=0, last_large=None, lambda_large=lambda0)
+        pending = list()
+
+        def remaining():
+            if self.maxevals is None:
+                return None
+            return max(self.maxevals - budget["total"], 0)
+
+        def record(restart, regime, lambda_, sigma, ngen, nevals, best, conditions):
+            logbook.record(**{"restart": restart, "regime": regime, "lambda": lambda_,
+                              "sigma": sigma, "gen": ngen, "nevals": nevals,
+                              "best": best.fitness.values[0], "stop": ",".join(conditions)})
+            halloffame.update([best])
+            if verbose:
+                print(logbook.stream)
+
+        def small_ready():
+            # Small restarts run while they spent less than the large ones
+            return (self.regime == "bipop" and state["last_large"] is not None
+                    and budget["small"] < budget["large"]
+                    and (remaining() is None or remaining() > 0))
+
+        def small_params():
+            lambda_, sigma = self._small(dim, state["lambda_large"])
+            params = dict(self.params, lambda_=lambda_)
+            maxevals = 0.5 * state["last_large"]
+            if remaining() is not None:
+                maxevals = min(maxevals, remaining())
+            restart = state["restart"]
+            state["restart"] += 1
+            return restart, lambda_, sigma, params, maxevals
+
+        def run_small():
+            restart, lambda_, sigma, params, maxevals = small_params()
+            strategy = Strategy(self._centroid(), sigma, **params)
+            hof = tools.HallOfFame(1)
+            ngen, nevals, conditions = _optimize(strategy, self.ind_init, toolbox.evaluate,
+                                                 toolbox.map, hof, params, maxevals)
+            budget["small"] += nevals
+            budget["total"] += nevals
+            record(restart, "small", lambda_, sigma, ngen, nevals, hof[0], conditions)
+
+        def submit_small():
+            restart, lambda_, sigma, params, maxevals = small_params()
+            # The budget is committed when the restart is sent
+            budget["small"] += maxevals
+            budget["total"] += maxevals
+            seed = get_numpy_rng().randint(2**31)
+            result = pool.apply_async(_restart, (self.ind_init, toolbox.evaluate, self._centroid(),
+                                                 sigma, params, maxevals, seed))
+            pending.append((restart, lambda_, sigma, maxevals, result))
+
+        def collect(wait=False):
+            for item in list(pending):
+                restart, lambda_, sigma, maxevals, result = item
+                if wait or result.ready():
+                    best, ngen, nevals, conditions = result.get()
+                    pending.remove(item)
+                    budget["small"] += nevals - maxevals
+                    budget["total"] += nevals - maxevals
+                    record(restart, "small", lambda_, sigma, ngen, nevals, best, conditions)
+
+        def poll(nevals):
+            if state["restart_large"] > 0:
+                budget["large"] += nevals
+            budget["total"] += nevals
+            if pool is not None:
+                collect()
+                while small_ready() and len(pending) < self.processes:
+                    submit_small()
+
+        pool = multiprocessing.Pool(self.processes) if self.processes else None
+        try:
+            for i in range(self.nrestarts + 1):
+                if remaining() is not None and remaining() == 0:
+                    break
+                lambda_ = lambda0 * 2 ** i
+                params = dict(self.params, lambda_=lambda_)
+                restart = state["restart"]
+                state["restart"] += 1
+                state["restart_large"] = i
+                state["lambda_large"] = lambda_
+                strategy = Strategy(self._centroid(), self.sigma, **params)
+                hof = tools.HallOfFame(1)
+                ngen, nevals, conditions = _optimize(strategy, self.ind_init, toolbox.evaluate,
+                                                     toolbox.map, hof, params, remaining(), poll)
+                record(restart, "large", lambda_, self.sigma, ngen, nevals, hof[0], conditions)
+                state["last_large"] = nevals
+
+                if pool is None and i < self.nrestarts:
+                    while small_ready():
+                        run_small()
+
+            if pool is not None:
+                collect(wait=True)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        return halloffame, logbook
+
+
+######################################
+# Asynchronous ask and tell          #
+######################################
+
+class AskTell(object):
+    r"""
+    Asynchronous ask and tell interface over a strategy such as
+    :class:`Strategy` or :class:`StrategyOnePlusLambda`. The candidates are
+    handed out one at a time by :meth:`ask`, and their results are given
+    back in any order to :meth:`tell`. The strategy is updated as soon as
+    *batch* results are available, without waiting for the other
+    candidates of the generation. The candidates still being evaluated
+    then come from an older distribution. Their results are still used if
+    at most *staleness* updates happened since they were asked, and
+    discarded otherwise.
+
+    :param strategy: The strategy to drive. It must provide the
+                     ``generate(ind_init)`` and ``update(population)``
+                     methods and the attribute ``lambda_``.
+    :param ind_init: A function object that is able to initialize an
+                     individual from a list.
+    :param staleness: The maximum number of updates between the time a
+                      candidate is asked and the update using its result,
+                      optional. With 0, only the candidates of the current
+                      distribution are used.
+    :param batch: The number of results used in each update, optional. It
+                  defaults to ``strategy.lambda_`` and must be at least the
+                  number of parents of the strategy.
+
+    The attributes :attr:`version`, :attr:`nevals` and :attr:`ndiscarded`
+    hold the number of updates, the number of results told and the number of
+    results discarded because they were too stale. The :meth:`run` method
+    evaluates the candidates with an executor of :mod:`concurrent.futures`,
+    keeping a fixed number of evaluations in flight ::
+
+        >>> strategy = Strategy(centroid=[5.0] * 10, sigma=5.0)   # doctest: +SKIP
+        >>> asktell = AskTell(strategy, creator.Individual)       # doctest: +SKIP
+        >>> with ProcessPoolExecutor(16) as executor:             # doctest: +SKIP
+        ...     logbook = asktell.run(evaluate, executor, maxevals=10000)
+    """
+    def __init__(self, strategy, ind_init, staleness=1, batch=None):
+        self.strategy = strategy
+        self.ind_init = ind_init
+        self.staleness = staleness
+        self.batch = batch if batch is not None else strategy.lambda_
+        mu = getattr(strategy, "mu", 1)
+        if self.batch < mu:
+            raise ValueError("The batch must contain at least the mu = %d parents of the "
+                             "strategy, got %d." % (mu, self.batch))
+        self.version = 0
+        self.nevals = 0
+        self.ndiscarded = 0
+        self._candidates = deque()
+        self._pending = dict()
+        self._results = list()
+
+    def ask(self):
+        """Return a new candidate sampled from the current distribution."""
+        if len(self._candidates) == 0:
+            self._candidates.extend(self.strategy.generate(self.ind_init))
+        individual = self._candidates.popleft()
+        self._pending[id(individual)] = (individual, self.version)
+        return individual
+
+    def tell(self, individual, values=None):
+        """Give back the result of a candidate returned by :meth:`ask`. The
+        strategy is updated when *batch* results are available.
+
+        :param individual: The evaluated candidate.
+        :param values: The fitness values of the candidate, optional. By
+                       default, the fitness of *individual* must already be
+                       valid.
+        :returns: The population used to update the strategy, sorted by the
+                  strategy, or :data:`None` when there was no update.
+        """
+        if id(individual) not in self._pending:
+            raise ValueError("The individual was not asked to this strategy.")
+        _, version = self._pending.pop(id(individual))
+        if values is not None:
+            individual.fitness.values = values
+        self.nevals += 1
+
+        if self.version - version > self.staleness:
+            self.ndiscarded += 1
+            return None
+
+        self._results.append((individual, version))
+        if len(self._results) < self.batch:
+            return None
+
+        population = [ind for ind, _ in self._results[:self.batch]]
+        del self._results[:self.batch]
+        self.strategy.update(population)
+        self.version += 1
+
+        # The candidates sampled from the previous distribution are not handed
+        # out anymore and the results that became too stale are dropped
+        self._candidates.clear()
+        results = [(ind, v) for ind, v in self._results if self.version - v <= self.staleness]
+        self.ndiscarded += len(self._results) - len(results)
+        self._results = results
+
+        return population
+
+    def run(self, evaluate, executor, maxevals, inflight=None, halloffame=None,
+            stats=None, verbose=__debug__):
+        """Evaluate *maxevals* candidates with *executor* and tell their
+        results as soon as they complete.
+
+        :param evaluate: The evaluation function, it must be picklable with a
+                         process executor.
+        :param executor: A :class:`concurrent.futures.Executor`.
+        :param maxevals: The number of evaluations.
+        :param inflight: The number of evaluations submitted at the same
+                         time, optional. It defaults to *batch*.
+        :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
+                           contain the best individuals, optional.
+        :param stats: A :class:`~deap.tools.Statistics` object compiled on the
+                      population of each update, optional.
+        :param verbose: Whether or not to log the statistics.
+        :returns: A :class:`~deap.tools.Logbook` with one record per update.
+        """
+        inflight = inflight if inflight is not None else self.batch
+        logbook = tools.Logbook()
+        logbook.header = ["update", "nevals", "ndiscarded"] + (stats.fields if stats else [])
+
+        futures = dict()
+        nasked = 0
+        while nasked < maxevals or len(futures) > 0:
+            while len(futures) < inflight and nasked < maxevals:
+                individual = self.ask()
+                futures[executor.submit(evaluate, individual)] = individual
+                nasked += 1
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                individual = futures.pop(future)
+                population = self.tell(individual, future.result())
+                if halloffame is not None:
+                    halloffame.update([individual])
+                if population is not None:
+                    record = stats.compile(population) if stats else {}
+                    logbook.record(update=self.version, nevals=self.nevals,
+                                   ndiscarded=self.ndiscarded, **record)
+                    if verbose:
+                        print(logbook.stream)
+
+        return logbook
+
+
+######################################
+# Surrogate                          #
+######################################
+
+def _kendall_tau(a, b):
+    """Return the Kendall rank correlation coefficient of *a* and *b*."""
+    a, b = numpy.asarray(a), numpy.asarray(b)
+    concordance = numpy.sign(a[:, None] - a[None, :]) * numpy.sign(b[:, None] - b[None, :])
+    npairs = len(a) * (len(a) - 1)
+    return concordance.sum() / npairs if npairs > 0 else 1.0
+
+
+class Surrogate(object):
+    r"""
+    Surrogate assisted evaluation of the populations of a :class:`Strategy`
+    in the spirit of the lq-CMA-ES ([Hansen2019]_). A linear-quadratic model
+    is fitted on an archive of truly evaluated points in the coordinate
+    system of the distribution, the population is ranked by the model and
+    only the most promising candidates are truly evaluated, by increasing
+    batches, until the Kendall rank correlation between the model and the
+    true values of the most recent evaluations reaches *tau*. The other
+    candidates receive the values predicted by the model and the mixed
+    population is given to the strategy update.
+
+    Only the truly evaluated individuals, returned by :meth:`evaluate`,
+    carry real fitness values. The fitness of a predicted individual is
+    valid for the strategy update but the individual has the attribute
+    ``surrogate`` set to :data:`True`, and it should not be given to a hall
+    of fame or to statistics.
+
+    :param strategy: A :class:`Strategy`, or any strategy providing
+                     ``generate``, ``update``, ``centroid`` and ``lambda_``
+                     for single objective problems.
+    :param evaluate: The true evaluation function.
+    :param tau: The rank correlation above which the remaining candidates
+                are not evaluated, optional.
+    :param map: The map used to evaluate the batches, optional.
+    :param archive: The number of recent points used to fit the model,
+                    optional. It defaults to ``min(2 * P, 40 * N)`` where
+                    ``P`` is the number of parameters of a full quadratic
+                    model.
+
+    The model is linear, quadratic without cross terms or fully quadratic
+    depending on the number of points available. The attributes
+    :attr:`nevals` and :attr:`npredicted` hold the numbers of true
+    evaluations and of predicted values. It can be used in place of the
+    strategy and of the evaluation in a generate and update loop ::
+
+        >>> surrogate = Surrogate(Strategy([5.0] * 10, 5.0), evaluate)  # doctest: +SKIP
+        >>> for gen in range(ngen):                       # doctest: +SKIP
+        ...     population = surrogate.generate(creator.Individual)
+        ...     evaluated = surrogate.evaluate(population)
+        ...     surrogate.update(population)
+
+    .. [Hansen2019] Hansen, 2019. A Global Surrogate Assisted CMA-ES.
+       *Genetic and Evolutionary Computation Conference*
+    """
+    def __init__(self, strategy, evaluate, tau=0.85, map=map, archive=None):
+        self.strategy = strategy
+        self.evaluate_func = evaluate
+        self.tau = tau
+        self.map = map
+        dim = len(strategy.centroid)
+        nfull = (dim + 1) * (dim + 2) // 2
+        self.size = archive if archive is not None else min(2 * nfull, 40 * dim)
+        self.X = numpy.empty((0, dim))
+        self.y = numpy.empty(0)
+        self.coefficients = None
+        self.nevals = 0
+        self.npredicted = 0
+        self.last_tau = None
+
+    def generate(self, ind_init):
+        """Generate a population with the strategy, see
+        :meth:`Strategy.generate`."""
+        return self.strategy.generate(ind_init)
+
+    def update(self, population):
+        """Update the strategy with the evaluated *population*, see
+        :meth:`Strategy.update`."""
+        self.strategy.update(population)
+
+    def _transform(self, X):
+        """Express the points *X* in the coordinate system of the
+        distribution."""
+        strategy = self.strategy
+        Z = X - strategy.centroid
+        if hasattr(strategy, "B"):
+            Z = numpy.dot(Z, strategy.B)
+        if hasattr(strategy, "diagD"):
+            Z = Z / strategy.diagD
+        return Z / getattr(strategy, "sigma", 1.0)
+
+    def _features(self, Z, kind):
+        columns = [numpy.ones((len(Z), 1)), Z]
+        if kind == "full":
+            i, j = numpy.triu_indices(Z.shape[1])
+            columns.append(Z[:, i] * Z[:, j])
+        elif kind == "diagonal":
+            columns.append(Z ** 2)
+        return numpy.hstack(columns)
+
+    def _fit(self):
+        """Fit the model on the most recent points of the archive."""
+        X, y = self.X[-self.size:], self.y[-self.size:]
+        dim = X.shape[1]
+        self.kind = None
+        for kind, nparams in (("full", (dim + 1) * (dim + 2) // 2),
+                              ("diagonal", 2 * dim + 1), ("linear", dim + 1)):
+            if len(X) >= 1.2 * nparams:
+                self.kind = kind
+                break
+        if self.kind is None:
+            self.coefficients = None
+            return
+        F = self._features(self._transform(X), self.kind)
+        self.coefficients = numpy.linalg.lstsq(F, y, rcond=None)[0]
+
+    def predict(self, X):
+        """Return the weighted values predicted by the model for the points
+        *X*, or :data:`None` when there are not enough points to fit a
+        model."""
+        if self.coefficients is None:
+            return None
+        return numpy.dot(self._features(self._transform(numpy.asarray(X, dtype=float)),
+                                        self.kind), self.coefficients)
+
+    def _archive(self, individuals):
+        X = numpy.array(individuals, dtype=float).reshape(len(individuals), self.X.shape[1])
+        y = numpy.array([ind.fitness.wvalues[0] for ind in individuals])
+        self.X = numpy.vstack((self.X, X))[-self.size:]
+        self.y = numpy.concatenate((self.y, y))[-self.size:]
+
+    def evaluate(self, population):
+        """Evaluate the *population*, truly or with the model, and return the
+        list of the truly evaluated individuals. The individuals receiving
+        predicted values are marked with the attribute ``surrogate`` set to
+        :data:`True`.
+
+        :param population: A list of individuals to evaluate.
+        """
+        X = numpy.array(population, dtype=float).reshape(len(population), self.X.shape[1])
+        remaining = list(range(len(population)))
+        evaluated = list()
+        nbatch = max(1, int(numpy.ceil(0.1 * len(population))))
+
+        self._fit()
+        self.last_tau = None
+        while len(remaining) > 0:
+            predicted = self.predict(X[remaining])
+            if predicted is None:
+                batch, remaining = remaining, []
+            else:
+                # Evaluate the best candidates according to the model
+                order = numpy.argsort(-predicted)
+                batch = [remaining[k] for k in order[:nbatch]]
+                remaining = [remaining[k] for k in order[nbatch:]]
+                nbatch = int(numpy.ceil(1.5 * nbatch))
+
+            individuals = [population[k] for k in batch]
+            for ind, fit in zip(individuals, self.map(self.evaluate_func, individuals)):
+                ind.fitness.values = fit
+            evaluated += batch
+            self.nevals += len(batch)
+            self._archive(individuals)
+
+            if len(remaining) > 0:
+                # Rank correlation between the model and the most recent
+                # true values
+                self._fit()
+                if self.coefficients is not None:
+                    ntau = max(15, min(int(1.2 * len(evaluated)), int(0.75 * len(population))))
+                    ntau = min(ntau, len(self.y))
+                    self.last_tau = _kendall_tau(self.predict(self.X[-ntau:]), self.y[-ntau:])
+                    if self.last_tau >= self.tau:
+                        break
+
+        if len(remaining) > 0:
+            # The predicted values are shifted so that they do not look better
+            # than the model error on the evaluated candidates
+            predicted = self.predict(X)
+            true = numpy.array([population[k].fitness.wvalues[0] for k in evaluated])
+            shift = max(0.0, numpy.max(predicted[evaluated] - true))
+            for k in remaining:
+                population[k].fitness.wvalues = (predicted[k] - shift,)
+                population[k].surrogate = True
+            self.npredicted += len(remaining)
+
+        return [population[k] for k in evaluated]
+
+    def run(self, ind_init, ngen, halloffame=None, stats=None, verbose=__debug__):
+        """Run *ngen* generations of the strategy with the surrogate.
+
+        :param ind_init: A function object that is able to initialize an
+                         individual from a list.
+        :param ngen: The number of generations.
+        :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
+                           contain the best truly evaluated individuals,
+                           optional.
+        :param stats: A :class:`~deap.tools.Statistics` object compiled on the
+                      truly evaluated individuals, optional.
+        :param verbose: Whether or not to log the statistics.
+        :returns: The last population and a :class:`~deap.tools.Logbook`.
+        """
+        logbook = tools.Logbook()
+        logbook.header = ["gen", "nevals", "tau"] + (stats.fields if stats else [])
+        population = None
+        for gen in range(ngen):
+            population = self.generate(ind_init)
+            evaluated = self.evaluate(population)
+            if halloffame is not None:
+                halloffame.update(evaluated)
+            record = stats.compile(evaluated) if stats else {}
+            logbook.record(gen=gen, nevals=len(evaluated), tau=self.last_tau, **record)
+            if verbose:
+                print(logbook.stream)
+            self.update(population)
+        return population, logbook
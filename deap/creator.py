@@ -63,7 +63,9 @@ else:
         def __new__(cls, iterable):
             """Creates a new instance of a numpy.ndarray from a function call.
             Adds the possibility to instantiate from an iterable."""
-            return numpy.array(list(iterable)).view(cls)
+            if not isinstance(iterable, numpy.ndarray):
+                iterable = list(iterable)
+            return numpy.array(iterable).view(cls)
 
         def __setstate__(self, state):
             self.__dict__.update(state)
@@ -22,7 +22,6 @@ This module support both strongly and loosely typed GP.
 import copy
 import math
 import copyreg
-import random
 import re
 import sys
 import types
@@ -34,6 +33,7 @@ from functools import partial, wraps
 from operator import eq, lt
 
 from . import tools  # Needed by HARM-GP
+from .rng import get_rng
 
 ######################################
 # GP Data structure                  #
@@ -571,8 +571,9 @@ def genGrow(pset, min_, max_, type_=None):
         """Expression generation stops when the depth is equal to height
         or when it is randomly determined that a node should be a terminal.
         """
+        rng = get_rng()
         return depth == height or \
-            (depth >= min_ and random.random() < pset.terminalRatio)
+            (depth >= min_ and rng.random() < pset.terminalRatio)
 
     return generate(pset, min_, max_, condition, type_)
 
@@ -590,7 +591,8 @@ def genHalfAndHalf(pset, min_, max_, type_=None):
                   is assumed.
     :returns: Either, a full or a grown tree.
     """
-    method = random.choice((genGrow, genFull))
+    rng = get_rng()
+    method = rng.choice((genGrow, genFull))
     return method(pset, min_, max_, type_)
 
 
@@ -624,16 +626,17 @@ def generate(pset, min_, max_, condition, type_=None):
     :returns: A grown tree with leaves at possibly different depths
               depending on the condition function.
     """
+    rng = get_rng()
     if type_ is None:
         type_ = pset.ret
     expr = []
-    height = random.randint(min_, max_)
+    height = rng.randint(min_, max_)
     stack = [(0, type_)]
     while len(stack) != 0:
         depth, type_ = stack.pop()
         if condition(height, depth):
             try:
-                term = random.choice(pset.terminals[type_])
+                term = rng.choice(pset.terminals[type_])
             except IndexError:
                 _, _, traceback = sys.exc_info()
                 raise IndexError("The gp.generate function tried to add "
@@ -644,7 +647,7 @@ def generate(pset, min_, max_, condition, type_=None):
             expr.append(term)
         else:
             try:
-                prim = random.choice(pset.primitives[type_])
+                prim = rng.choice(pset.primitives[type_])
             except IndexError:
                 _, _, traceback = sys.exc_info()
                 raise IndexError("The gp.generate function tried to add "
@@ -668,6 +671,7 @@ def cxOnePoint(ind1, ind2):
     :param ind2: Second tree participating in the crossover.
     :returns: A tuple of two trees.
     """
+    rng = get_rng()
     if len(ind1) < 2 or len(ind2) < 2:
         # No crossover on single node tree
         return ind1, ind2
@@ -688,10 +692,10 @@ def cxOnePoint(ind1, ind2):
         common_types = set(types1.keys()).intersection(set(types2.keys()))
 
     if len(common_types) > 0:
-        type_ = random.choice(list(common_types))
+        type_ = rng.choice(list(common_types))
 
-        index1 = random.choice(types1[type_])
-        index2 = random.choice(types2[type_])
+        index1 = rng.choice(types1[type_])
+        index2 = rng.choice(types2[type_])
 
         slice1 = ind1.searchSubtree(index1)
         slice2 = ind2.searchSubtree(index2)
@@ -717,7 +721,7 @@ def cxOnePointLeafBiased(ind1, ind2, termpb):
     terminal primitives are selected for 90% of the crossover points, and
     terminals for 10%, so *termpb* should be set to 0.1.
     """
-
+    rng = get_rng()
     if len(ind1) < 2 or len(ind2) < 2:
         # No crossover on single node tree
         return ind1, ind2
@@ -725,8 +729,8 @@ def cxOnePointLeafBiased(ind1, ind2, termpb):
     # Determine whether to keep terminals or primitives for each individual
     terminal_op = partial(eq, 0)
     primitive_op = partial(lt, 0)
-    arity_op1 = terminal_op if random.random() < termpb else primitive_op
-    arity_op2 = terminal_op if random.random() < termpb else primitive_op
+    arity_op1 = terminal_op if rng.random() < termpb else primitive_op
+    arity_op2 = terminal_op if rng.random() < termpb else primitive_op
 
     # List all available primitive or terminal types in each individual
     types1 = defaultdict(list)
@@ -744,9 +748,9 @@ def cxOnePointLeafBiased(ind1, ind2, termpb):
 
     if len(common_types) > 0:
         # Set does not support indexing
-        type_ = random.choice(list(common_types))
-        index1 = random.choice(types1[type_])
-        index2 = random.choice(types2[type_])
+        type_ = rng.choice(list(common_types))
+        index1 = rng.choice(types1[type_])
+        index2 = rng.choice(types2[type_])
 
         slice1 = ind1.searchSubtree(index1)
         slice2 = ind2.searchSubtree(index2)
@@ -768,7 +772,8 @@ def mutUniform(individual, expr, pset):
                  called.
     :returns: A tuple of one tree.
     """
-    index = random.randrange(len(individual))
+    rng = get_rng()
+    index = rng.randrange(len(individual))
     slice_ = individual.searchSubtree(index)
     type_ = individual[index].ret
     individual[slice_] = expr(pset=pset, type_=type_)
@@ -783,20 +788,21 @@ def mutNodeReplacement(individual, pset):
     :param individual: The normal or typed tree to be mutated.
     :returns: A tuple of one tree.
     """
+    rng = get_rng()
     if len(individual) < 2:
         return individual,
 
-    index = random.randrange(1, len(individual))
+    index = rng.randrange(1, len(individual))
     node = individual[index]
 
     if node.arity == 0:  # Terminal
-        term = random.choice(pset.terminals[node.ret])
+        term = rng.choice(pset.terminals[node.ret])
         if type(term) is MetaEphemeral:
             term = term()
         individual[index] = term
     else:  # Primitive
         prims = [p for p in pset.primitives[node.ret] if p.args == node.args]
-        individual[index] = random.choice(prims)
+        individual[index] = rng.choice(prims)
 
     return individual,
 
@@ -812,6 +818,7 @@ def mutEphemeral(individual, mode):
                  ephemeral constants.
     :returns: A tuple of one tree.
     """
+    rng = get_rng()
     if mode not in ["one", "all"]:
         raise ValueError("Mode must be one of \"one\" or \"all\"")
 
@@ -821,7 +828,7 @@ def mutEphemeral(individual, mode):
 
     if len(ephemerals_idx) > 0:
         if mode == "one":
-            ephemerals_idx = (random.choice(ephemerals_idx),)
+            ephemerals_idx = (rng.choice(ephemerals_idx),)
 
         for i in ephemerals_idx:
             individual[i] = type(individual[i])()
@@ -840,10 +847,11 @@ def mutInsert(individual, pset):
     :param individual: The normal or typed tree to be mutated.
     :returns: A tuple of one tree.
     """
-    index = random.randrange(len(individual))
+    rng = get_rng()
+    index = rng.randrange(len(individual))
     node = individual[index]
     slice_ = individual.searchSubtree(index)
-    choice = random.choice
+    choice = rng.choice
 
     # As we want to keep the current node as children of the new one,
     # it must accept the return value of the current node
@@ -876,6 +884,7 @@ def mutShrink(individual):
     :param individual: The tree to be shrunk.
     :returns: A tuple of one tree.
     """
+    rng = get_rng()
     # We don't want to "shrink" the root
     if len(individual) < 3 or individual.height <= 1:
         return individual,
@@ -886,8 +895,8 @@ def mutShrink(individual):
             iprims.append((i, node))
 
     if len(iprims) != 0:
-        index, prim = random.choice(iprims)
-        arg_idx = random.choice([i for i, type_ in enumerate(prim.args) if type_ == prim.ret])
+        index, prim = rng.choice(iprims)
+        arg_idx = rng.choice([i for i, type_ in enumerate(prim.args) if type_ == prim.ret])
         rindex = index + 1
         for _ in range(arg_idx + 1):
             rslice = individual.searchSubtree(rindex)
@@ -937,11 +946,12 @@ def staticLimit(key, max_value):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            rng = get_rng()
             keep_inds = [copy.deepcopy(ind) for ind in args]
             new_inds = list(func(*args, **kwargs))
             for i, ind in enumerate(new_inds):
                 if key(ind) > max_value:
-                    new_inds[i] = random.choice(keep_inds)
+                    new_inds[i] = rng.choice(keep_inds)
             return new_inds
 
         return wrapper
@@ -1017,6 +1027,7 @@ def harm(population, toolbox, cxpb, mutpb, ngen,
         # default values) and 2) to generate the final population, in which
         # case pickfrom should be the natural population previously generated
         # and acceptfunc a function implementing the HARM-GP algorithm.
+        rng = get_rng()
         producedpop = []
         producedpopsizes = []
         while len(producedpop) < n:
@@ -1029,7 +1040,7 @@ def harm(population, toolbox, cxpb, mutpb, ngen,
                     if producesizes:
                         producedpopsizes.append(len(aspirant))
             else:
-                opRandom = random.random()
+                opRandom = rng.random()
                 if opRandom < cxpb:
                     # Crossover
                     aspirant1, aspirant2 = toolbox.mate(*map(toolbox.clone,
@@ -1124,7 +1135,8 @@ def harm(population, toolbox, cxpb, mutpb, ngen,
             return probhist[s] if s < len(probhist) else targetfunc(s)
 
         def acceptfunc(s):
-            return random.random() <= probfunc(s)
+            rng = get_rng()
+            return rng.random() <= probfunc(s)
 
         # Generate offspring using the acceptance probabilities
         # previously computed
@@ -1259,6 +1271,7 @@ def mutSemantic(individual, gen_func=genGrow, pset=None, ms=None, min=2, max=6):
         >>> ctr == len(individual)
         True
     """
+    rng = get_rng()
     for p in ['lf', 'mul', 'add', 'sub']:
         assert p in pset.mapping, "A '" + p + "' function is required in order to perform semantic mutation"
 
@@ -1268,7 +1281,7 @@ def mutSemantic(individual, gen_func=genGrow, pset=None, ms=None, min=2, max=6):
     tr1.insert(0, pset.mapping['lf'])
     tr2.insert(0, pset.mapping['lf'])
     if ms is None:
-        ms = random.uniform(0, 2)
+        ms = rng.uniform(0, 2)
     mutation_step = Terminal(ms, False, object)
     # Create the root
 
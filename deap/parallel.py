@@ -0,0 +1,1182 @@
+#    This file is part of DEAP.
+#
+#    DEAP is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of
+#    the License, or (at your option) any later version.
+#
+#    DEAP is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
+
+"""The :mod:`~deap.parallel` module provides replacements for the
+:meth:`~deap.base.Toolbox.map` method of the toolbox that distribute the
+evaluations over several processes. They are registered in the toolbox
+like any other map function ::
+
+    >>> pmap = SharedMemoryMap(processes=4)          # doctest: +SKIP
+    >>> toolbox.register("map", pmap)                # doctest: +SKIP
+"""
+
+import copy
+import hashlib
+import heapq
+import io
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+import zlib
+
+from collections import Counter, deque
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy
+
+from . import algorithms
+from . import creator
+from . import tools
+from .rng import SeededMap
+from .tools.checkpoint import _numeric_matrix
+
+
+######################################
+# Shared memory map                  #
+######################################
+
+# Per worker cache of the attached shared memory block and of the last
+# function received
+_worker_state = dict(block=None, payload=None, func=None)
+
+
+def _attach(name):
+    block = _worker_state["block"]
+    if block is None or block.name != name:
+        if block is not None:
+            block.close()
+        block = shared_memory.SharedMemory(name=name)
+        _worker_state["block"] = block
+    return block
+
+
+def _loads(payload):
+    if _worker_state["payload"] != payload:
+        _worker_state["func"] = pickle.loads(payload)
+        _worker_state["payload"] = payload
+    return _worker_state["func"]
+
+
+def _evaluate_shared(payload, ind_class, name, shape, dtype, nobj, start, stop):
+    func = _loads(payload)
+    block = _attach(name)
+    genomes = numpy.ndarray(shape, dtype=dtype, buffer=block.buf)
+    genomes.flags.writeable = False
+    fitnesses = numpy.ndarray((shape[0], nobj), dtype=numpy.float64,
+                              buffer=block.buf, offset=_aligned(genomes.nbytes))
+    arrays = issubclass(ind_class, numpy.ndarray)
+    for i in range(start, stop):
+        # The function receives an individual as with any other map
+        fitnesses[i] = func(ind_class(genomes[i] if arrays else genomes[i].tolist()))
+    del genomes, fitnesses
+    return stop - start
+
+
+class SharedMemoryMap(object):
+    """Process pool map for individuals whose genome is a fixed length
+    sequence of numbers. Instead of pickling the individuals for each
+    evaluation, the genomes are copied in a single
+    :class:`~multiprocessing.shared_memory.SharedMemory` block and the
+    workers only receive the range of rows to evaluate. The workers write
+    the fitness values back in a shared matrix that follows the genomes in
+    the same block. The block is reused from one call to the other and only
+    reallocated when it grows.
+
+    :param processes: The number of worker processes, optional. It defaults
+                      to :func:`os.cpu_count`.
+    :param chunksize: The number of individuals in each task sent to the
+                      workers, optional. By default, the population is split
+                      in four tasks per worker.
+    :param nobj: The number of values returned by the evaluation function,
+                 optional. By default, it is the number of weights of the
+                 fitness of the first individual.
+    :param initializer: A function called by each worker when it starts,
+                        optional.
+    :param initargs: The arguments of the *initializer*, optional.
+
+    Each worker rebuilds the individuals of its rows with their class before
+    calling the evaluation function, which therefore receives individuals
+    as with any other map. When the individuals are not all of the same
+    class, have attributes other than their fitness, cannot be represented
+    as a numeric matrix or when the number of
+    objectives cannot be determined, the map falls back on a regular
+    :meth:`multiprocessing.pool.Pool.map`. The map is used as any other map
+    function, it returns the list of the fitness values as tuples ::
+
+        >>> pmap = SharedMemoryMap(processes=4)          # doctest: +SKIP
+        >>> toolbox.register("map", pmap)                # doctest: +SKIP
+        >>> fitnesses = toolbox.map(toolbox.evaluate, pop) # doctest: +SKIP
+        >>> pmap.close()                                 # doctest: +SKIP
+    """
+    def __init__(self, processes=None, chunksize=None, nobj=None,
+                 initializer=None, initargs=()):
+        # The workers must share the resource tracker of the main process,
+        # otherwise they unlink the shared memory block when they exit
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(processes, initializer, initargs)
+        self.processes = self.pool._processes
+        self.chunksize = chunksize
+        self.nobj = nobj
+        self.block = None
+
+    def _reserve(self, nbytes):
+        if self.block is None or self.block.size < nbytes:
+            self._release()
+            self.block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        return self.block
+
+    def _release(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def _nobj(self, population):
+        if self.nobj is not None:
+            return self.nobj
+        fitness = getattr(population[0], "fitness", None)
+        if fitness is None:
+            return None
+        return len(fitness.weights)
+
+    def __call__(self, func, iterable):
+        population = list(iterable)
+        if len(population) == 0:
+            return []
+
+        nobj = self._nobj(population)
+        genomes = _numeric_matrix(population) if nobj is not None else None
+        if genomes is None:
+            return self.pool.map(func, population, self.chunksize)
+
+        n = len(genomes)
+        offset = _aligned(genomes.nbytes)
+        block = self._reserve(offset + n * nobj * 8)
+        shared = numpy.ndarray(genomes.shape, dtype=genomes.dtype, buffer=block.buf)
+        shared[:] = genomes
+        del shared
+
+        chunksize = self.chunksize
+        if chunksize is None:
+            chunksize = max(1, int(math.ceil(n / (4.0 * self.processes))))
+
+        payload = pickle.dumps(func, pickle.HIGHEST_PROTOCOL)
+        tasks = [self.pool.apply_async(_evaluate_shared,
+                                       (payload, type(population[0]), block.name,
+                                        genomes.shape, genomes.dtype.str,
+                                        nobj, start, min(start + chunksize, n)))
+                 for start in range(0, n, chunksize)]
+        for task in tasks:
+            task.get()
+
+        fitnesses = numpy.ndarray((n, nobj), dtype=numpy.float64, buffer=block.buf,
+                                  offset=offset)
+        values = [tuple(row) for row in fitnesses.tolist()]
+        del fitnesses
+        return values
+
+    def close(self):
+        """Terminate the workers and free the shared memory."""
+        self.pool.terminate()
+        self.pool.join()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        raise TypeError("%s cannot be pickled, it must stay in the main process."
+                        % self.__class__.__name__)
+
+
+######################################
+# Load balancing map                 #
+######################################
+
+def _evaluate_timed(func, items):
+    results, times = [], []
+    for item in items:
+        start = time.perf_counter()
+        results.append(func(item))
+        times.append(time.perf_counter() - start)
+    return os.getpid(), results, times
+
+
+def _size(individual):
+    try:
+        return len(individual)
+    except TypeError:
+        return 1
+
+
+class LatencyModel(object):
+    """Running linear model of the evaluation time as a function of a size
+    feature of the individuals. The least squares coefficients are computed
+    from exponentially decayed sums so that the model follows changes in the
+    evaluation cost along the evolution.
+
+    :param feature: A function returning the size of an individual,
+                    optional. It defaults to :func:`len`, or 1 for objects
+                    without length.
+    :param decay: The weight kept by the past observations at each
+                  :meth:`update`, optional.
+    """
+    def __init__(self, feature=_size, decay=0.9):
+        self.feature = feature
+        self.decay = decay
+        self.sums = numpy.zeros(5)      # n, x, y, xx, xy
+
+    def update(self, sizes, times):
+        """Add the measured evaluation *times* of individuals of the given
+        *sizes* to the model."""
+        x = numpy.asarray(sizes, dtype=float)
+        y = numpy.asarray(times, dtype=float)
+        self.sums *= self.decay
+        self.sums += (len(x), x.sum(), y.sum(), (x * x).sum(), (x * y).sum())
+
+    @property
+    def coefficients(self):
+        """Intercept and slope of the model, :data:`None` before the first
+        update."""
+        n, sx, sy, sxx, sxy = self.sums
+        if n == 0:
+            return None
+        det = n * sxx - sx * sx
+        if det <= 1e-12 * max(n * sxx, 1e-300):
+            # All the sizes are equal, the cost is proportional to the size
+            return 0.0, sy / max(sx, 1e-300)
+        slope = (n * sxy - sx * sy) / det
+        return (sy - slope * sx) / n, slope
+
+    def predict(self, population):
+        """Return the estimated evaluation cost of each individual."""
+        sizes = numpy.fromiter((self.feature(ind) for ind in population), dtype=float,
+                               count=len(population))
+        coefficients = self.coefficients
+        if coefficients is None:
+            return sizes
+        intercept, slope = coefficients
+        # Keep a small positive cost so that the order of the sizes matters
+        return numpy.maximum(intercept + slope * sizes, 1e-9 * (1.0 + sizes))
+
+
+def _balanced_chunks(costs, nchunks):
+    """Split the indices in *nchunks* chunks of similar total cost using the
+    longest processing time first rule, and return the chunks sorted by
+    decreasing total cost."""
+    nchunks = max(1, min(nchunks, len(costs)))
+    heap = [(0.0, i) for i in range(nchunks)]
+    chunks = [[] for _ in range(nchunks)]
+    for index in numpy.argsort(-costs, kind="stable").tolist():
+        load, i = heapq.heappop(heap)
+        chunks[i].append(index)
+        heapq.heappush(heap, (load + costs[index], i))
+    loads = [0.0] * nchunks
+    for load, i in heap:
+        loads[i] = load
+    order = sorted(range(nchunks), key=loads.__getitem__, reverse=True)
+    return [chunks[i] for i in order if chunks[i]]
+
+
+class BalancedMap(object):
+    """Process pool map that balances the evaluation cost between the
+    workers. The cost of each individual is estimated, either with the
+    *cost* function or with a :class:`LatencyModel` fitted on the measured
+    evaluation times, and the population is split in chunks of similar
+    total cost that are dispatched longest first to the workers as they
+    become idle.
+
+    :param processes: The number of worker processes, optional. It defaults
+                      to :func:`os.cpu_count`.
+    :param cost: A function returning the estimated evaluation cost of an
+                 individual, optional. By default, the cost is predicted by
+                 the *model*.
+    :param model: The :class:`LatencyModel` used when no *cost* is given,
+                  optional. By default, the model uses the length of the
+                  individuals.
+    :param chunks_per_worker: The number of chunks per worker, optional.
+                              More chunks allow more dynamic balancing at
+                              the cost of more messages.
+    :param pool: An existing :class:`multiprocessing.pool.Pool`, optional.
+                 When given, *processes* is ignored and the pool is not
+                 terminated by :meth:`close`.
+
+    For genetic programming, where the evaluation time grows with the size
+    of the trees, the map is simply registered in the toolbox ::
+
+        >>> bmap = BalancedMap(processes=8)              # doctest: +SKIP
+        >>> toolbox.register("map", bmap)                # doctest: +SKIP
+
+    The time spent evaluating by each worker is accumulated in
+    :attr:`busy` and the wall time of the calls in :attr:`wall`; the
+    utilization of the workers is given by :meth:`utilization`.
+    """
+    def __init__(self, processes=None, cost=None, model=None, chunks_per_worker=2, pool=None):
+        self.own_pool = pool is None
+        self.pool = multiprocessing.Pool(processes) if pool is None else pool
+        self.processes = self.pool._processes
+        self.cost = cost
+        self.model = model if model is not None else LatencyModel()
+        self.chunks_per_worker = chunks_per_worker
+        self.busy = Counter()
+        self.wall = 0.0
+
+    def __call__(self, func, iterable):
+        population = list(iterable)
+        if len(population) == 0:
+            return []
+
+        start = time.perf_counter()
+        if self.cost is not None:
+            costs = numpy.fromiter((self.cost(ind) for ind in population), dtype=float,
+                                   count=len(population))
+        else:
+            costs = self.model.predict(population)
+
+        chunks = _balanced_chunks(costs, self.processes * self.chunks_per_worker)
+        tasks = [self.pool.apply_async(_evaluate_timed,
+                                       (func, [population[i] for i in chunk]))
+                 for chunk in chunks]
+
+        results = [None] * len(population)
+        times = [0.0] * len(population)
+        for chunk, task in zip(chunks, tasks):
+            pid, values, durations = task.get()
+            for i, value, duration in zip(chunk, values, durations):
+                results[i] = value
+                times[i] = duration
+            self.busy[pid] += sum(durations)
+        self.wall += time.perf_counter() - start
+
+        if self.cost is None:
+            self.model.update([self.model.feature(ind) for ind in population], times)
+        return results
+
+    def utilization(self):
+        """Return a dictionary mapping the process id of each worker to the
+        fraction of the wall time it spent evaluating."""
+        if self.wall == 0:
+            return {}
+        return {pid: busy / self.wall for pid, busy in self.busy.items()}
+
+    def reset(self):
+        """Reset the utilization metrics."""
+        self.busy.clear()
+        self.wall = 0.0
+
+    def close(self):
+        """Terminate the workers if the pool was created by the map."""
+        if self.own_pool:
+            self.pool.terminate()
+            self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+######################################
+# Timeout map                        #
+######################################
+
+def _timeout_worker(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        index, payload, item = task
+        try:
+            message = (index, True, _loads(payload)(item))
+        except Exception as e:
+            message = (index, False, e)
+        try:
+            conn.send(message)
+        except Exception as e:
+            # The result or the exception cannot be pickled
+            conn.send((index, False, RuntimeError(repr(e))))
+
+
+class _Worker(object):
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_timeout_worker, args=(child_conn,))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        self.index = None
+        self.started = None
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class TimeoutMap(object):
+    r"""Process map bounding the wall-clock time of each evaluation. An
+    individual whose evaluation does not complete within *timeout* seconds
+    receives a penalty fitness and the worker evaluating it is replaced.
+    When there are no more individuals to dispatch, the stragglers are
+    speculatively evaluated again on the idle workers and the first result
+    received is kept.
+
+    :param processes: The number of worker processes, optional. It defaults
+                      to :func:`os.cpu_count`.
+    :param timeout: The maximal evaluation time of an individual in seconds,
+                    optional. By default, the evaluations are not bounded.
+    :param penalty: The fitness given to the individuals whose evaluation
+                    timed out, optional. It is either a sequence of values or
+                    a positive number :math:`\Delta`, in which case the
+                    value of the :math:`i`-th objective is :math:`-\Delta`
+                    when its weight is positive and :math:`\Delta` otherwise.
+                    It defaults to infinity, which is worst than any fitness.
+    :param weights: The fitness weights used to compute the penalty,
+                    optional. By default, the weights of the fitness of the
+                    individuals are used.
+    :param speculate: An evaluation is duplicated on an idle worker when it
+                      runs for more than *speculate* times the median
+                      evaluation time of the current call, optional. Set it
+                      to :data:`None` to disable speculative execution.
+
+    The map counts the timeouts of the last call in :attr:`timeouts`, the
+    duplicated evaluations in :attr:`speculations` and all the timeouts since
+    its creation in :attr:`total_timeouts`. The algorithms of the
+    :mod:`~deap.algorithms` module add the fields returned by :meth:`record`
+    to their logbook ::
+
+        >>> tmap = TimeoutMap(processes=8, timeout=60)   # doctest: +SKIP
+        >>> toolbox.register("map", tmap)                # doctest: +SKIP
+        >>> pop, logbook = eaSimple(pop, toolbox, 0.5, 0.2, 40) # doctest: +SKIP
+        >>> logbook.select("timeouts")                   # doctest: +SKIP
+    """
+    def __init__(self, processes=None, timeout=None, penalty=float("inf"), weights=None,
+                 speculate=2.0):
+        self.context = multiprocessing.get_context()
+        self.processes = processes or os.cpu_count() or 1
+        self.timeout = timeout
+        self.penalty = penalty
+        self.weights = weights
+        self.speculate = speculate
+        self.workers = [_Worker(self.context) for _ in range(self.processes)]
+        self.timeouts = 0
+        self.speculations = 0
+        self.total_timeouts = 0
+
+    def _penalty(self, individual):
+        if isinstance(self.penalty, Sequence):
+            return tuple(self.penalty)
+        weights = self.weights if self.weights is not None else individual.fitness.weights
+        return tuple(-math.copysign(self.penalty, w) for w in weights)
+
+    def _replace(self, worker):
+        worker.kill()
+        i = self.workers.index(worker)
+        self.workers[i] = _Worker(self.context)
+
+    def __call__(self, func, iterable):
+        population = list(iterable)
+        n = len(population)
+        payload = pickle.dumps(func, pickle.HIGHEST_PROTOCOL)
+
+        results = [None] * n
+        resolved = [False] * n
+        copies = Counter()
+        durations = []
+        pending = deque(range(n))
+        remaining = n
+        self.timeouts = 0
+        self.speculations = 0
+
+        def dispatch(worker, index):
+            worker.conn.send((index, payload, population[index]))
+            worker.index = index
+            # Each dispatch gets the full timeout, even when the individual
+            # was already sent to a worker that died
+            worker.started = time.perf_counter()
+            copies[index] += 1
+
+        try:
+            while remaining > 0:
+                now = time.perf_counter()
+                idle = [w for w in self.workers if w.index is None]
+                for worker in idle:
+                    if pending:
+                        dispatch(worker, pending.popleft())
+                    elif self.speculate is not None and durations:
+                        threshold = self.speculate * _median(durations)
+                        stragglers = [(now - w.started, w.index) for w in self.workers
+                                      if w.index is not None and copies[w.index] == 1]
+                        stragglers = [s for s in stragglers if s[0] > threshold]
+                        if not stragglers:
+                            break
+                        dispatch(worker, max(stragglers)[1])
+                        self.speculations += 1
+
+                # Sleep until a result arrives or the next deadline
+                wait_time = None
+                busy = [w for w in self.workers if w.index is not None]
+                if self.timeout is not None and busy:
+                    wait_time = max(0.0, min(w.started for w in busy) + self.timeout - now)
+                if self.speculate is not None and durations and len(busy) < len(self.workers):
+                    poll = max(0.0, self.speculate * _median(durations) / 4)
+                    wait_time = poll if wait_time is None else min(wait_time, poll)
+
+                for conn in multiprocessing.connection.wait([w.conn for w in busy], wait_time):
+                    worker = next(w for w in busy if w.conn is conn)
+                    index = worker.index
+                    worker.index = None
+                    copies[index] -= 1
+                    try:
+                        _, success, value = conn.recv()
+                    except (EOFError, OSError):
+                        # The worker died, evaluate the individual again
+                        self._replace(worker)
+                        if not resolved[index] and copies[index] == 0:
+                            pending.append(index)
+                        continue
+                    if resolved[index]:
+                        continue
+                    if not success:
+                        raise value
+                    results[index] = value
+                    resolved[index] = True
+                    remaining -= 1
+                    durations.append(time.perf_counter() - worker.started)
+
+                if self.timeout is not None:
+                    now = time.perf_counter()
+                    for worker in list(self.workers):
+                        index = worker.index
+                        if index is None or now - worker.started < self.timeout:
+                            continue
+                        if not resolved[index]:
+                            results[index] = self._penalty(population[index])
+                            resolved[index] = True
+                            remaining -= 1
+                            self.timeouts += 1
+                        copies[index] -= 1
+                        self._replace(worker)
+        finally:
+            # Stop the duplicates still running
+            for worker in list(self.workers):
+                if worker.index is not None:
+                    self._replace(worker)
+
+        self.total_timeouts += self.timeouts
+        return results
+
+    def record(self):
+        """Return the fields to add to the logbook for the last call. The
+        algorithms of :mod:`deap.algorithms` call this method after each
+        call of the map registered in the toolbox."""
+        return dict(timeouts=self.timeouts)
+
+    def close(self):
+        """Stop the workers."""
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            worker.process.join(1)
+            worker.kill()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+######################################
+# Island model                       #
+######################################
+
+def _ring(deme, ndemes):
+    return [(deme + 1) % ndemes]
+
+
+def _torus(deme, ndemes):
+    # Arrange the demes on the most square grid possible
+    rows = max(r for r in range(1, int(math.sqrt(ndemes)) + 1) if ndemes % r == 0)
+    cols = ndemes // rows
+    row, col = divmod(deme, cols)
+    neighbours = [((row - 1) % rows) * cols + col, ((row + 1) % rows) * cols + col,
+                  row * cols + (col - 1) % cols, row * cols + (col + 1) % cols]
+    return sorted(set(neighbours) - {deme})
+
+
+def _random(deme, ndemes):
+    if ndemes < 2:
+        return []
+    destination = random.randrange(ndemes - 1)
+    return [destination + (destination >= deme)]
+
+
+def _complete(deme, ndemes):
+    return [d for d in range(ndemes) if d != deme]
+
+
+_TOPOLOGIES = {"ring": _ring, "torus": _torus, "random": _random, "complete": _complete}
+
+
+class IslandModel(object):
+    """Island model running the generational loop of each deme in its own
+    process. Every *interval* generations, each deme sends copies of *k*
+    emigrants to its neighbours in the *topology* through a
+    :class:`multiprocessing.Queue` and integrates the immigrants that have
+    arrived since its last migration. The migrations are asynchronous, a deme
+    never waits for its neighbours.
+
+    :param toolbox: A :class:`~deap.base.Toolbox` that contains the evolution
+                    operators, as for :func:`~deap.algorithms.eaSimple`.
+    :param cxpb: The probability of mating two individuals.
+    :param mutpb: The probability of mutating an individual.
+    :param topology: The name of the migration topology, ``"ring"``,
+                     ``"torus"``, ``"random"`` or ``"complete"``, or a function
+                     returning the list of the destinations of deme *i* among
+                     *n* with the signature ``topology(i, n)``, optional.
+    :param interval: The number of generations between two migrations,
+                     optional.
+    :param k: The number of emigrants, optional.
+    :param selection: The function selecting the emigrants, optional.
+    :param replacement: The function selecting the individuals replaced by the
+                        immigrants, optional. If :obj:`None` (default) the
+                        immigrants replace the emigrants of the deme.
+    :param stats: A :class:`~deap.tools.Statistics` object that is updated
+                  inplace, optional.
+    :param halloffame: A :class:`~deap.tools.HallOfFame` object that will
+                       contain the best individuals of all the demes,
+                       optional.
+
+    Each deme process evolves with its own seed drawn from :mod:`random`. The
+    logbook returned by :meth:`run` contains the records of all the demes,
+    ordered by generation and deme ::
+
+        >>> islands = IslandModel(toolbox, 0.5, 0.2, topology="ring") # doctest: +SKIP
+        >>> demes = [toolbox.population(n=100) for _ in range(8)] # doctest: +SKIP
+        >>> demes, logbook = islands.run(demes, ngen=50) # doctest: +SKIP
+
+    With the ``spawn`` start method, the toolbox, the statistics and the
+    hall of fame are pickled to the deme processes and must not contain
+    lambda functions.
+    """
+    def __init__(self, toolbox, cxpb, mutpb, topology="ring", interval=5, k=5,
+                 selection=tools.selBest, replacement=None, stats=None, halloffame=None):
+        self.toolbox = toolbox
+        self.cxpb = cxpb
+        self.mutpb = mutpb
+        self.topology = _TOPOLOGIES[topology] if isinstance(topology, str) else topology
+        self.interval = interval
+        self.k = k
+        self.selection = selection
+        self.replacement = replacement
+        self.stats = stats
+        self.halloffame = halloffame
+
+    def _migrate(self, index, deme, inboxes):
+        emigrants = self.selection(deme, self.k)
+        for destination in self.topology(index, len(inboxes)):
+            inboxes[destination].put(emigrants)
+
+        immigrants = []
+        while True:
+            try:
+                immigrants.extend(inboxes[index].get_nowait())
+            except queue.Empty:
+                break
+        if not immigrants:
+            return
+
+        if self.replacement is None:
+            slots = emigrants
+        else:
+            slots = self.replacement(deme, min(len(immigrants), len(deme)))
+        # The most recent immigrants have priority
+        positions = {id(ind): i for i, ind in enumerate(deme)}
+        for slot, immigrant in zip(slots, reversed(immigrants)):
+            position = positions.get(id(slot))
+            if position is None:
+                position = deme.index(slot)
+            deme[position] = immigrant
+
+    def _evolve(self, index, deme, ngen, seed, inboxes, results):
+        try:
+            results.put(self._generations(index, deme, ngen, seed, inboxes))
+        except Exception as exc:
+            # The parent process re-raises the error of the deme
+            try:
+                pickle.dumps(exc)
+            except Exception:
+                exc = RuntimeError("%s: %s" % (type(exc).__name__, exc))
+            results.put((index, exc))
+        # Migrants left in the queues are not needed anymore
+        for inbox in inboxes:
+            inbox.cancel_join_thread()
+
+    def _generations(self, index, deme, ngen, seed, inboxes):
+        random.seed(seed)
+        numpy.random.seed(seed % 2**32)
+        toolbox = self.toolbox
+        halloffame = None
+        if self.halloffame is not None:
+            halloffame = copy.deepcopy(self.halloffame)
+            halloffame.clear()
+        records = []
+
+        for gen in range(ngen + 1):
+            if gen > 0:
+                deme = toolbox.select(deme, len(deme))
+                deme = algorithms.varAnd(deme, toolbox, self.cxpb, self.mutpb)
+
+            invalid_ind = [ind for ind in deme if not ind.fitness.valid]
+            fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+            for ind, fit in zip(invalid_ind, fitnesses):
+                ind.fitness.values = fit
+
+            if halloffame is not None:
+                halloffame.update(deme)
+            record = self.stats.compile(deme) if self.stats is not None else {}
+            records.append(dict(gen=gen, deme=index, nevals=len(invalid_ind), **record))
+
+            if gen > 0 and gen % self.interval == 0 and gen < ngen:
+                self._migrate(index, deme, inboxes)
+
+        return index, deme, records, list(halloffame) if halloffame is not None else []
+
+    def run(self, demes, ngen, verbose=False, poll=1.0):
+        """Evolve the *demes* during *ngen* generations and return the final
+        demes and a :class:`~deap.tools.Logbook` of the evolution.
+
+        :param demes: A list of populations.
+        :param ngen: The number of generation.
+        :param verbose: Whether or not to print the logbook at the end.
+        :param poll: The number of seconds between two checks that the deme
+                     processes are still alive, optional.
+
+        An exception raised in a deme process is raised again by this method
+        and a deme process that dies without returning its results raises a
+        :class:`RuntimeError`. In both cases, the other deme processes are
+        terminated.
+        """
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in demes]
+        results = context.Queue()
+        processes = [context.Process(target=self._evolve,
+                                     args=(i, deme, ngen, random.randrange(2**63), inboxes, results))
+                     for i, deme in enumerate(demes)]
+        for process in processes:
+            process.start()
+
+        # Read the results before joining, the processes block until their
+        # results are consumed
+        final = [None] * len(demes)
+        records = []
+        received = set()
+        # Processes found dead without results, given one more poll for
+        # their last message to arrive
+        suspects = set()
+        try:
+            while len(received) < len(processes):
+                try:
+                    result = results.get(timeout=poll)
+                except queue.Empty:
+                    for index, process in enumerate(processes):
+                        if index in received or process.exitcode is None:
+                            continue
+                        if process.exitcode != 0 or index in suspects:
+                            raise RuntimeError("The process of deme %d died with exit code %d."
+                                               % (index, process.exitcode))
+                        suspects.add(index)
+                    continue
+
+                if len(result) == 2:
+                    raise result[1]
+                index, deme, deme_records, best = result
+                received.add(index)
+                final[index] = deme
+                records.extend(deme_records)
+                if self.halloffame is not None:
+                    self.halloffame.update(best)
+        except BaseException:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'deme', 'nevals'] + (self.stats.fields if self.stats else [])
+        for record in sorted(records, key=itemgetter("gen", "deme")):
+            logbook.record(**record)
+        if verbose:
+            print(logbook)
+        return final, logbook
+
+
+######################################
+# Distributed map                    #
+######################################
+
+class _CreatorPickler(pickle.Pickler):
+    """Pickler replacing the classes made by the :mod:`~deap.creator` with
+    their name, the classes are sent once to each worker."""
+    def __init__(self, file, classes):
+        super(_CreatorPickler, self).__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.classes = classes
+
+    def persistent_id(self, obj):
+        if isinstance(obj, creator.MetaCreator):
+            self.classes[obj.__name__] = obj
+            return obj.__name__
+        return None
+
+
+class _CreatorUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        return getattr(creator, pid)
+
+
+def _dumps(obj, classes, level):
+    buffer = io.BytesIO()
+    _CreatorPickler(buffer, classes).dump(obj)
+    data = buffer.getvalue()
+    if level is not None and len(data) > 1024:
+        return True, zlib.compress(data, level)
+    return False, data
+
+
+def _loads_payload(compressed, data):
+    if compressed:
+        data = zlib.decompress(data)
+    return _CreatorUnpickler(io.BytesIO(data)).load()
+
+
+def worker(address, authkey=b"deap"):
+    """Connect to the :class:`Broker` at *address* and evaluate the tasks it
+    sends until it stops. The functions evaluated must be importable by the
+    worker, which means they cannot be defined in the ``__main__`` module of
+    the master when the worker runs on another machine.
+
+    :param address: The ``(host, port)`` address of the broker.
+    :param authkey: The authentication key of the broker, optional.
+
+    A worker is started on each node with ::
+
+        python -c "from deap import parallel; parallel.worker(('master', 5000), b'secret')"
+    """
+    conn = multiprocessing.connection.Client(tuple(address), authkey=authkey)
+    functions = dict()
+    level = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            kind = message[0]
+            if kind == "stop":
+                return
+            elif kind == "classes":
+                # Unpickling the classes registers them in the creator
+                pickle.loads(message[1])
+            elif kind == "function":
+                _, key, compressed, data, level = message
+                functions[key] = _loads_payload(compressed, data)
+            elif kind == "task":
+                _, batch, key, compressed, data = message
+                try:
+                    func = functions[key]
+                    results = [func(item) for item in _loads_payload(compressed, data)]
+                    conn.send(("result", batch) + _dumps(results, {}, level))
+                except Exception as e:
+                    try:
+                        conn.send(("error", batch, e))
+                    except Exception:
+                        conn.send(("error", batch, RuntimeError(repr(e))))
+    finally:
+        conn.close()
+
+
+class _Remote(object):
+    def __init__(self, conn):
+        self.conn = conn
+        self.classes = set()
+        self.functions = set()
+        self.batches = []
+
+
+class Broker(object):
+    """Map distributing the evaluations over TCP to workers started with
+    :func:`worker`, on the local machine or on other nodes. The population
+    is split in batches of *batch_size* individuals and each worker has up
+    to *prefetch* batches in flight. The classes of the
+    :mod:`~deap.creator` and the evaluation function are sent once to each
+    worker and the payloads are compressed with :mod:`zlib`. When a worker is
+    lost, its batches are issued again to the other workers, and workers can
+    join at any time.
+
+    :param address: The ``(host, port)`` address to listen on, optional. By
+                    default, an available port is chosen on the local host.
+    :param authkey: The key authenticating the workers, optional.
+    :param batch_size: The number of individuals sent in each task,
+                       optional.
+    :param prefetch: The number of tasks sent in advance to each worker,
+                     optional.
+    :param compress: The :mod:`zlib` compression level of the payloads or
+                     :data:`None` to disable compression, optional.
+    :param timeout: The number of seconds a call waits while no worker is
+                    connected before raising a :exc:`RuntimeError`, or
+                    :data:`None` to wait forever, optional.
+
+    The actual address of the broker is given by :attr:`address`. Local
+    workers, for example for tests, are started with
+    :meth:`start_local_workers` ::
+
+        >>> broker = Broker(("0.0.0.0", 5000), authkey=b"secret") # doctest: +SKIP
+        >>> broker.start_local_workers(4)                # doctest: +SKIP
+        >>> toolbox.register("map", broker)              # doctest: +SKIP
+    """
+    def __init__(self, address=("localhost", 0), authkey=b"deap", batch_size=16, prefetch=2,
+                 compress=6, timeout=60.0):
+        self.listener = multiprocessing.connection.Listener(tuple(address), authkey=authkey)
+        self.address = self.listener.address
+        self.authkey = authkey
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.compress = compress
+        self.timeout = timeout
+        self.workers = []
+        self.processes = []
+        self._joining = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                if self._closed:
+                    return
+                continue
+            with self._lock:
+                self._joining.append(_Remote(conn))
+
+    def _join(self):
+        with self._lock:
+            self.workers.extend(self._joining)
+            del self._joining[:]
+
+    def start_local_workers(self, n):
+        """Start *n* worker processes on the local machine."""
+        context = multiprocessing.get_context()
+        for _ in range(n):
+            process = context.Process(target=worker, args=(self.address, self.authkey))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def _send(self, remote, batch, key, function, payload):
+        classes, compressed, data = payload
+        unknown = set(classes) - remote.classes
+        if unknown:
+            remote.conn.send(("classes", pickle.dumps([classes[name] for name in sorted(unknown)])))
+            remote.classes |= unknown
+        if key not in remote.functions:
+            remote.conn.send(("function", key) + function + (self.compress,))
+            remote.functions.add(key)
+        remote.conn.send(("task", batch, key, compressed, data))
+        remote.batches.append(batch)
+
+    def __call__(self, func, iterable):
+        population = list(iterable)
+        nbatches = int(math.ceil(len(population) / float(self.batch_size)))
+        batches = [population[i * self.batch_size:(i + 1) * self.batch_size]
+                   for i in range(nbatches)]
+        payloads = [None] * nbatches
+        results = [None] * nbatches
+        remaining = nbatches
+        pending = deque(range(nbatches))
+
+        function_classes = dict()
+        function = _dumps(func, function_classes, self.compress)
+        key = hashlib.sha1(function[1]).hexdigest()
+
+        deadline = None
+        while remaining > 0:
+            self._join()
+            for remote in list(self.workers):
+                while pending and len(remote.batches) < self.prefetch:
+                    batch = pending.popleft()
+                    if payloads[batch] is None:
+                        classes = dict(function_classes)
+                        payloads[batch] = (classes,) + _dumps(batches[batch], classes, self.compress)
+                    try:
+                        self._send(remote, batch, key, function, payloads[batch])
+                    except (OSError, ValueError):
+                        pending.appendleft(batch)
+                        self._lose(remote, pending)
+                        break
+
+            conns = [remote.conn for remote in self.workers if remote.batches]
+            if not conns:
+                # Wait for workers to join
+                if deadline is None and self.timeout is not None:
+                    deadline = time.perf_counter() + self.timeout
+                elif deadline is not None and time.perf_counter() > deadline:
+                    raise RuntimeError("No worker connected to the broker within %g seconds."
+                                       % self.timeout)
+                time.sleep(0.01)
+                continue
+            deadline = None
+
+            for conn in multiprocessing.connection.wait(conns, 0.1):
+                remote = next(r for r in self.workers if r.conn is conn)
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self._lose(remote, pending)
+                    continue
+                kind, batch = message[:2]
+                remote.batches.remove(batch)
+                if kind == "error":
+                    # Discard the other results of this call
+                    self._flush()
+                    raise message[2]
+                if results[batch] is None:
+                    results[batch] = _loads_payload(*message[2:])
+                    remaining -= 1
+
+        return [value for batch in results for value in batch]
+
+    def _lose(self, remote, pending):
+        """Forget a worker and issue its batches again."""
+        self.workers.remove(remote)
+        pending.extendleft(reversed(remote.batches))
+        remote.conn.close()
+
+    def _flush(self):
+        """Wait for the batches in flight of all the workers."""
+        for remote in list(self.workers):
+            while remote.batches:
+                try:
+                    message = remote.conn.recv()
+                except (EOFError, OSError):
+                    self._lose(remote, deque())
+                    break
+                remote.batches.remove(message[1])
+
+    def close(self):
+        """Stop the workers and the broker."""
+        self._join()
+        for remote in self.workers:
+            try:
+                remote.conn.send(("stop",))
+                remote.conn.close()
+            except (OSError, ValueError):
+                pass
+        self.workers = []
+        self._closed = True
+        self.listener.close()
+        for process in self.processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+######################################
+# Thread map                         #
+######################################
+
+class ThreadMap(SeededMap):
+    """Thread pool map giving each evaluation its own random number
+    generators. As with :class:`~deap.rng.SeededMap`, the *i*-th item of the
+    *n*-th call is evaluated with the stream ``(n, i)`` registered for the
+    current thread. The operators of DEAP draw from these generators, hence
+    the results do not depend on the number of threads or on the
+    scheduling. The individuals are not pickled, which makes this map
+    efficient on free-threaded Python builds or when the evaluation releases
+    the GIL.
+
+    :param threads: The number of threads, optional. It defaults to the
+                    default of :class:`~concurrent.futures.ThreadPoolExecutor`.
+    :param seed: The seed of the generators, optional. By default, it is
+                 drawn from the :mod:`random` module.
+
+    Variations can also be run in the threads, as long as the operators do
+    not share state ::
+
+        >>> tmap = ThreadMap(threads=8, seed=42)         # doctest: +SKIP
+        >>> toolbox.register("map", tmap)                # doctest: +SKIP
+        >>> offspring = toolbox.map(toolbox.mutate, offspring) # doctest: +SKIP
+    """
+    def __init__(self, threads=None, seed=None):
+        self.executor = ThreadPoolExecutor(threads)
+        super(ThreadMap, self).__init__(self.executor.map, seed)
+
+    def close(self):
+        """Stop the threads."""
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _aligned(nbytes):
+    """Round *nbytes* up so that the fitness matrix is aligned on 8 bytes."""
+    return (nbytes + 7) // 8 * 8
+
+
+__all__ = ['SharedMemoryMap', 'BalancedMap', 'LatencyModel', 'TimeoutMap', 'IslandModel', 'Broker', 'worker', 'ThreadMap']
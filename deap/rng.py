@@ -0,0 +1,250 @@
+#    This file is part of DEAP.
+#
+#    DEAP is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of
+#    the License, or (at your option) any later version.
+#
+#    DEAP is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
+
+"""The :mod:`~deap.rng` module holds the random number generators used by
+the operators of DEAP. The operators of the :mod:`~deap.tools` and
+:mod:`~deap.gp` modules and the variations of the :mod:`~deap.algorithms`
+draw their random numbers from :func:`get_rng`, which returns the generator
+registered for the current thread or, by default, the global :mod:`random`
+module. Registering a :class:`random.Random` instance per thread makes the
+operators safe to use concurrently and reproducible ::
+
+    >>> import random
+    >>> from deap import tools
+    >>> with using_rng(random.Random(42)):
+    ...     a = tools.mutFlipBit([0] * 10, indpb=0.5)
+    >>> with using_rng(random.Random(42)):
+    ...     b = tools.mutFlipBit([0] * 10, indpb=0.5)
+    >>> a == b
+    True
+
+The :mod:`~deap.cma` strategies and the operators using NumPy draw from
+:func:`get_numpy_rng`, which returns the registered
+:class:`numpy.random.RandomState` or, by default, the global
+:mod:`numpy.random` module.
+
+For parallel evaluations, :class:`RandomStreams` derives independent
+counter-based streams identified by integers, for example a generation and
+the index of an individual, and :class:`SeededMap` evaluates each individual
+with its own stream so that a run can be replayed regardless of the number
+of workers.
+"""
+
+import hashlib
+import math
+import random
+import struct
+import threading
+
+from contextlib import contextmanager
+
+import numpy
+
+_local = threading.local()
+
+
+def get_rng():
+    """Return the random number generator of the current thread. It is the
+    global :mod:`random` module unless another generator was registered with
+    :func:`set_rng` or :func:`using_rng`."""
+    return getattr(_local, "rng", random)
+
+
+def set_rng(rng):
+    """Register *rng* as the random number generator of the current thread
+    and return the previous one. Registering :data:`None` restores the global
+    :mod:`random` module.
+
+    :param rng: An object with the interface of :class:`random.Random`.
+    """
+    previous = get_rng()
+    if rng is None:
+        _local.__dict__.pop("rng", None)
+    else:
+        _local.rng = rng
+    return previous
+
+
+def get_numpy_rng():
+    """Return the NumPy random number generator of the current thread. It is
+    the global :mod:`numpy.random` module unless another generator was
+    registered with :func:`set_numpy_rng` or :func:`using_rng`."""
+    return getattr(_local, "numpy_rng", numpy.random)
+
+
+def set_numpy_rng(rng):
+    """Register *rng* as the NumPy random number generator of the current
+    thread and return the previous one. Registering :data:`None` restores
+    the global :mod:`numpy.random` module.
+
+    :param rng: A :class:`numpy.random.RandomState`.
+    """
+    previous = get_numpy_rng()
+    if rng is None:
+        _local.__dict__.pop("numpy_rng", None)
+    else:
+        _local.numpy_rng = rng
+    return previous
+
+
+@contextmanager
+def using_rng(rng, numpy_rng=None):
+    """Context manager registering *rng*, and *numpy_rng* when given, as the
+    random number generators of the current thread for the duration of the
+    block.
+
+    :param rng: An object with the interface of :class:`random.Random`.
+    :param numpy_rng: A :class:`numpy.random.RandomState`, optional.
+    """
+    previous = set_rng(rng)
+    if numpy_rng is not None:
+        previous_numpy = set_numpy_rng(numpy_rng)
+    try:
+        yield rng
+    finally:
+        set_rng(previous if previous is not random else None)
+        if numpy_rng is not None:
+            set_numpy_rng(previous_numpy if previous_numpy is not numpy.random else None)
+
+
+class PhiloxRandom(random.Random):
+    """:class:`random.Random` drawing its numbers from the counter-based
+    :class:`numpy.random.Philox` generator. All the methods of
+    :class:`random.Random` are available and two instances with the same
+    *key* produce the same sequence.
+
+    :param key: The integer key of the generator, reduced modulo
+                :math:`2^{128}`.
+    """
+    def __init__(self, key=None):
+        super(PhiloxRandom, self).__init__(key)
+
+    def seed(self, a=None, version=2):
+        self._bitgen = numpy.random.Philox(key=a % 2**128 if a is not None else None)
+        self._buffer = []
+        self.gauss_next = None
+
+    def _raw(self):
+        if not self._buffer:
+            self._buffer = self._bitgen.random_raw(256).tolist()
+            self._buffer.reverse()
+        return self._buffer.pop()
+
+    def random(self):
+        return (self._raw() >> 11) * (1.0 / 9007199254740992.0)
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self._raw() >> (64 - k) if k > 0 else 0
+        words = int(math.ceil(k / 64.0))
+        value = 0
+        for _ in range(words):
+            value = (value << 64) | self._raw()
+        return value >> (words * 64 - k)
+
+    def getstate(self):
+        return self._bitgen.state, list(self._buffer), self.gauss_next
+
+    def setstate(self, state):
+        self._bitgen.state, buffer, self.gauss_next = state
+        self._buffer = list(buffer)
+
+
+class RandomStreams(object):
+    """Factory of independent counter-based random number streams. Each
+    stream is identified by a sequence of integers, for example a generation
+    and the index of an individual, and its key is derived from the *seed*
+    and these integers with a cryptographic hash. The same identifiers
+    always give the same stream.
+
+    :param seed: The integer seed of the run. The seed and the identifiers
+                 are reduced modulo :math:`2^{64}`.
+
+    ::
+
+        >>> streams = RandomStreams(42)
+        >>> streams.random(3, 14).random() == streams.random(3, 14).random()
+        True
+        >>> with streams.using(3, 14):
+        ...     value = get_rng().random()
+    """
+    def __init__(self, seed):
+        self.seed = seed
+
+    def key(self, *ids):
+        """Return the 128 bits key of the stream *ids*."""
+        data = struct.pack("<%dQ" % (len(ids) + 1), *(i % 2**64 for i in (self.seed,) + ids))
+        return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "little")
+
+    def random(self, *ids):
+        """Return a :class:`PhiloxRandom` for the stream *ids*."""
+        return PhiloxRandom(self.key(*ids))
+
+    def numpy(self, *ids):
+        """Return a :class:`numpy.random.RandomState` for the stream *ids*.
+        It is independent from the generator returned by :meth:`random`."""
+        return numpy.random.RandomState(numpy.random.Philox(key=self.key(-1, *ids)))
+
+    def using(self, *ids):
+        """Return a context manager registering the generators of the stream
+        *ids* for the current thread, see :func:`using_rng`."""
+        return using_rng(self.random(*ids), self.numpy(*ids))
+
+
+class _SeededCall(object):
+    def __init__(self, func, streams, ncall):
+        self.func = func
+        self.streams = streams
+        self.ncall = ncall
+
+    def __call__(self, item):
+        index, args = item
+        with self.streams.using(self.ncall, index):
+            return self.func(*args)
+
+
+class SeededMap(object):
+    """Map evaluating each item with its own random number streams. The
+    *i*-th item of the *n*-th call is evaluated with the generators of the
+    stream ``(n, i)`` of :class:`RandomStreams` registered, both for
+    :func:`get_rng` and :func:`get_numpy_rng`. Since the streams do not
+    depend on where an item is evaluated, a parallel run gives the same
+    results with any number of workers.
+
+    :param map: The map distributing the evaluations, for example
+                :meth:`multiprocessing.pool.Pool.map`, optional.
+    :param seed: The seed of the run, optional. By default, it is drawn from
+                 the :mod:`random` module.
+
+    The function and the items are sent to the workers by the underlying
+    map and must be picklable with a process pool ::
+
+        >>> pool = multiprocessing.Pool()                # doctest: +SKIP
+        >>> toolbox.register("map", SeededMap(pool.map, seed=42)) # doctest: +SKIP
+    """
+    def __init__(self, map=map, seed=None):
+        self.map = map
+        self.streams = RandomStreams(seed if seed is not None else random.randrange(2**63))
+        self.ncalls = 0
+
+    def __call__(self, func, *iterables):
+        ncall = self.ncalls
+        self.ncalls += 1
+        items = list(enumerate(zip(*iterables)))
+        return list(self.map(_SeededCall(func, self.streams, ncall), items))
+
+
+__all__ = ['get_rng', 'set_rng', 'get_numpy_rng', 'set_numpy_rng', 'using_rng',
+           'PhiloxRandom', 'RandomStreams', 'SeededMap']
@@ -17,9 +17,11 @@ algorithms. They are used to modify, select and move the individuals in their
 environment. The set of operators it contains are readily usable in the
 :class:`~deap.base.Toolbox`. In addition to the basic operators this module
 also contains utility tools to enhance the basic algorithms with
-:class:`Statistics`, :class:`HallOfFame`, and :class:`History`.
+:class:`Statistics`, :class:`HallOfFame`, :class:`History` and
+:class:`Checkpoint`.
 """
 
+from .checkpoint import *
 from .constraint import *
 from .crossover import *
 from .emo import *
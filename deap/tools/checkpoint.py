@@ -0,0 +1,237 @@
+import os
+import pickle
+import random
+import shutil
+
+import numpy
+
+
+class Checkpoint(object):
+    """Save and restore the state of an evolution in a *directory*. Each
+    snapshot is a sub-directory named after its generation containing the
+    genomes and the weighted fitness values of the population as binary
+    NumPy matrices, and a pickle with the other objects (hall of fame,
+    logbook, strategy, ...) and the states of the :mod:`random` and
+    :mod:`numpy.random` generators.
+
+    :param directory: The directory where the snapshots are written. It is
+                      created if it does not exist.
+    :param freq: The number of generations between two snapshots when used
+                 in the algorithms, optional.
+    :param full_every: Every *full_every* snapshot is a full snapshot, the
+                       others only store the rows of the population that
+                       differ from the last full snapshot, optional. It
+                       defaults to 1 (every snapshot is full).
+    :param keep: The number of snapshots to keep on disk, optional. The full
+                 snapshots referenced by kept differential snapshots are
+                 also kept. By default, all the snapshots are kept.
+
+    The population is stored as a matrix only when all the individuals are
+    sequences of numbers of the same length whose only attribute is their
+    fitness, otherwise the individuals are pickled. The algorithms of the
+    :mod:`~deap.algorithms` module accept a checkpoint and resume from its
+    latest snapshot when there is one. It can also be used directly ::
+
+        >>> checkpoint = Checkpoint("run", freq=10)              # doctest: +SKIP
+        >>> checkpoint.save(gen, population=pop, strategy=strategy) # doctest: +SKIP
+        >>> state = checkpoint.load()                           # doctest: +SKIP
+        >>> pop, strategy = state["population"], state["strategy"] # doctest: +SKIP
+    """
+    def __init__(self, directory, freq=1, full_every=1, keep=None):
+        self.directory = directory
+        self.freq = freq
+        self.full_every = full_every
+        self.keep = keep
+        self.nsaves = 0
+        self._base = None
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, generation):
+        return os.path.join(self.directory, "gen_%08d" % generation)
+
+    def generations(self):
+        """Return the sorted list of the generations having a snapshot."""
+        return sorted(int(name[4:]) for name in os.listdir(self.directory)
+                      if name.startswith("gen_") and name[4:].isdigit())
+
+    def latest(self):
+        """Return the generation of the latest snapshot or :data:`None` if
+        there is none."""
+        generations = self.generations()
+        return generations[-1] if len(generations) > 0 else None
+
+    def save(self, generation, population=None, **objects):
+        """Write a snapshot of the evolution at *generation*.
+
+        :param generation: The generation number.
+        :param population: A list of individuals, optional.
+        :param objects: Other picklable objects to save with the snapshot
+                        (for example ``halloffame``, ``logbook`` or
+                        ``strategy``), optional.
+        """
+        path = self._path(generation)
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        state = dict(generation=generation, objects=objects,
+                     random_state=random.getstate(),
+                     numpy_state=numpy.random.get_state(),
+                     base=None, layout=None)
+
+        if population is not None:
+            genomes = _numeric_matrix(population)
+            if genomes is None:
+                state["layout"] = "pickle"
+                state["population"] = population
+            else:
+                state["layout"] = "matrix"
+                state["ind_class"] = type(population[0])
+                valid, wvalues = _fitness_matrix(population)
+                full = self._base is None or self.nsaves % self.full_every == 0 \
+                    or self._base[1].shape != genomes.shape \
+                    or self._base[3].shape != wvalues.shape
+                if full:
+                    self._base = (generation, genomes, valid, wvalues)
+                    rows = numpy.arange(len(genomes))
+                else:
+                    state["base"] = self._base[0]
+                    rows = numpy.flatnonzero(numpy.any(genomes != self._base[1], axis=1)
+                                             | (valid != self._base[2])
+                                             | numpy.any(wvalues != self._base[3], axis=1))
+                    numpy.save(os.path.join(tmp_path, "rows.npy"), rows)
+                numpy.save(os.path.join(tmp_path, "genomes.npy"), genomes[rows])
+                numpy.save(os.path.join(tmp_path, "valid.npy"), valid[rows])
+                numpy.save(os.path.join(tmp_path, "wvalues.npy"), wvalues[rows])
+
+        with open(os.path.join(tmp_path, "state.pkl"), "wb") as f:
+            pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+        self.nsaves += 1
+        self._prune()
+
+    def _prune(self):
+        if self.keep is None:
+            return
+        generations = self.generations()
+        kept = set(generations[-self.keep:])
+        for generation in list(kept):
+            base = self._read_state(generation)["base"]
+            if base is not None:
+                kept.add(base)
+        for generation in generations:
+            if generation not in kept:
+                shutil.rmtree(self._path(generation))
+
+    def _read_state(self, generation):
+        with open(os.path.join(self._path(generation), "state.pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def _read_matrices(self, generation, mmap):
+        mmap_mode = "r" if mmap else None
+        path = self._path(generation)
+        return tuple(numpy.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+                     for name in ("genomes", "valid", "wvalues"))
+
+    def load(self, generation=None, mmap=False, restore_random=True):
+        """Read a snapshot and return its content as a dictionary with the
+        keys ``"generation"`` and ``"population"``, and the other objects
+        given to :meth:`save`. When the population was saved as a matrix, the
+        dictionary also contains the ``"genomes"`` and ``"wvalues"`` matrices.
+
+        :param generation: The generation to load, optional. It defaults to
+                           the latest snapshot.
+        :param mmap: Whether or not to memory-map the matrices of a full
+                     snapshot instead of reading them, optional.
+        :param restore_random: Whether or not to restore the states of the
+                               :mod:`random` and :mod:`numpy.random`
+                               generators, optional. It defaults to
+                               :data:`True`.
+        """
+        if generation is None:
+            generation = self.latest()
+            if generation is None:
+                raise FileNotFoundError("No snapshot in %r." % self.directory)
+
+        state = self._read_state(generation)
+        result = dict(state["objects"])
+        result["generation"] = state["generation"]
+        result["population"] = state.get("population")
+
+        if state["layout"] == "matrix":
+            if state["base"] is None:
+                genomes, valid, wvalues = self._read_matrices(generation, mmap)
+            else:
+                genomes, valid, wvalues = (numpy.array(m) for m in
+                                           self._read_matrices(state["base"], False))
+                rows = numpy.load(os.path.join(self._path(generation), "rows.npy"))
+                for matrix, diff in zip((genomes, valid, wvalues),
+                                        self._read_matrices(generation, False)):
+                    matrix[rows] = diff
+            result["genomes"], result["wvalues"] = genomes, wvalues
+            result["population"] = _individuals(state["ind_class"], genomes, valid, wvalues)
+
+            # Differential snapshots can continue from this one, the memory
+            # mapped matrices are compared without being read in memory
+            self._base = (generation, genomes, valid, wvalues)
+
+        if restore_random:
+            random.setstate(state["random_state"])
+            numpy.random.set_state(state["numpy_state"])
+
+        return result
+
+
+def _numeric_matrix(population):
+    """Return the genomes of *population* as a 2D numeric array or
+    :data:`None` if it cannot be represented as such. The individuals must
+    all be of the same class and have no attribute other than their fitness,
+    so that they can be rebuilt from their rows. The genes of sequences
+    other than arrays must all be of the same type, numpy would otherwise
+    convert, for example, mixed integers and floats to floats."""
+    if len(population) == 0:
+        return None
+    ind_class = type(population[0])
+    for ind in population:
+        if type(ind) is not ind_class or set(getattr(ind, "__dict__", ())) - {"fitness"}:
+            return None
+    try:
+        genomes = numpy.asarray(population)
+    except (ValueError, TypeError):
+        return None
+    if genomes.ndim != 2 or genomes.dtype.kind not in "biuf":
+        return None
+    if not issubclass(ind_class, numpy.ndarray) \
+            and len(set(type(x) for ind in population for x in ind)) > 1:
+        return None
+    return genomes
+
+
+def _fitness_matrix(population):
+    valid = numpy.array([ind.fitness.valid for ind in population], dtype=bool)
+    nobj = len(population[0].fitness.weights)
+    # Invalid rows are zeros so that unchanged rows compare equal
+    wvalues = numpy.zeros((len(population), nobj))
+    for i, ind in enumerate(population):
+        if valid[i]:
+            wvalues[i] = ind.fitness.wvalues
+    return valid, wvalues
+
+
+def _individuals(ind_class, genomes, valid, wvalues):
+    population = list()
+    arrays = issubclass(ind_class, numpy.ndarray)
+    for genome, is_valid, wvalue in zip(genomes, valid, wvalues):
+        ind = ind_class(genome if arrays else genome.tolist())
+        if is_valid:
+            ind.fitness.wvalues = tuple(wvalue.tolist())
+        population.append(ind)
+    return population
+
+
+__all__ = ['Checkpoint']
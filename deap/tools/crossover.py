@@ -1,4 +1,3 @@
-import random
 import warnings
 
 try:
@@ -8,6 +7,8 @@ except ImportError:
 
 from itertools import repeat
 
+from ..rng import get_rng
+
 
 ######################################
 # GA Crossovers                      #
@@ -23,11 +24,12 @@ def cxOnePoint(ind1, ind2):
     :param ind2: The second individual participating in the crossover.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.randint` function from the
-    python base :mod:`random` module.
+    This function uses the :func:`~random.randint` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
-    cxpoint = random.randint(1, size - 1)
+    cxpoint = rng.randint(1, size - 1)
     ind1[cxpoint:], ind2[cxpoint:] = ind2[cxpoint:], ind1[cxpoint:]
 
     return ind1, ind2
@@ -42,12 +44,13 @@ def cxTwoPoint(ind1, ind2):
     :param ind2: The second individual participating in the crossover.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.randint` function from the Python
-    base :mod:`random` module.
+    This function uses the :func:`~random.randint` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
-    cxpoint1 = random.randint(1, size)
-    cxpoint2 = random.randint(1, size - 1)
+    cxpoint1 = rng.randint(1, size)
+    cxpoint2 = rng.randint(1, size - 1)
     if cxpoint2 >= cxpoint1:
         cxpoint2 += 1
     else:  # Swap the two cx points
@@ -79,12 +82,13 @@ def cxUniform(ind1, ind2, indpb):
     :param indpb: Independent probability for each attribute to be exchanged.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
     for i in range(size):
-        if random.random() < indpb:
+        if rng.random() < indpb:
             ind1[i], ind2[i] = ind2[i], ind1[i]
 
     return ind1, ind2
@@ -104,12 +108,13 @@ def cxPartialyMatched(ind1, ind2):
     pairs of values in a certain range of the two parents and swapping the values
     of those indexes. For more details see [Goldberg1985]_.
 
-    This function uses the :func:`~random.randint` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.randint` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
 
     .. [Goldberg1985] Goldberg and Lingel, "Alleles, loci, and the traveling
        salesman problem", 1985.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
     p1, p2 = [0] * size, [0] * size
 
@@ -118,8 +123,8 @@ def cxPartialyMatched(ind1, ind2):
         p1[ind1[i]] = i
         p2[ind2[i]] = i
     # Choose crossover points
-    cxpoint1 = random.randint(0, size)
-    cxpoint2 = random.randint(0, size - 1)
+    cxpoint1 = rng.randint(0, size)
+    cxpoint2 = rng.randint(0, size - 1)
     if cxpoint2 >= cxpoint1:
         cxpoint2 += 1
     else:  # Swap the two cx points
@@ -156,11 +161,13 @@ def cxUniformPartialyMatched(ind1, ind2, indpb):
     [Cicirello2000]_.
 
     This function uses the :func:`~random.random` and :func:`~random.randint`
-    functions from the python base :mod:`random` module.
+    functions of the thread-local generator of :mod:`deap.rng`, see
+    :func:`~deap.rng.get_rng`.
 
     .. [Cicirello2000] Cicirello and Smith, "Modeling GA performance for
        control parameter optimization", 2000.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
     p1, p2 = [0] * size, [0] * size
 
@@ -170,7 +177,7 @@ def cxUniformPartialyMatched(ind1, ind2, indpb):
         p2[ind2[i]] = i
 
     for i in range(size):
-        if random.random() < indpb:
+        if rng.random() < indpb:
             # Keep track of the selected values
             temp1 = ind1[i]
             temp2 = ind2[i]
@@ -201,14 +208,15 @@ def cxOrdered(ind1, ind2):
     them with the removed elements in order. For more details see
     [Goldberg1989]_.
 
-    This function uses the :func:`~random.sample` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.sample` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
 
     .. [Goldberg1989] Goldberg. Genetic algorithms in search,
        optimization and machine learning. Addison Wesley, 1989
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
-    a, b = random.sample(range(size), 2)
+    a, b = rng.sample(range(size), 2)
     if a > b:
         a, b = b, a
 
@@ -248,11 +256,12 @@ def cxBlend(ind1, ind2, alpha):
                   for each attribute on both side of the parents' attributes.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     for i, (x1, x2) in enumerate(zip(ind1, ind2)):
-        gamma = (1. + 2. * alpha) * random.random() - alpha
+        gamma = (1. + 2. * alpha) * rng.random() - alpha
         ind1[i] = (1. - gamma) * x1 + gamma * x2
         ind2[i] = gamma * x1 + (1. - gamma) * x2
 
@@ -271,11 +280,12 @@ def cxSimulatedBinary(ind1, ind2, eta):
                 produce solutions much more different.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     for i, (x1, x2) in enumerate(zip(ind1, ind2)):
-        rand = random.random()
+        rand = rng.random()
         if rand <= 0.5:
             beta = 2. * rand
         else:
@@ -303,13 +313,14 @@ def cxSimulatedBinaryBounded(ind1, ind2, eta, low, up):
                bound of the search space.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
 
     .. note::
        This implementation is similar to the one implemented in the
        original NSGA-II C code presented by Deb.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
     if not isinstance(low, Sequence):
         low = repeat(low, size)
@@ -321,13 +332,13 @@ def cxSimulatedBinaryBounded(ind1, ind2, eta, low, up):
         raise IndexError("up must be at least the size of the shorter individual: %d < %d" % (len(up), size))
 
     for i, xl, xu in zip(range(size), low, up):
-        if random.random() <= 0.5:
+        if rng.random() <= 0.5:
             # This epsilon should probably be changed for 0 since
             # floating point arithmetic in Python is safer
             if abs(ind1[i] - ind2[i]) > 1e-14:
                 x1 = min(ind1[i], ind2[i])
                 x2 = max(ind1[i], ind2[i])
-                rand = random.random()
+                rand = rng.random()
 
                 beta = 1.0 + (2.0 * (x1 - xl) / (x2 - x1))
                 alpha = 2.0 - beta ** -(eta + 1)
@@ -349,7 +360,7 @@ def cxSimulatedBinaryBounded(ind1, ind2, eta, low, up):
                 c1 = min(max(c1, xl), xu)
                 c2 = min(max(c2, xl), xu)
 
-                if random.random() <= 0.5:
+                if rng.random() <= 0.5:
                     ind1[i] = c2
                     ind2[i] = c1
                 else:
@@ -372,11 +383,12 @@ def cxMessyOnePoint(ind1, ind2):
     :param ind2: The second individual participating in the crossover.
     :returns: A tuple of two individuals.
 
-    This function uses the :func:`~random.randint` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.randint` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
-    cxpoint1 = random.randint(0, len(ind1))
-    cxpoint2 = random.randint(0, len(ind2))
+    rng = get_rng()
+    cxpoint1 = rng.randint(0, len(ind1))
+    cxpoint2 = rng.randint(0, len(ind2))
     ind1[cxpoint1:], ind2[cxpoint2:] = ind2[cxpoint2:], ind1[cxpoint1:]
 
     return ind1, ind2
@@ -398,17 +410,18 @@ def cxESBlend(ind1, ind2, alpha):
                   for each attribute on both side of the parents' attributes.
     :returns: A tuple of two evolution strategies.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     for i, (x1, s1, x2, s2) in enumerate(zip(ind1, ind1.strategy,
                                              ind2, ind2.strategy)):
         # Blend the values
-        gamma = (1. + 2. * alpha) * random.random() - alpha
+        gamma = (1. + 2. * alpha) * rng.random() - alpha
         ind1[i] = (1. - gamma) * x1 + gamma * x2
         ind2[i] = gamma * x1 + (1. - gamma) * x2
         # Blend the strategies
-        gamma = (1. + 2. * alpha) * random.random() - alpha
+        gamma = (1. + 2. * alpha) * rng.random() - alpha
         ind1.strategy[i] = (1. - gamma) * s1 + gamma * s2
         ind2.strategy[i] = gamma * s1 + (1. - gamma) * s2
 
@@ -425,13 +438,14 @@ def cxESTwoPoint(ind1, ind2):
     :param ind2: The second evolution strategy participating in the crossover.
     :returns: A tuple of two evolution strategies.
 
-    This function uses the :func:`~random.randint` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.randint` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = min(len(ind1), len(ind2))
 
-    pt1 = random.randint(1, size)
-    pt2 = random.randint(1, size - 1)
+    pt1 = rng.randint(1, size)
+    pt2 = rng.randint(1, size - 1)
     if pt2 >= pt1:
         pt2 += 1
     else:  # Swap the two cx points
@@ -1,12 +1,14 @@
 import bisect
 from collections import defaultdict, namedtuple
-from itertools import chain
+from functools import lru_cache
+from itertools import chain, combinations
 import math
 from operator import attrgetter, itemgetter
-import random
 
 import numpy
 
+from ..rng import get_numpy_rng, get_rng
+
 ######################################
 # Non-Dominated Sorting   (NSGA-II)  #
 ######################################
@@ -162,6 +164,7 @@ def selTournamentDCD(individuals, k):
               to len(individuals).
     :returns: A list of selected individuals.
     """
+    rng = get_rng()
 
     if k > len(individuals):
         raise ValueError("selTournamentDCD: k must be less than or equal to individuals length")
@@ -170,6 +173,7 @@ def selTournamentDCD(individuals, k):
         raise ValueError("selTournamentDCD: k must be divisible by four if k == len(individuals)")
 
     def tourn(ind1, ind2):
+        rng = get_rng()
         if ind1.fitness.dominates(ind2.fitness):
             return ind1
         elif ind2.fitness.dominates(ind1.fitness):
@@ -180,12 +184,12 @@ def selTournamentDCD(individuals, k):
         elif ind1.fitness.crowding_dist > ind2.fitness.crowding_dist:
             return ind1
 
-        if random.random() <= 0.5:
+        if rng.random() <= 0.5:
             return ind1
         return ind2
 
-    individuals_1 = random.sample(individuals, len(individuals))
-    individuals_2 = random.sample(individuals, len(individuals))
+    individuals_1 = rng.sample(individuals, len(individuals))
+    individuals_2 = rng.sample(individuals, len(individuals))
 
     chosen = []
     for i in range(0, k, 4):
@@ -638,6 +642,7 @@ def associate_to_niche(fitnesses, reference_points, best_point, intercepts):
 
 
 def niching(individuals, k, niches, distances, niche_counts):
+    rng = get_numpy_rng()
     selected = []
     available = numpy.ones(len(individuals), dtype=bool)
     while len(selected) < k:
@@ -651,13 +656,13 @@ def niching(individuals, k, niches, distances, niche_counts):
 
         # Select at most n niches with the minimum count
         selected_niches = numpy.flatnonzero(numpy.logical_and(available_niches, niche_counts == min_count))
-        numpy.random.shuffle(selected_niches)
+        rng.shuffle(selected_niches)
         selected_niches = selected_niches[:n]
 
         for niche in selected_niches:
             # Select from available individuals in niche
             niche_individuals = numpy.flatnonzero(numpy.logical_and(niches == niche, available))
-            numpy.random.shuffle(niche_individuals)
+            rng.shuffle(niche_individuals)
 
             # If no individual in that niche, select the closest to reference
             # Else select randomly
@@ -678,26 +683,152 @@ def uniform_reference_points(nobj, p=4, scaling=None):
     """Generate reference points uniformly on the hyperplane intersecting
     each axis at 1. The scaling factor is used to combine multiple layers of
     reference points.
+
+    The points are the Das and Dennis simplex-lattice design, they are built
+    in a single vectorized pass from the combinations of the lattice and
+    cached on ``(nobj, p, scaling)`` so that repeated calls are free. The
+    returned array is a copy that can be safely modified.
+
+    :param nobj: Number of objectives.
+    :param p: Number of divisions along each objective.
+    :param scaling: Scaling factor applied to the points towards the
+                    centroid of the hyperplane, optional.
+    :returns: An array of shape ``(comb(nobj + p - 1, p), nobj)``.
     """
-    def gen_refs_recursive(ref, nobj, left, total, depth):
-        points = []
-        if depth == nobj - 1:
-            ref[depth] = left / total
-            points.append(ref)
-        else:
-            for i in range(left + 1):
-                ref[depth] = i / total
-                points.extend(gen_refs_recursive(ref.copy(), nobj, left - i, total, depth + 1))
-        return points
+    return _uniform_reference_points(nobj, p, scaling).copy()
+
+
+@lru_cache(maxsize=32)
+def _uniform_reference_points(nobj, p, scaling):
+    # Stars and bars: each combination of nobj - 1 bar positions among
+    # p + nobj - 1 slots gives one lattice point. Combinations are produced in
+    # lexicographic order which preserves the historical order of the points.
+    nslots = p + nobj - 1
+    count = math.comb(nslots, nobj - 1)
+    bars = numpy.fromiter(chain.from_iterable(combinations(range(nslots), nobj - 1)),
+                          dtype=numpy.int64, count=count * (nobj - 1))
+    bars = bars.reshape(count, nobj - 1)
+    bounds = numpy.empty((count, nobj + 1), dtype=numpy.int64)
+    bounds[:, 0] = -1
+    bounds[:, 1:-1] = bars
+    bounds[:, -1] = nslots
+    ref_points = (numpy.diff(bounds, axis=1) - 1) / p
 
-    ref_points = numpy.array(gen_refs_recursive(numpy.zeros(nobj), nobj, p, p, 0))
     if scaling is not None:
         ref_points *= scaling
         ref_points += (1 - scaling) / nobj
 
+    ref_points.flags.writeable = False
     return ref_points
 
 
+def two_layer_reference_points(nobj, p_boundary, p_inner, scaling=0.5):
+    """Generate the two-layer reference points proposed in [Deb2014]_ for
+    many-objective problems. A boundary layer with *p_boundary* divisions is
+    combined with an inner layer of *p_inner* divisions shrunk by *scaling*
+    towards the centroid of the hyperplane. This allows a reasonable number
+    of points with an inner coverage when the number of objectives is large
+    (when *p_boundary* is smaller than *nobj*, a single layer does not contain
+    any interior point).
+
+    :param nobj: Number of objectives.
+    :param p_boundary: Number of divisions of the boundary layer.
+    :param p_inner: Number of divisions of the inner layer.
+    :param scaling: Scaling factor of the inner layer, optional.
+    :returns: An array containing the boundary layer followed by the inner
+              layer, duplicates removed.
+
+    ::
+
+        >>> two_layer_reference_points(nobj=10, p_boundary=3, p_inner=2).shape
+        (275, 10)
+    """
+    boundary = _uniform_reference_points(nobj, p_boundary, None)
+    inner = _uniform_reference_points(nobj, p_inner, scaling)
+    ref_points = numpy.concatenate((boundary, inner), axis=0)
+    _, uniques = numpy.unique(ref_points.round(12), axis=0, return_index=True)
+    return ref_points[numpy.sort(uniques)]
+
+
+def riesz_reference_points(nobj, n, s=None, ngen=500, seed=1):
+    """Generate *n* well spread reference points on the hyperplane
+    intersecting each axis at 1 by minimizing their Riesz *s*-energy
+    [Blank2021]_. Contrary to :func:`uniform_reference_points`, the number of
+    points can be chosen arbitrarily. The optimization starts from random
+    points with the *nobj* extreme points fixed and uses a projected gradient
+    descent with an adaptive step. The result is deterministic for a given
+    *seed* and is cached on ``(nobj, n, s, ngen, seed)``.
+
+    :param nobj: Number of objectives.
+    :param n: Number of reference points (at least *nobj*).
+    :param s: Energy exponent, optional. It defaults to *nobj*.
+    :param ngen: Number of gradient steps, optional.
+    :param seed: Seed of the random initialization, optional.
+    :returns: An array of shape ``(n, nobj)``.
+
+    .. [Blank2021] Blank, Deb, Dhebar, Bandaru and Seada, "Generating
+       well-spaced points on a unit simplex for evolutionary many-objective
+       optimization", IEEE Transactions on Evolutionary Computation, 2021.
+    """
+    if n < nobj:
+        raise ValueError("riesz_reference_points: the number of points must "
+                         "be at least the number of objectives.")
+    if s is None:
+        s = nobj
+    return _riesz_reference_points(nobj, n, s, ngen, seed).copy()
+
+
+@lru_cache(maxsize=32)
+def _riesz_reference_points(nobj, n, s, ngen, seed):
+    rng = numpy.random.RandomState(seed)
+    points = numpy.concatenate((numpy.eye(nobj),
+                                rng.dirichlet(numpy.ones(nobj), n - nobj)), axis=0)
+    free = slice(nobj, None)
+
+    def energy_and_grad(x):
+        diff = x[:, numpy.newaxis, :] - x[numpy.newaxis, :, :]
+        dist = numpy.sqrt(numpy.sum(diff ** 2, axis=2))
+        numpy.fill_diagonal(dist, numpy.inf)
+        inv = dist ** -s
+        energy = numpy.sum(numpy.triu(inv, 1))
+        grad = -s * numpy.sum(diff * (inv / dist ** 2)[:, :, numpy.newaxis], axis=1)
+        return energy, grad
+
+    energy, grad = energy_and_grad(points)
+    step = 1.0 / n
+    # Without free points, the extreme points are the result
+    for _ in range(ngen if n > nobj else 0):
+        # Keep the movement inside the hyperplane and normalize its length
+        direction = grad[free] - numpy.mean(grad[free], axis=1, keepdims=True)
+        norm = numpy.max(numpy.linalg.norm(direction, axis=1))
+        if norm == 0:
+            break
+        candidate = points.copy()
+        candidate[free] = _project_simplex(points[free] - step * direction / norm)
+        cenergy, cgrad = energy_and_grad(candidate)
+        if cenergy < energy:
+            points, energy, grad = candidate, cenergy, cgrad
+            step *= 1.1
+        else:
+            step *= 0.5
+            if step < 1e-10:
+                break
+
+    points.flags.writeable = False
+    return points
+
+
+def _project_simplex(points):
+    """Euclidean projection of each row of *points* on the unit simplex."""
+    nobj = points.shape[1]
+    u = -numpy.sort(-points, axis=1)
+    css = numpy.cumsum(u, axis=1) - 1
+    ind = numpy.arange(1, nobj + 1)
+    rho = numpy.count_nonzero(u - css / ind > 0, axis=1)
+    theta = css[numpy.arange(points.shape[0]), rho - 1] / rho
+    return numpy.maximum(points - theta[:, numpy.newaxis], 0)
+
+
 ######################################
 # Strength Pareto         (SPEA-II)  #
 ######################################
@@ -836,7 +967,8 @@ def _randomizedSelect(array, begin, end, i):
 
 
 def _randomizedPartition(array, begin, end):
-    i = random.randint(begin, end)
+    rng = get_rng()
+    i = rng.randint(begin, end)
     array[begin], array[i] = array[i], array[begin]
     return _partition(array, begin, end)
 
@@ -859,4 +991,5 @@ def _partition(array, begin, end):
 
 
 __all__ = ['selNSGA2', 'selNSGA3', 'selNSGA3WithMemory', 'selSPEA2', 'sortNondominated', 'sortLogNondominated',
-           'selTournamentDCD', 'uniform_reference_points']
+           'selTournamentDCD', 'uniform_reference_points', 'two_layer_reference_points',
+           'riesz_reference_points']
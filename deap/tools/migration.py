@@ -43,8 +43,13 @@ def migRing(populations, k, selection, replacement=None, migarray=None):
             immigrants[from_deme].extend(replacement(populations[from_deme], k))
 
     for from_deme, to_deme in enumerate(migarray):
+        # Locate the replaced individuals by identity, falling back on an
+        # equality search for individuals not taken from the population
+        positions = {id(ind): i for i, ind in enumerate(populations[to_deme])}
         for i, immigrant in enumerate(immigrants[to_deme]):
-            indx = populations[to_deme].index(immigrant)
+            indx = positions.get(id(immigrant))
+            if indx is None:
+                indx = populations[to_deme].index(immigrant)
             populations[to_deme][indx] = emigrants[from_deme][i]
 
 
@@ -1,5 +1,4 @@
 import math
-import random
 
 from itertools import repeat
 
@@ -8,6 +7,8 @@ try:
 except ImportError:
     from collections import Sequence
 
+from ..rng import get_rng
+
 ######################################
 # GA Mutations                       #
 ######################################
@@ -28,8 +29,10 @@ def mutGaussian(individual, mu, sigma, indpb):
     :returns: A tuple of one individual.
 
     This function uses the :func:`~random.random` and :func:`~random.gauss`
-    functions from the python base :mod:`random` module.
+    functions of the thread-local generator of :mod:`deap.rng`, see
+    :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = len(individual)
     if not isinstance(mu, Sequence):
         mu = repeat(mu, size)
@@ -41,8 +44,8 @@ def mutGaussian(individual, mu, sigma, indpb):
         raise IndexError("sigma must be at least the size of individual: %d < %d" % (len(sigma), size))
 
     for i, m, s in zip(range(size), mu, sigma):
-        if random.random() < indpb:
-            individual[i] += random.gauss(m, s)
+        if rng.random() < indpb:
+            individual[i] += rng.gauss(m, s)
 
     return individual,
 
@@ -62,6 +65,7 @@ def mutPolynomialBounded(individual, eta, low, up, indpb):
     :param indpb: Independent probability for each attribute to be mutated.
     :returns: A tuple of one individual.
     """
+    rng = get_rng()
     size = len(individual)
     if not isinstance(low, Sequence):
         low = repeat(low, size)
@@ -73,11 +77,11 @@ def mutPolynomialBounded(individual, eta, low, up, indpb):
         raise IndexError("up must be at least the size of individual: %d < %d" % (len(up), size))
 
     for i, xl, xu in zip(range(size), low, up):
-        if random.random() <= indpb:
+        if rng.random() <= indpb:
             x = individual[i]
             delta_1 = (x - xl) / (xu - xl)
             delta_2 = (xu - x) / (xu - xl)
-            rand = random.random()
+            rand = rng.random()
             mut_pow = 1.0 / (eta + 1.)
 
             if rand < 0.5:
@@ -107,12 +111,14 @@ def mutShuffleIndexes(individual, indpb):
     :returns: A tuple of one individual.
 
     This function uses the :func:`~random.random` and :func:`~random.randint`
-    functions from the python base :mod:`random` module.
+    functions of the thread-local generator of :mod:`deap.rng`, see
+    :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = len(individual)
     for i in range(size):
-        if random.random() < indpb:
-            swap_indx = random.randint(0, size - 2)
+        if rng.random() < indpb:
+            swap_indx = rng.randint(0, size - 2)
             if swap_indx >= i:
                 swap_indx += 1
             individual[i], individual[swap_indx] = \
@@ -132,11 +138,12 @@ def mutFlipBit(individual, indpb):
     :param indpb: Independent probability for each attribute to be flipped.
     :returns: A tuple of one individual.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     for i in range(len(individual)):
-        if random.random() < indpb:
+        if rng.random() < indpb:
             individual[i] = type(individual[i])(not individual[i])
 
     return individual,
@@ -156,6 +163,7 @@ def mutUniformInt(individual, low, up, indpb):
     :param indpb: Independent probability for each attribute to be mutated.
     :returns: A tuple of one individual.
     """
+    rng = get_rng()
     size = len(individual)
     if not isinstance(low, Sequence):
         low = repeat(low, size)
@@ -167,8 +175,8 @@ def mutUniformInt(individual, low, up, indpb):
         raise IndexError("up must be at least the size of individual: %d < %d" % (len(up), size))
 
     for i, xl, xu in zip(range(size), low, up):
-        if random.random() < indpb:
-            individual[i] = random.randint(xl, xu)
+        if rng.random() < indpb:
+            individual[i] = rng.randint(xl, xu)
 
     return individual,
 
@@ -183,15 +191,16 @@ def mutInversion(individual):
     :param individual: Individual to be mutated.
     :returns: A tuple of one individual.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     size = len(individual)
     if size == 0:
         return individual,
 
-    index_one = random.randrange(size)
-    index_two = random.randrange(size)
+    index_one = rng.randrange(size)
+    index_two = rng.randrange(size)
     start_index = min(index_one, index_two)
     end_index = max(index_one, index_two)
 
@@ -229,16 +238,17 @@ def mutESLogNormal(individual, c, indpb):
     .. [Schwefel1995] Schwefel, 1995, Evolution and Optimum Seeking.
        Wiley, New York, NY
     """
+    rng = get_rng()
     size = len(individual)
     t = c / math.sqrt(2. * math.sqrt(size))
     t0 = c / math.sqrt(2. * size)
-    n = random.gauss(0, 1)
+    n = rng.gauss(0, 1)
     t0_n = t0 * n
 
     for indx in range(size):
-        if random.random() < indpb:
-            individual.strategy[indx] *= math.exp(t0_n + t * random.gauss(0, 1))
-            individual[indx] += individual.strategy[indx] * random.gauss(0, 1)
+        if rng.random() < indpb:
+            individual.strategy[indx] *= math.exp(t0_n + t * rng.gauss(0, 1))
+            individual[indx] += individual.strategy[indx] * rng.gauss(0, 1)
 
     return individual,
 
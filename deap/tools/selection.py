@@ -1,9 +1,10 @@
-import random
 import numpy as np
 
 from functools import partial
 from operator import attrgetter
 
+from ..rng import get_rng
+
 ######################################
 # Selections                         #
 ######################################
@@ -18,10 +19,11 @@ def selRandom(individuals, k):
     :param k: The number of individuals to select.
     :returns: A list of selected individuals.
 
-    This function uses the :func:`~random.choice` function from the
-    python base :mod:`random` module.
+    This function uses the :func:`~random.choice` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
-    return [random.choice(individuals) for i in range(k)]
+    rng = get_rng()
+    return [rng.choice(individuals) for i in range(k)]
 
 
 def selBest(individuals, k, fit_attr="fitness"):
@@ -59,8 +61,8 @@ def selTournament(individuals, k, tournsize, fit_attr="fitness"):
     :param fit_attr: The attribute of individuals to use as selection criterion
     :returns: A list of selected individuals.
 
-    This function uses the :func:`~random.choice` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.choice` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
     chosen = []
     for i in range(k):
@@ -80,19 +82,20 @@ def selRoulette(individuals, k, fit_attr="fitness"):
     :param fit_attr: The attribute of individuals to use as selection criterion
     :returns: A list of selected individuals.
 
-    This function uses the :func:`~random.random` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.random` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
 
     .. warning::
        The roulette selection by definition cannot be used for minimization
        or when the fitness can be smaller or equal to 0.
     """
+    rng = get_rng()
 
     s_inds = sorted(individuals, key=attrgetter(fit_attr), reverse=True)
     sum_fits = sum(getattr(ind, fit_attr).values[0] for ind in individuals)
     chosen = []
     for i in range(k):
-        u = random.random() * sum_fits
+        u = rng.random() * sum_fits
         sum_ = 0
         for ind in s_inds:
             sum_ += getattr(ind, fit_attr).values[0]
@@ -147,6 +150,7 @@ def selDoubleTournament(individuals, k, fitness_size, parsimony_size, fitness_fi
     assert (1 <= parsimony_size <= 2), "Parsimony tournament size has to be in the range [1, 2]."
 
     def _sizeTournament(individuals, k, select):
+        rng = get_rng()
         chosen = []
         for i in range(k):
             # Select two individuals from the population
@@ -162,7 +166,7 @@ def selDoubleTournament(individuals, k, fitness_size, parsimony_size, fitness_fi
 
             # Since size1 <= size2 then ind1 is selected
             # with a probability prob
-            chosen.append(ind1 if random.random() < prob else ind2)
+            chosen.append(ind1 if rng.random() < prob else ind2)
 
         return chosen
 
@@ -192,14 +196,15 @@ def selStochasticUniversalSampling(individuals, k, fit_attr="fitness"):
     :param fit_attr: The attribute of individuals to use as selection criterion
     :return: A list of selected individuals.
 
-    This function uses the :func:`~random.uniform` function from the python base
-    :mod:`random` module.
+    This function uses the :func:`~random.uniform` function of the thread-local
+    generator of :mod:`deap.rng`, see :func:`~deap.rng.get_rng`.
     """
+    rng = get_rng()
     s_inds = sorted(individuals, key=attrgetter(fit_attr), reverse=True)
     sum_fits = sum(getattr(ind, fit_attr).values[0] for ind in individuals)
 
     distance = sum_fits / float(k)
-    start = random.uniform(0, distance)
+    start = rng.uniform(0, distance)
     points = [start + i * distance for i in range(k)]
 
     chosen = []
@@ -223,6 +228,7 @@ def selLexicase(individuals, k):
     :param k: The number of individuals to select.
     :returns: A list of selected individuals.
     """
+    rng = get_rng()
     selected_individuals = []
 
     for i in range(k):
@@ -230,7 +236,7 @@ def selLexicase(individuals, k):
 
         candidates = individuals
         cases = list(range(len(individuals[0].fitness.values)))
-        random.shuffle(cases)
+        rng.shuffle(cases)
 
         while len(cases) > 0 and len(candidates) > 1:
             f = max if fit_weights[cases[0]] > 0 else min
@@ -239,7 +245,7 @@ def selLexicase(individuals, k):
             candidates = [x for x in candidates if x.fitness.values[cases[0]] == best_val_for_case]
             cases.pop(0)
 
-        selected_individuals.append(random.choice(candidates))
+        selected_individuals.append(rng.choice(candidates))
 
     return selected_individuals
 
@@ -255,6 +261,7 @@ def selEpsilonLexicase(individuals, k, epsilon):
     :param k: The number of individuals to select.
     :returns: A list of selected individuals.
     """
+    rng = get_rng()
     selected_individuals = []
 
     for i in range(k):
@@ -262,7 +269,7 @@ def selEpsilonLexicase(individuals, k, epsilon):
 
         candidates = individuals
         cases = list(range(len(individuals[0].fitness.values)))
-        random.shuffle(cases)
+        rng.shuffle(cases)
 
         while len(cases) > 0 and len(candidates) > 1:
             if fit_weights[cases[0]] > 0:
@@ -276,7 +283,7 @@ def selEpsilonLexicase(individuals, k, epsilon):
 
             cases.pop(0)
 
-        selected_individuals.append(random.choice(candidates))
+        selected_individuals.append(rng.choice(candidates))
 
     return selected_individuals
 
@@ -292,6 +299,7 @@ def selAutomaticEpsilonLexicase(individuals, k):
     :param k: The number of individuals to select.
     :returns: A list of selected individuals.
     """
+    rng = get_rng()
     selected_individuals = []
 
     for i in range(k):
@@ -299,7 +307,7 @@ def selAutomaticEpsilonLexicase(individuals, k):
 
         candidates = individuals
         cases = list(range(len(individuals[0].fitness.values)))
-        random.shuffle(cases)
+        rng.shuffle(cases)
 
         while len(cases) > 0 and len(candidates) > 1:
             errors_for_this_case = [x.fitness.values[cases[0]] for x in candidates]
@@ -316,7 +324,7 @@ def selAutomaticEpsilonLexicase(individuals, k):
 
             cases.pop(0)
 
-        selected_individuals.append(random.choice(candidates))
+        selected_individuals.append(rng.choice(candidates))
 
     return selected_individuals
 
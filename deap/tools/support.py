@@ -1,9 +1,22 @@
+from array import array
 from bisect import bisect_right
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from collections.abc import Mapping
 from copy import deepcopy
+import csv
 from functools import partial
+import heapq
 from itertools import chain
-from operator import eq
+import json
+from numbers import Integral
+from operator import attrgetter, eq, itemgetter, methodcaller
+import os
+import pickle
+import sqlite3
+
+import numpy
+
+from ..base import Fitness
 
 
 def identity(obj):
@@ -128,23 +141,215 @@ class History(object):
         :returns: A dictionary where each key is an individual index and the
                   values are a tuple corresponding to the index of the parents.
         """
-        gtree = {}
-        visited = set()     # Adds memory to the breadth first search
-
-        def genealogy(index, depth):
-            if index not in self.genealogy_tree:
-                return
-            depth += 1
-            if depth > max_depth:
-                return
-            parent_indices = self.genealogy_tree[index]
-            gtree[index] = parent_indices
-            for ind in parent_indices:
-                if ind not in visited:
-                    genealogy(ind, depth)
-                visited.add(ind)
-        genealogy(individual.history_index, 0)
-        return gtree
+        return _genealogy(individual.history_index, self.genealogy_tree.get, max_depth)
+
+
+def _genealogy(index, parents_of, max_depth):
+    """Breadth first search of the ancestors of *index*, *parents_of* returns
+    the tuple of parents of an index or :data:`None` if it is unknown."""
+    gtree = {}
+    visited = {index}
+    queue = deque([(index, 0)])
+    while queue:
+        index, depth = queue.popleft()
+        if depth + 1 > max_depth:
+            continue
+        parent_indices = parents_of(index)
+        if parent_indices is None:
+            continue
+        gtree[index] = parent_indices
+        for parent in parent_indices:
+            if parent not in visited:
+                visited.add(parent)
+                queue.append((parent, depth + 1))
+    return gtree
+
+
+class CompactHistory(History):
+    """A :class:`History` designed for long runs. Instead of a dictionary
+    of tuples and a copy of every individual, the parents are stored in
+    compact integer arrays shared by all the individuals produced by the same
+    variation, and the individuals are only kept if requested, pickled. The
+    history can also be spilled to a SQLite database file so that the memory
+    used remains bounded. It is used exactly like the :class:`History`, with
+    the :meth:`update` method and the :attr:`decorator`.
+
+    :param filename: Path of a SQLite database to spill the history to,
+                     optional. If not provided, the history is kept in
+                     memory.
+    :param keep_genomes: Whether or not to keep the individuals, optional.
+                         It defaults to :data:`True`.
+    :param sample: A function receiving the history index of an individual
+                   and returning whether or not to keep it, optional. For
+                   example, ``lambda i: i % 100 == 0`` keeps one individual
+                   over 100. It is only used when *keep_genomes* is
+                   :data:`True`.
+    :param buffer_size: Number of variations kept in memory before being
+                        written to the database, optional. It is only used
+                        with a *filename*.
+
+    The :attr:`genealogy_tree` and :attr:`genealogy_history` attributes are
+    read-only mappings that can be used just like the dictionaries of the
+    :class:`History`, for example with NetworkX. Call :meth:`close` once
+    done with a history spilled to a file.
+    """
+    def __init__(self, filename=None, keep_genomes=True, sample=None, buffer_size=10000):
+        self.genealogy_index = 0
+        self.keep_genomes = keep_genomes
+        self.sample = sample
+        self.buffer_size = buffer_size
+
+        # Each update is stored as the index of its first individual and a
+        # slice of the parents array
+        self._starts = array("q")
+        self._offsets = array("q", [0])
+        self._parents = array("q")
+        self._genomes = dict()
+
+        self.db = None
+        if filename is not None:
+            self.db = sqlite3.connect(filename)
+            self.db.execute("CREATE TABLE IF NOT EXISTS genealogy "
+                            "(start INTEGER PRIMARY KEY, stop INTEGER, parents BLOB)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS genomes "
+                            "(id INTEGER PRIMARY KEY, data BLOB)")
+            row = self.db.execute("SELECT MAX(stop) FROM genealogy").fetchone()
+            self.genealogy_index = row[0] or 0
+
+        self.genealogy_tree = _GenealogyTree(self)
+        self.genealogy_history = _GenealogyHistory(self)
+
+    def update(self, individuals):
+        """Update the history with the new *individuals*. The behaviour is
+        the same as :meth:`History.update`.
+
+        :param individuals: The list of modified individuals that shall be
+                            inserted in the history.
+        """
+        if len(individuals) == 0:
+            return
+
+        try:
+            parent_indices = array("q", (ind.history_index for ind in individuals))
+        except AttributeError:
+            parent_indices = array("q")
+
+        self._starts.append(self.genealogy_index + 1)
+        self._parents.extend(parent_indices)
+        self._offsets.append(len(self._parents))
+
+        for ind in individuals:
+            self.genealogy_index += 1
+            ind.history_index = self.genealogy_index
+            if self.keep_genomes and (self.sample is None or self.sample(self.genealogy_index)):
+                self._genomes[self.genealogy_index] = pickle.dumps(ind, pickle.HIGHEST_PROTOCOL)
+
+        if self.db is not None and len(self._starts) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the history kept in memory to the database."""
+        if self.db is None or len(self._starts) == 0:
+            return
+
+        stops = chain(self._starts[1:], [self.genealogy_index + 1])
+        rows = ((start, stop - 1, self._parents[self._offsets[i]:self._offsets[i + 1]].tobytes())
+                for i, (start, stop) in enumerate(zip(self._starts, stops)))
+        with self.db:
+            self.db.executemany("INSERT INTO genealogy VALUES (?, ?, ?)", rows)
+            self.db.executemany("INSERT INTO genomes VALUES (?, ?)", self._genomes.items())
+
+        self._starts = array("q")
+        self._offsets = array("q", [0])
+        self._parents = array("q")
+        self._genomes = dict()
+
+    def close(self):
+        """Flush the history and close the database."""
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+    def parents(self, index):
+        """Return the tuple of history indices of the parents of the
+        individual with history *index* or :data:`None` if this index is
+        not in the history.
+        """
+        if index < 1 or index > self.genealogy_index:
+            return None
+
+        i = bisect_right(self._starts, index) - 1
+        if i >= 0:
+            return tuple(self._parents[self._offsets[i]:self._offsets[i + 1]])
+
+        row = self.db.execute("SELECT parents FROM genealogy WHERE start <= ? "
+                              "ORDER BY start DESC LIMIT 1", (index,)).fetchone()
+        return tuple(array("q", row[0]))
+
+    def genome(self, index):
+        """Return a copy of the individual with history *index* or
+        :data:`None` if it was not kept.
+        """
+        data = self._genomes.get(index)
+        if data is None and self.db is not None:
+            row = self.db.execute("SELECT data FROM genomes WHERE id = ?", (index,)).fetchone()
+            data = row[0] if row is not None else None
+        return pickle.loads(data) if data is not None else None
+
+    def _genome_indices(self):
+        if self.db is not None:
+            for row in self.db.execute("SELECT id FROM genomes ORDER BY id"):
+                yield row[0]
+        for index in list(self._genomes):
+            yield index
+
+    def getGenealogy(self, individual, max_depth=float("inf")):
+        """Provide the genealogy tree of an *individual*. The behaviour is the
+        same as :meth:`History.getGenealogy`, the tree is traversed
+        iteratively.
+
+        :param individual: The individual at the root of the genealogy tree.
+        :param max_depth: The approximate maximum distance between the root
+                          (individual) and the leaves (parents), optional.
+        :returns: A dictionary where each key is an individual index and the
+                  values are a tuple corresponding to the index of the parents.
+        """
+        return _genealogy(individual.history_index, self.parents, max_depth)
+
+
+class _GenealogyTree(Mapping):
+    def __init__(self, history):
+        self.history = history
+
+    def __getitem__(self, index):
+        parents = self.history.parents(index)
+        if parents is None:
+            raise KeyError(index)
+        return parents
+
+    def __iter__(self):
+        return iter(range(1, self.history.genealogy_index + 1))
+
+    def __len__(self):
+        return self.history.genealogy_index
+
+
+class _GenealogyHistory(Mapping):
+    def __init__(self, history):
+        self.history = history
+
+    def __getitem__(self, index):
+        genome = self.history.genome(index)
+        if genome is None:
+            raise KeyError(index)
+        return genome
+
+    def __iter__(self):
+        return self.history._genome_indices()
+
+    def __len__(self):
+        return sum(1 for _ in self.history._genome_indices())
 
 
 class Statistics(object):
@@ -196,16 +401,143 @@ class Statistics(object):
         """Apply to the input sequence *data* each registered function
         and return the results as a dictionary.
 
+        The values are extracted with the key only once per call. When
+        possible, they are converted once into a :class:`numpy.ndarray` that is
+        given directly to the registered NumPy reductions (:func:`numpy.mean`,
+        :func:`numpy.std`, :func:`numpy.max`, ...), the other functions receive
+        the tuple of values. The :func:`numpy.std` and :func:`numpy.var`
+        functions share the mean computed by :func:`numpy.mean` with the same
+        arguments and the quantiles and percentiles sharing their arguments are
+        computed in a single call.
+
         :param data: Sequence of objects on which the statistics are computed.
         """
-        values = tuple(self.key(elem) for elem in data)
+        return self._compile(_Columns(self.key, data))
 
-        entry = dict()
+    def _compile(self, columns):
+        entry = dict.fromkeys(self.functions)
+        means = dict()
+        quantiles = defaultdict(list)
         for key, func in self.functions.items():
-            entry[key] = func(values)
+            function = func.func
+            if not _is_reduction(function) or columns.array is None:
+                entry[key] = func(columns.values)
+            elif function in (numpy.quantile, numpy.percentile) \
+                    and len(func.args) == 0 and "q" in func.keywords:
+                kargs = dict(func.keywords)
+                q = numpy.asarray(kargs.pop("q"))
+                quantiles[function, _frozen(kargs)].append((key, q))
+            elif function in (numpy.std, numpy.var) and len(func.args) == 0 \
+                    and set(func.keywords) <= {"axis", "ddof"}:
+                kargs = dict(func.keywords)
+                ddof = kargs.pop("ddof", 0)
+                mean_key = _frozen(kargs)
+                if mean_key not in means:
+                    means[mean_key] = numpy.mean(columns.array, keepdims=True, **kargs)
+                entry[key] = _variance(columns.array, means[mean_key], ddof, **kargs)
+                if function is numpy.std:
+                    entry[key] = numpy.sqrt(entry[key])
+            elif function is numpy.mean and len(func.args) == 0 \
+                    and set(func.keywords) <= {"axis"}:
+                # The mean is kept with its dimensions for the variances
+                mean = numpy.mean(columns.array, keepdims=True, **func.keywords)
+                means[_frozen(func.keywords)] = mean
+                entry[key] = numpy.squeeze(mean, axis=func.keywords.get("axis"))
+                if entry[key].ndim == 0:
+                    entry[key] = entry[key][()]
+            else:
+                entry[key] = func(columns.array)
+
+        for (function, kargs), group in quantiles.items():
+            q = numpy.concatenate([numpy.atleast_1d(q) for _, q in group])
+            results = function(columns.array, q=q, **dict(kargs))
+            start = 0
+            for key, q in group:
+                stop = start + max(q.size, 1)
+                entry[key] = results[start] if q.ndim == 0 else results[start:stop]
+                start = stop
+
         return entry
 
 
+_ARRAY_REDUCTIONS = (numpy.mean, numpy.std, numpy.var, numpy.min, numpy.max,
+                     numpy.amin, numpy.amax, numpy.median, numpy.sum,
+                     numpy.quantile, numpy.percentile, numpy.nanmean,
+                     numpy.nanstd, numpy.nanmin, numpy.nanmax, numpy.nanmedian)
+
+
+def _is_reduction(function):
+    # Identity comparisons, the registered function may not be hashable
+    return any(function is reduction for reduction in _ARRAY_REDUCTIONS)
+
+
+def _frozen(kargs):
+    return tuple(sorted(kargs.items()))
+
+
+def _variance(array, mean, ddof, axis=None):
+    """Variance of *array* from its precomputed *mean* (with kept dims)."""
+    deviation = array - mean
+    count = array.size if axis is None else array.shape[axis]
+    return numpy.sum(deviation * deviation, axis=axis) / max(count - ddof, 0)
+
+
+class _Columns(object):
+    """Values extracted from the data by a key, converted lazily to an
+    array. The extraction and the conversion are made at most once."""
+    def __init__(self, key, data):
+        self.key = key
+        self.data = data
+        self._values = None
+        self._array = None
+        self._converted = False
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = tuple(self.key(elem) for elem in self.data)
+        return self._values
+
+    @property
+    def array(self):
+        if not self._converted:
+            self._converted = True
+            if self._values is None and _key_id(self.key) == _FITNESS_VALUES:
+                self._array = _fitness_values(self.data)
+            if self._array is None:
+                try:
+                    self._array = numpy.asarray(self.values)
+                except ValueError:
+                    # Ragged values cannot be stacked
+                    self._array = None
+                else:
+                    if self._array.dtype == object:
+                        self._array = None
+        return self._array
+
+
+_FITNESS_VALUES = attrgetter("fitness.values").__reduce__()
+
+
+def _fitness_values(data):
+    """Matrix of the fitness values of *data* computed from the weighted
+    values, or :data:`None` if the fitnesses are not all of the same type."""
+    fitnesses = [elem.fitness for elem in data]
+    if len(fitnesses) == 0 or len(set(map(type, fitnesses))) != 1 \
+            or not all(fit.valid for fit in fitnesses):
+        return None
+    wvalues = numpy.array([fit.wvalues for fit in fitnesses], dtype=float)
+    return wvalues / numpy.asarray(fitnesses[0].weights, dtype=float)
+
+
+def _key_id(key):
+    # Operator getters created with the same arguments are equivalent even
+    # if they are different objects
+    if isinstance(key, (attrgetter, itemgetter, methodcaller)):
+        return key.__reduce__()
+    return key
+
+
 class MultiStatistics(dict):
     """Dictionary of :class:`Statistics` object allowing to compute
     statistics on multiple keys using a single call to :meth:`compile`. It
@@ -228,13 +560,18 @@ class MultiStatistics(dict):
     """
     def compile(self, data):
         """Calls :meth:`Statistics.compile` with *data* of each
-        :class:`Statistics` object.
+        :class:`Statistics` object. The values are extracted only once for
+        all the :class:`Statistics` objects using the same key.
 
         :param data: Sequence of objects on which the statistics are computed.
         """
         record = {}
+        columns = {}
         for name, stats in self.items():
-            record[name] = stats.compile(data)
+            key = _key_id(stats.key)
+            if key not in columns:
+                columns[key] = _Columns(stats.key, data)
+            record[name] = stats._compile(columns[key])
         return record
 
     @property
@@ -485,6 +822,403 @@ class Logbook(list):
         return "\n".join(text)
 
 
+class ColumnarLogbook(object):
+    """Evolution records stored by columns. It is a drop-in replacement of
+    the :class:`Logbook` for long runs: the fields are kept in typed arrays
+    (:class:`array.array` of doubles or integers, falling back to a list
+    for other values), only the last *window* records are kept in memory
+    and every record is written to the *sinks* as soon as it is recorded.
+
+    :param window: The maximum number of records kept in memory, optional.
+                   When not provided, all records are kept.
+    :param sinks: A sequence of objects with a ``write(record)`` method
+                  receiving each record as a flat dictionary (the fields of
+                  the chapters are prefixed by the chapter name and a dot),
+                  and optional ``flush()`` and ``close()`` methods, see
+                  :class:`CSVSink`, :class:`JSONLSink` and :class:`NPZSink`.
+
+    The :meth:`record`, :meth:`select` and :data:`stream` methods, and the
+    :attr:`header`, :attr:`log_header` and :attr:`chapters` attributes
+    behave as in the :class:`Logbook`, except that they only see the records
+    present in memory. Streaming only formats the records recorded since
+    the last call. ::
+
+        >>> log = ColumnarLogbook(window=1000, sinks=[JSONLSink("log.jsonl")])  # doctest: +SKIP
+        >>> log.record(gen=0, evals=100, fitness={'max': 10.0, 'avg': 1.0})       # doctest: +SKIP
+        >>> log.chapters["fitness"].select("max")                                 # doctest: +SKIP
+        [10.0]
+        >>> log.close()                                                           # doctest: +SKIP
+    """
+    def __init__(self, window=None, sinks=()):
+        self.window = window
+        self.sinks = list(sinks)
+        self.columns = dict()
+        self.nrecords = 0
+        """Total number of records, including those removed from memory."""
+        self.chapters = defaultdict(ColumnarLogbook)
+        self.buffindex = 0
+        self.columns_len = None
+        self.header = None
+        self.log_header = True
+        self._len = 0
+        self._streamed = False
+
+    def record(self, **infos):
+        """Enter a record of event in the logbook as a list of key-value pairs.
+        When the value part of a pair is a dictionary, the information
+        contained in the dictionary are recorded in a chapter entitled as the
+        name of the key part of the pair. The record is written to the sinks
+        and the oldest record is removed from memory if the window is full.
+        """
+        for sink in self.sinks:
+            sink.write(_flatten(infos))
+        self._record(infos)
+        if self.window is not None and self._len > self.window:
+            self._drop(self._len - self.window)
+
+    def _record(self, infos):
+        apply_to_all = {k: v for k, v in infos.items() if not isinstance(v, dict)}
+        for key, value in infos.items():
+            if isinstance(value, dict):
+                chapter = self.chapters.get(key)
+                if chapter is None:
+                    # The chapters have a row for every record, empty when
+                    # the record does not contain the chapter
+                    chapter = self.chapters[key] = ColumnarLogbook()
+                    for _ in range(self._len):
+                        chapter._record({})
+                chapter_infos = value.copy()
+                chapter_infos.update(apply_to_all)
+                chapter._record(chapter_infos)
+        for key, chapter in self.chapters.items():
+            if not isinstance(infos.get(key), dict):
+                chapter._record({})
+
+        for name, value in apply_to_all.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = _new_column(value, self._len)
+            elif not _accepts(column, value):
+                column = self.columns[name] = list(column)
+            column.append(value)
+
+        for name, column in self.columns.items():
+            if name not in apply_to_all:
+                if not isinstance(column, list):
+                    column = self.columns[name] = list(column)
+                column.append(None)
+
+        self._len += 1
+        self.nrecords += 1
+
+    def _drop(self, n):
+        for column in self.columns.values():
+            del column[:n]
+        for chapter in self.chapters.values():
+            chapter._drop(n)
+        self._len -= n
+        self.buffindex = max(0, self.buffindex - n)
+
+    def select(self, *names):
+        """Return a list of values associated to the *names* provided in
+        argument for each record in memory. One list per name is returned in
+        order. See :meth:`Logbook.select`.
+        """
+        def column(name):
+            values = self.columns.get(name)
+            return list(values) if values is not None else [None] * self._len
+
+        if len(names) == 1:
+            return column(names[0])
+        return tuple(column(name) for name in names)
+
+    @property
+    def stream(self):
+        """Retrieve the formatted not streamed yet entries of the logbook
+        including the headers on the first call. Only the new entries are
+        formatted.
+        """
+        startindex, self.buffindex = self.buffindex, self._len
+        text = self.__txt__(startindex, self.log_header and not self._streamed)
+        self._streamed = True
+        return "\n".join(text)
+
+    def flush(self):
+        """Flush the sinks."""
+        for sink in self.sinks:
+            if hasattr(sink, "flush"):
+                sink.flush()
+
+    def close(self):
+        """Close the sinks."""
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("logbook index out of range")
+        return {name: column[index] for name, column in self.columns.items()
+                if column[index] is not None}
+
+    def __iter__(self):
+        return (self[i] for i in range(self._len))
+
+    def __txt__(self, startindex, header=None):
+        if header is None:
+            header = startindex == 0 and self.log_header
+
+        columns = self.header
+        if not columns:
+            columns = sorted(self.columns) + sorted(self.chapters)
+        if not self.columns_len or len(self.columns_len) != len(columns):
+            self.columns_len = [len(c) for c in columns]
+
+        chapters_txt = {}
+        offsets = defaultdict(int)
+        for name, chapter in self.chapters.items():
+            chapters_txt[name] = chapter.__txt__(startindex, header)
+            if header:
+                offsets[name] = len(chapters_txt[name]) - (self._len - startindex)
+
+        str_matrix = []
+        for i in range(startindex, self._len):
+            str_line = []
+            for j, name in enumerate(columns):
+                if name in chapters_txt:
+                    column = chapters_txt[name][i - startindex + offsets[name]]
+                else:
+                    values = self.columns.get(name)
+                    value = values[i] if values is not None and values[i] is not None else ""
+                    string = "{0:n}" if isinstance(value, float) else "{0}"
+                    column = string.format(value)
+                self.columns_len[j] = max(self.columns_len[j], len(column))
+                str_line.append(column)
+            str_matrix.append(str_line)
+
+        if header:
+            nlines = 1
+            if len(self.chapters) > 0:
+                nlines += max(map(len, chapters_txt.values())) - (self._len - startindex) + 1
+            header = [[] for i in range(nlines)]
+            for j, name in enumerate(columns):
+                if name in chapters_txt:
+                    length = max(len(line.expandtabs()) for line in chapters_txt[name])
+                    blanks = nlines - 2 - offsets[name]
+                    for i in range(blanks):
+                        header[i].append(" " * length)
+                    header[blanks].append(name.center(length))
+                    header[blanks + 1].append("-" * length)
+                    for i in range(offsets[name]):
+                        header[blanks + 2 + i].append(chapters_txt[name][i])
+                else:
+                    length = max([len(line[j].expandtabs()) for line in str_matrix] + [len(name)])
+                    for line in header[:-1]:
+                        line.append(" " * length)
+                    header[-1].append(name)
+            str_matrix = chain(header, str_matrix)
+
+        template = "\t".join("{%i:<%i}" % (i, k) for i, k in enumerate(self.columns_len))
+        return [template.format(*line) for line in str_matrix]
+
+    def __str__(self):
+        return "\n".join(self.__txt__(0))
+
+
+def _new_column(value, missing):
+    if missing == 0:
+        if isinstance(value, float):
+            return array("d")
+        if isinstance(value, Integral) and not isinstance(value, bool):
+            return array("q")
+    return [None] * missing
+
+
+def _accepts(column, value):
+    if isinstance(column, list):
+        return True
+    if column.typecode == "d":
+        return isinstance(value, float)
+    return isinstance(value, Integral) and not isinstance(value, bool) \
+        and -2 ** 63 <= value < 2 ** 63
+
+
+def _flatten(infos, prefix=""):
+    record = dict()
+    for key, value in infos.items():
+        if isinstance(value, dict):
+            record.update(_flatten(value, prefix + key + "."))
+        else:
+            record[prefix + key] = value
+    return record
+
+
+def _tolist(value):
+    return value.tolist() if hasattr(value, "tolist") else value
+
+
+class CSVSink(object):
+    """Write the records of a :class:`ColumnarLogbook` to a CSV file, one
+    line per record.
+
+    :param filename: The path of the file.
+    :param fields: The names of the columns, optional. If provided, the
+                   fields that are not in the columns are ignored. If not,
+                   the columns are the fields of the first record and a
+                   field appearing in a later record is added as a new
+                   column, which rewrites the file once.
+    """
+    def __init__(self, filename, fields=None):
+        self.filename = filename
+        self.file = open(filename, "w", newline="")
+        self.fields = fields
+        self.extend = fields is None
+        self.writer = None
+
+    def _add_fields(self, fields):
+        # The header is the first line, the file is rewritten with the new
+        # columns, empty in the previous lines
+        self.file.close()
+        with open(self.filename, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.fields = self.fields + fields
+        self.file = open(self.filename, "w", newline="")
+        self.writer = csv.DictWriter(self.file, self.fields, extrasaction="ignore")
+        self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def write(self, record):
+        if self.writer is None:
+            self.fields = self.fields or list(record)
+            self.writer = csv.DictWriter(self.file, self.fields, extrasaction="ignore")
+            self.writer.writeheader()
+        elif self.extend:
+            fields = [name for name in record if name not in self.writer.fieldnames]
+            if fields:
+                self._add_fields(fields)
+        self.writer.writerow({k: _tolist(v) for k, v in record.items()})
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JSONLSink(object):
+    """Write the records of a :class:`ColumnarLogbook` to a file, one JSON
+    object per line. NumPy values are converted to lists and numbers.
+
+    :param filename: The path of the file.
+    """
+    def __init__(self, filename):
+        self.file = open(filename, "w")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, default=_tolist))
+        self.file.write("\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class NPZSink(object):
+    """Write the records of a :class:`ColumnarLogbook` to NumPy ``.npz``
+    files with one array per field. Since the format cannot be appended to,
+    the values are accumulated in typed arrays and written as a new chunk
+    ``<filename>.<n>.npz`` every *chunksize* records, on :meth:`flush` and
+    on :meth:`close`, after which they are removed from memory. The chunks
+    are read back as a single dictionary of arrays with :meth:`load`.
+
+    :param filename: The path of the files, without the chunk number and
+                     the ``.npz`` extension.
+    :param chunksize: The number of records in memory that triggers the
+                      writing of a chunk, optional.
+    """
+    def __init__(self, filename, chunksize=10000):
+        self.filename = filename[:-4] if filename.endswith(".npz") else filename
+        self.chunksize = chunksize
+        self.columns = dict()
+        self.nrecords = 0
+        self.nchunks = 0
+
+    def write(self, record):
+        for name, value in record.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = _new_column(value, self.nrecords)
+            elif not _accepts(column, value):
+                column = self.columns[name] = list(column)
+            column.append(value)
+        self.nrecords += 1
+        for name, column in self.columns.items():
+            if len(column) < self.nrecords:
+                if not isinstance(column, list):
+                    column = self.columns[name] = list(column)
+                column.append(None)
+        if self.nrecords >= self.chunksize:
+            self.flush()
+
+    def flush(self):
+        if self.nrecords == 0:
+            return
+        arrays = dict()
+        for name, column in self.columns.items():
+            if isinstance(column, list):
+                arrays[name] = _list_array(column)
+            else:
+                arrays[name] = numpy.frombuffer(column, dtype=column.typecode)
+        numpy.savez("%s.%05d.npz" % (self.filename, self.nchunks), **arrays)
+        self.nchunks += 1
+        self.columns = dict()
+        self.nrecords = 0
+
+    def close(self):
+        self.flush()
+
+    @staticmethod
+    def load(filename):
+        """Read the chunks written to *filename* and return a dictionary
+        with the concatenated array of each field. The values of a field
+        missing from a chunk are :data:`None`."""
+        filename = filename[:-4] if filename.endswith(".npz") else filename
+        chunks = list()
+        while os.path.exists("%s.%05d.npz" % (filename, len(chunks))):
+            with numpy.load("%s.%05d.npz" % (filename, len(chunks)), allow_pickle=True) as data:
+                chunks.append(dict(data))
+        names = list()
+        for chunk in chunks:
+            names.extend(name for name in chunk if name not in names)
+        arrays = dict()
+        for name in names:
+            parts = list()
+            for chunk in chunks:
+                if name in chunk:
+                    parts.append(chunk[name])
+                else:
+                    length = len(next(iter(chunk.values())))
+                    parts.append(numpy.array([None] * length, dtype=object))
+            arrays[name] = numpy.concatenate(parts)
+        return arrays
+
+
+def _list_array(column):
+    try:
+        return numpy.array(column)
+    except ValueError:
+        return numpy.array(column, dtype=object)
+
+
 class HallOfFame(object):
     """The hall of fame contains the best individual that ever lived in the
     population during the evolution. It is lexicographically sorted at all
@@ -501,16 +1235,25 @@ class HallOfFame(object):
                     fame.
     :param similar: An equivalence operator between two individuals, optional.
                     It defaults to operator :func:`operator.eq`.
+    :param hash_key: A function returning a hashable key for an individual,
+                     optional. When provided, two individuals are considered
+                     equivalent if they have the same key and the *similar*
+                     operator is not used. The duplicates are then found with
+                     a set lookup instead of a scan of the whole hall of fame,
+                     which matters for large hall of fame (e.g., ``tuple`` for
+                     list-based individuals).
 
     The class :class:`HallOfFame` provides an interface similar to a list
     (without being one completely). It is possible to retrieve its length, to
     iterate on it forward and backward and to get an item or a slice from it.
     """
-    def __init__(self, maxsize, similar=eq):
+    def __init__(self, maxsize, similar=eq, hash_key=None):
         self.maxsize = maxsize
         self.keys = list()
         self.items = list()
         self.similar = similar
+        self.hash_key = hash_key
+        self.hashes = Counter()
 
     def update(self, population):
         """Update the hall of fame with the *population* by replacing the
@@ -518,27 +1261,39 @@ class HallOfFame(object):
         *population* (if they are better). The size of the hall of fame is
         kept constant.
 
+        When the hall of fame is full, the individuals that are not strictly
+        better than its worst individual are discarded at once. The remaining
+        candidates are considered from best to worst so that only the
+        individuals that stay in the hall of fame are copied.
+
         :param population: A list of individual with a fitness attribute to
                            update the hall of fame with.
         """
-        for ind in population:
-            if len(self) == 0 and self.maxsize != 0:
-                # Working on an empty hall of fame is problematic for the
-                # "for else"
-                self.insert(population[0])
-                continue
-            if ind.fitness > self[-1].fitness or len(self) < self.maxsize:
-                for hofer in self:
-                    # Loop through the hall of fame to check for any
-                    # similar individual
-                    if self.similar(ind, hofer):
-                        break
-                else:
-                    # The individual is unique and strictly better than
-                    # the worst
-                    if len(self) >= self.maxsize:
-                        self.remove(-1)
-                    self.insert(ind)
+        if self.maxsize == 0 or len(population) == 0:
+            return
+
+        if len(self) >= self.maxsize:
+            candidates = _better_than(population, self[-1].fitness)
+        else:
+            candidates = population
+
+        # The sort is stable, equal individuals keep the population order
+        candidates = sorted(candidates, key=attrgetter("fitness"), reverse=True)
+        for ind in candidates:
+            if len(self) >= self.maxsize and not ind.fitness > self[-1].fitness:
+                # Candidates are sorted, none of the following can enter
+                break
+            if not self._contains(ind):
+                # The individual is unique and strictly better than
+                # the worst
+                if len(self) >= self.maxsize:
+                    self.remove(-1)
+                self.insert(ind)
+
+    def _contains(self, ind):
+        if self.hash_key is not None:
+            return self.hash_key(ind) in self.hashes
+        return any(self.similar(ind, hofer) for hofer in self)
 
     def insert(self, item):
         """Insert a new individual in the hall of fame using the
@@ -556,6 +1311,8 @@ class HallOfFame(object):
         i = bisect_right(self.keys, item.fitness)
         self.items.insert(len(self) - i, item)
         self.keys.insert(i, item.fitness)
+        if self.hash_key is not None:
+            self.hashes[self.hash_key(item)] += 1
 
     def remove(self, index):
         """Remove the specified *index* from the hall of fame.
@@ -563,12 +1320,24 @@ class HallOfFame(object):
         :param index: An integer giving which item to remove.
         """
         del self.keys[len(self) - (index % len(self) + 1)]
-        del self.items[index]
+        item = self.items.pop(index)
+        if self.hash_key is not None:
+            key = self.hash_key(item)
+            self.hashes[key] -= 1
+            if self.hashes[key] == 0:
+                del self.hashes[key]
 
     def clear(self):
         """Clear the hall of fame."""
         del self.items[:]
         del self.keys[:]
+        self.hashes.clear()
+
+    def __setstate__(self, state):
+        # Hall of fames pickled before the hash keys were introduced
+        state.setdefault("hash_key", None)
+        state.setdefault("hashes", Counter())
+        self.__dict__.update(state)
 
     def __len__(self):
         return len(self.items)
@@ -616,29 +1385,334 @@ class ParetoFront(HallOfFame):
         :param population: A list of individual with a fitness attribute to
                            update the hall of fame with.
         """
-        for ind in population:
-            is_dominated = False
-            dominates_one = False
-            has_twin = False
-            to_remove = []
-            for i, hofer in enumerate(self):    # hofer = hall of famer
-                if not dominates_one and hofer.fitness.dominates(ind.fitness):
-                    is_dominated = True
-                    break
-                elif ind.fitness.dominates(hofer.fitness):
-                    dominates_one = True
-                    to_remove.append(i)
-                elif ind.fitness == hofer.fitness and self.similar(ind, hofer):
-                    has_twin = True
-                    break
+        if len(population) == 0:
+            return
+
+        # Filter the union of the front and the population at once, only the
+        # surviving individuals are compared for similarity and copied
+        wvalues = numpy.array([ind.fitness.wvalues for ind in chain(self, population)])
+        nondominated = _nondominated_mask(wvalues)
 
-            for i in reversed(to_remove):       # Remove the dominated hofer
-                self.remove(i)
-            if not is_dominated and not has_twin:
+        for i in reversed(numpy.flatnonzero(~nondominated[:len(self)])):
+            self.remove(i)
+
+        for ind, keep in zip(population, nondominated[len(wvalues) - len(population):]):
+            if not keep:
+                continue
+            for hofer in self:
+                if ind.fitness == hofer.fitness and self.similar(ind, hofer):
+                    break
+            else:
                 self.insert(ind)
 
 
-__all__ = ['HallOfFame', 'ParetoFront', 'History', 'Statistics', 'MultiStatistics', 'Logbook']
+class ParetoArchive(object):
+    """Archive of the non-dominated individuals that ever lived in the
+    population. Contrary to :class:`ParetoFront`, the archive works on the
+    matrix of weighted fitness values of the whole batch: dominance between
+    the archive and the new individuals is resolved with a sorted sweep for
+    two objectives and a block-wise vectorized filter otherwise. Only the
+    individuals that are admitted in the archive are copied.
+
+    :param maxsize: The maximum number of individuals to keep, optional.
+                    When the archive exceeds this size, the individuals with
+                    the smallest crowding distance are removed one by one.
+    :param epsilon: A scalar or a sequence of one value per objective,
+                    optional. When provided, the archive keeps at most one
+                    individual per epsilon box and only the individuals
+                    whose boxes are non-dominated ([Laumanns2002]_).
+    :param similar: A function that tells the archive whether or not two
+                    individuals having the same fitness are similar,
+                    optional. It defaults to :func:`operator.eq`.
+
+    The archive is sorted lexicographically, the first element having the
+    best first objective. Like the :class:`HallOfFame`, it is possible to
+    retrieve its length, to iterate on it and to get an item or a slice from
+    it. The weighted fitness values of the archived individuals are available
+    as a matrix in :attr:`wvalues`.
+
+    .. [Laumanns2002] Laumanns, Thiele, Deb and Zitzler, "Combining
+       convergence and diversity in evolutionary multiobjective
+       optimization", 2002.
+    """
+    def __init__(self, maxsize=None, epsilon=None, similar=eq):
+        self.maxsize = maxsize
+        self.epsilon = epsilon
+        self.similar = similar
+        self.items = list()
+        self.wvalues = None
+
+    def update(self, population, wvalues=None):
+        """Update the archive with the *population*. The individuals of the
+        archive that are dominated by a new individual are removed and the new
+        non-dominated individuals are inserted.
+
+        :param population: A list of individuals with a fitness attribute.
+        :param wvalues: The matrix of weighted fitness values of the
+                        *population*, optional. When the fitnesses are
+                        already available as an array (for example from a
+                        batch evaluation), providing it avoids extracting
+                        them from the individuals.
+        """
+        if len(population) == 0:
+            return
+
+        if wvalues is None:
+            wvalues = [ind.fitness.wvalues for ind in population]
+        wvalues = numpy.asarray(wvalues, dtype=float)
+
+        narchive = len(self.items)
+        if narchive > 0:
+            all_wvalues = numpy.concatenate((self.wvalues, wvalues), axis=0)
+        else:
+            all_wvalues = wvalues
+
+        if self.epsilon is not None:
+            keep = self._epsilon_mask(all_wvalues)
+        else:
+            keep = _nondominated_mask(all_wvalues)
+
+        # Look for twins among the survivors, only those sharing the same
+        # fitness have to be compared with the similarity function
+        candidates = list()
+        twins = defaultdict(list)
+        for i in numpy.flatnonzero(keep):
+            ind = self.items[i] if i < narchive else population[i - narchive]
+            siblings = twins[all_wvalues[i].tobytes()]
+            if i >= narchive and any(self.similar(ind, other) for other in siblings):
+                continue
+            siblings.append(ind)
+            candidates.append(i)
+
+        candidates = numpy.array(candidates, dtype=int)
+        if self.maxsize is not None and len(candidates) > self.maxsize:
+            candidates = candidates[_crowding_truncation(all_wvalues[candidates], self.maxsize)]
+
+        # Lexicographic order, best first, older individuals first on ties
+        order = numpy.lexsort(-all_wvalues[candidates].T[::-1])
+        candidates = candidates[order]
+
+        self.items = [self.items[i] if i < narchive else deepcopy(population[i - narchive])
+                      for i in candidates]
+        self.wvalues = all_wvalues[candidates]
+
+    def _epsilon_mask(self, wvalues):
+        epsilon = numpy.broadcast_to(numpy.asarray(self.epsilon, dtype=float), wvalues.shape[1:])
+        boxes = numpy.floor(wvalues / epsilon)
+        keep = _nondominated_mask(boxes)
+
+        # A single individual per box, the closest to the box best corner
+        gap = numpy.linalg.norm((boxes + 1) * epsilon - wvalues, axis=1)
+        indices = numpy.flatnonzero(keep)
+        order = indices[numpy.lexsort((indices, gap[indices]))]
+        _, best = numpy.unique(boxes[order], axis=0, return_index=True)
+        keep[:] = False
+        keep[order[best]] = True
+        return keep
+
+    def clear(self):
+        """Clear the archive."""
+        self.items = list()
+        self.wvalues = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __reversed__(self):
+        return reversed(self.items)
+
+    def __str__(self):
+        return str(self.items)
+
+
+def _better_than(population, fitness):
+    """Return the individuals of *population* having a fitness strictly
+    greater than *fitness*. The lexicographic comparison is vectorized when
+    the fitnesses use the default comparison operators."""
+    fitness_class = type(fitness)
+    if fitness_class.__gt__ is not Fitness.__gt__ or fitness_class.__le__ is not Fitness.__le__ \
+            or any(type(ind.fitness) is not fitness_class for ind in population):
+        return [ind for ind in population if ind.fitness > fitness]
+
+    wvalues = numpy.array([ind.fitness.wvalues for ind in population])
+    greater = numpy.zeros(len(population), dtype=bool)
+    equal = numpy.ones(len(population), dtype=bool)
+    for column, reference in zip(wvalues.T, fitness.wvalues):
+        greater |= equal & (column > reference)
+        equal &= column == reference
+    return [population[i] for i in numpy.flatnonzero(greater)]
+
+
+def _dominated_by(candidates, others):
+    """Return a mask of the rows of *candidates* dominated by at least one
+    row of *others* (maximization)."""
+    greater_equal = numpy.all(others[numpy.newaxis, :, :] >= candidates[:, numpy.newaxis, :], axis=2)
+    greater = numpy.any(others[numpy.newaxis, :, :] > candidates[:, numpy.newaxis, :], axis=2)
+    return numpy.any(greater_equal & greater, axis=1)
+
+
+def _nondominated_mask(wvalues, block_size=256):
+    """Return a mask of the non-dominated rows of the *wvalues* matrix. Equal
+    rows do not dominate each other."""
+    n, nobj = wvalues.shape
+    mask = numpy.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+
+    if nobj == 1:
+        mask[wvalues[:, 0] == wvalues[:, 0].max()] = True
+        return mask
+
+    if nobj == 2:
+        # Sweep in decreasing order of the first objective, a point survives
+        # if its second objective is better than any point seen before
+        order = numpy.lexsort((-wvalues[:, 1], -wvalues[:, 0]))
+        sorted_w = wvalues[order]
+        new_point = numpy.ones(n, dtype=bool)
+        new_point[1:] = numpy.any(sorted_w[1:] != sorted_w[:-1], axis=1)
+        best = numpy.maximum.accumulate(sorted_w[:, 1])
+        previous = numpy.empty(n)
+        previous[0] = -numpy.inf
+        previous[1:] = best[:-1]
+        survive = sorted_w[:, 1] > previous
+        # Duplicates share the fate of the first of their group
+        group = numpy.cumsum(new_point) - 1
+        mask[order] = survive[new_point][group]
+        return mask
+
+    # A point can only be dominated by points having a larger sum, processing
+    # the points by decreasing sum allows to compare each block only with
+    # itself and the front found so far.
+    order = numpy.argsort(-wvalues.sum(axis=1), kind="stable")
+    front = numpy.empty((0, nobj))
+    for start in range(0, n, block_size):
+        index = order[start:start + block_size]
+        block = wvalues[index]
+        dominated = _dominated_by(block, block)
+        if len(front) > 0:
+            dominated |= _dominated_by(block, front)
+        mask[index[~dominated]] = True
+        front = numpy.concatenate((front, block[~dominated]), axis=0)
+    return mask
+
+
+def _crowding_distances(wvalues):
+    """Return the crowding distance of each row of *wvalues*."""
+    n, nobj = wvalues.shape
+    distances = numpy.zeros(n)
+    if n <= 2:
+        distances[:] = numpy.inf
+        return distances
+
+    for j in range(nobj):
+        order = numpy.argsort(wvalues[:, j], kind="stable")
+        values = wvalues[order, j]
+        distances[order[0]] = distances[order[-1]] = numpy.inf
+        span = values[-1] - values[0]
+        if span == 0:
+            continue
+        distances[order[1:-1]] += (values[2:] - values[:-2]) / (nobj * span)
+    return distances
+
+
+def _crowding_truncation(wvalues, k):
+    """Return the sorted indices of the *k* rows kept after removing, one at
+    a time, the row having the smallest crowding distance. The rows are
+    sorted once per objective and linked to their neighbours, a removal only
+    updates the distances of the neighbours of the removed row, or of the
+    whole objective when its span changes."""
+    n, nobj = wvalues.shape
+    if n <= k:
+        return numpy.arange(n)
+
+    values = wvalues.T.tolist()
+    prev = [[None] * n for _ in range(nobj)]
+    next_ = [[None] * n for _ in range(nobj)]
+    first, last = [], []
+    for j in range(nobj):
+        order = numpy.argsort(wvalues[:, j], kind="stable").tolist()
+        for a, b in zip(order[:-1], order[1:]):
+            next_[j][a], prev[j][b] = b, a
+        first.append(order[0])
+        last.append(order[-1])
+
+    contributions = [[0.0] * n for _ in range(nobj)]
+
+    def contribute(j, i):
+        span = values[j][last[j]] - values[j][first[j]]
+        if i == first[j] or i == last[j]:
+            contributions[j][i] = numpy.inf
+        elif span == 0:
+            contributions[j][i] = 0.0
+        else:
+            contributions[j][i] = (values[j][next_[j][i]] - values[j][prev[j][i]]) / (nobj * span)
+
+    def distance(i):
+        d = 0.0
+        for j in range(nobj):
+            d += contributions[j][i]
+        return d
+
+    for j in range(nobj):
+        for i in range(n):
+            contribute(j, i)
+    distances = [distance(i) for i in range(n)]
+    heap = [(d, i) for i, d in enumerate(distances)]
+    heapq.heapify(heap)
+
+    alive = [True] * n
+    count = n
+    while count > k:
+        if count <= 2:
+            # All the distances are infinite, remove the first row
+            i = alive.index(True)
+        else:
+            d, i = heapq.heappop(heap)
+            while not alive[i] or distances[i] != d:
+                d, i = heapq.heappop(heap)
+        alive[i] = False
+        count -= 1
+        if count <= 2:
+            continue
+
+        touched = set()
+        for j in range(nobj):
+            p, q = prev[j][i], next_[j][i]
+            if p is not None:
+                next_[j][p] = q
+            if q is not None:
+                prev[j][q] = p
+            if i == first[j] or i == last[j]:
+                # The span changed, update the whole objective
+                first[j] = q if i == first[j] else first[j]
+                last[j] = p if i == last[j] else last[j]
+                node = first[j]
+                while node is not None:
+                    contribute(j, node)
+                    touched.add(node)
+                    node = next_[j][node]
+            else:
+                contribute(j, p)
+                contribute(j, q)
+                touched.update((p, q))
+
+        for t in touched:
+            d = distance(t)
+            if d != distances[t]:
+                distances[t] = d
+                heapq.heappush(heap, (d, t))
+
+    return numpy.flatnonzero(alive)
+
+
+__all__ = ['HallOfFame', 'ParetoFront', 'ParetoArchive', 'History', 'CompactHistory', 'Statistics', 'MultiStatistics', 'Logbook',
+           'ColumnarLogbook', 'CSVSink', 'JSONLSink', 'NPZSink']
 
 if __name__ == "__main__":
     import doctest
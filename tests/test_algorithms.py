@@ -15,6 +15,8 @@
 
 import random
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy
 import pytest
 
@@ -241,3 +243,61 @@ def test_nsga3(setup_teardown_multi_obj):
 
     for ind in pop:
         assert not (any(numpy.asarray(ind) < BOUND_LOW) or any(numpy.asarray(ind) > BOUND_UP))
+
+
+def _pipeline_toolbox():
+    toolbox = base.Toolbox()
+    toolbox.register("attr_float", random.uniform, -5, 5)
+    toolbox.register("individual", tools.initRepeat, creator.__dict__[INDCLSNAME], toolbox.attr_float, 5)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("evaluate", benchmarks.sphere)
+    toolbox.register("mate", tools.cxBlend, alpha=0.5)
+    toolbox.register("mutate", tools.mutGaussian, mu=0, sigma=0.5, indpb=0.2)
+    toolbox.register("select", tools.selTournament, tournsize=3)
+    return toolbox
+
+
+def test_pipelined_mu_plus_lambda(setup_teardown_single_obj):
+    toolbox = _pipeline_toolbox()
+    stats = tools.Statistics(lambda ind: ind.fitness.values)
+    stats.register("min", numpy.min)
+
+    runs = []
+    for executor in (None, ThreadPoolExecutor(4)):
+        random.seed(12)
+        pop = toolbox.population(n=30)
+        hof = tools.HallOfFame(1)
+        pop, logbook = algorithms.eaMuPlusLambda(pop, toolbox, 30, 60, 0.5, 0.3, 15, stats=stats,
+                                                 halloffame=hof, verbose=False, executor=executor)
+        runs.append((pop, logbook, hof))
+
+    # The offspring are produced in the same order, the runs are identical
+    (pop1, log1, hof1), (pop2, log2, hof2) = runs
+    assert pop1 == pop2
+    assert log1.select("gen", "nevals", "min") == log2.select("gen", "nevals", "min")
+    assert hof1[0].fitness.values == hof2[0].fitness.values
+
+
+def test_pipelined_simple(setup_teardown_single_obj):
+    toolbox = _pipeline_toolbox()
+    stats = tools.Statistics(lambda ind: ind.fitness.values)
+    stats.register("min", numpy.min)
+
+    runs = []
+    for executor in (None, ThreadPoolExecutor(4)):
+        random.seed(12)
+        pop = toolbox.population(n=30)
+        hof = tools.HallOfFame(3)
+        pop, logbook = algorithms.eaSimple(pop, toolbox, 0.5, 0.3, 20, stats=stats, halloffame=hof,
+                                           verbose=False, executor=executor)
+        runs.append((pop, logbook, hof))
+
+    # The random numbers are drawn in the same order as varAnd
+    (pop1, log1, hof1), (pop2, log2, hof2) = runs
+    assert pop1 == pop2
+    assert log1.select("gen", "nevals", "min") == log2.select("gen", "nevals", "min")
+    assert list(hof1) == list(hof2)
+    assert log2.select("gen") == list(range(21))
+    assert all(ind.fitness.valid for ind in pop2)
+    assert hof2[0].fitness.values[0] == min(log2.select("min"))
+    assert min(log2.select("min")) < log2.select("min")[0]
@@ -0,0 +1,127 @@
+import random
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from deap import algorithms
+from deap import base
+from deap import benchmarks
+from deap import cma
+from deap import creator
+from deap import tools
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+        creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
+        creator.create("IndividualMin", list, fitness=creator.FitnessMin)
+
+        self.toolbox = base.Toolbox()
+        self.toolbox.register("attr_bool", random.randint, 0, 1)
+        self.toolbox.register("individual", tools.initRepeat, creator.Individual, self.toolbox.attr_bool, 20)
+        self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
+        self.toolbox.register("evaluate", lambda ind: (sum(ind),))
+        self.toolbox.register("mate", tools.cxTwoPoint)
+        self.toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
+        self.toolbox.register("select", tools.selTournament, tournsize=3)
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        del creator.FitnessMax
+        del creator.Individual
+        del creator.FitnessMin
+        del creator.IndividualMin
+        shutil.rmtree(self.directory)
+
+    def test_resume_ea_simple(self):
+        random.seed(42)
+        population = self.toolbox.population(n=30)
+        hof = tools.HallOfFame(3)
+        reference, reference_log = algorithms.eaSimple(population, self.toolbox, 0.5, 0.2, 10,
+                                                       halloffame=hof, verbose=False)
+
+        random.seed(42)
+        population = self.toolbox.population(n=30)
+        checkpoint = tools.Checkpoint(self.directory, freq=3, full_every=2, keep=2)
+        algorithms.eaSimple(population, self.toolbox, 0.5, 0.2, 7, halloffame=tools.HallOfFame(3),
+                            verbose=False, checkpoint=checkpoint)
+        self.assertEqual(checkpoint.latest(), 6)
+
+        # The initial population is ignored when resuming
+        resumed_hof = tools.HallOfFame(3)
+        resumed, resumed_log = algorithms.eaSimple(self.toolbox.population(n=30), self.toolbox, 0.5, 0.2, 10,
+                                                   halloffame=resumed_hof, verbose=False,
+                                                   checkpoint=tools.Checkpoint(self.directory))
+
+        self.assertEqual(reference, resumed)
+        self.assertEqual([ind.fitness.values for ind in reference],
+                         [ind.fitness.values for ind in resumed])
+        self.assertEqual(list(hof), list(resumed_hof))
+        self.assertEqual(reference_log.select("gen"), resumed_log.select("gen"))
+
+    def test_differential_snapshot(self):
+        random.seed(42)
+        population = self.toolbox.population(n=10)
+        checkpoint = tools.Checkpoint(self.directory, full_every=3)
+        checkpoint.save(0, population)
+        population[3][0] = 1 - population[3][0]
+        population[3].fitness.values = (42,)
+        checkpoint.save(1, population)
+
+        state = tools.Checkpoint(self.directory).load(mmap=True)
+        self.assertEqual(state["generation"], 1)
+        self.assertEqual(state["population"], population)
+        self.assertEqual(state["population"][3].fitness.values, (42,))
+        self.assertFalse(state["population"][0].fitness.valid)
+        self.assertEqual(numpy.load(self.directory + "/gen_00000001/genomes.npy").shape, (1, 20))
+
+    def test_resume_generate_update(self):
+        numpy.random.seed(42)
+        strategy = cma.Strategy(centroid=[5.0] * 5, sigma=1.0)
+        self.toolbox.register("evaluate", benchmarks.sphere)
+        self.toolbox.register("generate", strategy.generate, creator.IndividualMin)
+        self.toolbox.register("update", strategy.update)
+        reference, _ = algorithms.eaGenerateUpdate(self.toolbox, ngen=20, verbose=False)
+
+        numpy.random.seed(42)
+        strategy = cma.Strategy(centroid=[5.0] * 5, sigma=1.0)
+        self.toolbox.register("generate", strategy.generate, creator.IndividualMin)
+        self.toolbox.register("update", strategy.update)
+        checkpoint = tools.Checkpoint(self.directory, freq=5)
+        algorithms.eaGenerateUpdate(self.toolbox, ngen=12, verbose=False, checkpoint=checkpoint)
+
+        strategy = cma.Strategy(centroid=[0.0] * 5, sigma=1.0)
+        self.toolbox.register("generate", strategy.generate, creator.IndividualMin)
+        self.toolbox.register("update", strategy.update)
+        resumed, _ = algorithms.eaGenerateUpdate(self.toolbox, ngen=20, verbose=False, checkpoint=checkpoint)
+
+        numpy.testing.assert_allclose(reference, resumed)
+
+    def test_memory_mapped_load(self):
+        creator.create("ArrayIndividual", numpy.ndarray, fitness=creator.FitnessMax)
+        try:
+            population = [creator.ArrayIndividual(numpy.arange(5.0) + i) for i in range(4)]
+            checkpoint = tools.Checkpoint(self.directory)
+            checkpoint.save(0, population)
+
+            checkpoint = tools.Checkpoint(self.directory)
+            state = checkpoint.load(mmap=True)
+            self.assertIsInstance(state["genomes"], numpy.memmap)
+            # The matrices are kept mapped for the following differential saves
+            self.assertIs(checkpoint._base[1], state["genomes"])
+            self.assertIsInstance(state["population"][0], creator.ArrayIndividual)
+            numpy.testing.assert_array_equal(numpy.array(state["population"]), numpy.array(population))
+        finally:
+            del creator.ArrayIndividual
+
+    def test_mixed_genes(self):
+        population = [creator.Individual([1, 0.5, 2]) for _ in range(3)]
+        checkpoint = tools.Checkpoint(self.directory)
+        checkpoint.save(0, population)
+        loaded = tools.Checkpoint(self.directory).load()["population"]
+        self.assertEqual([type(x) for x in loaded[0]], [int, float, int])
@@ -0,0 +1,406 @@
+import pickle
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+from deap import base
+from deap import benchmarks
+from deap import cma
+from deap import creator
+from deap import tools
+
+
+class CMATest(unittest.TestCase):
+    def setUp(self):
+        creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMin)
+
+    def tearDown(self):
+        del creator.FitnessMin
+        del creator.Individual
+
+    def run_strategy(self, strategy, ngen, evaluate=benchmarks.sphere):
+        for _ in range(ngen):
+            population = strategy.generate(creator.Individual)
+            for ind in population:
+                ind.fitness.values = evaluate(ind)
+            strategy.update(population)
+        return population
+
+    def test_lazy_eigendecomposition(self):
+        numpy.random.seed(42)
+        self.assertEqual(cma.Strategy([0.0] * 5, 1.0).eigen_interval, 1)
+        self.assertGreater(cma.Strategy([0.0] * 1000, 1.0).eigen_interval, 1)
+
+        strategy = cma.Strategy([5.0] * 10, 1.0, eigen_interval=5)
+        self.run_strategy(strategy, 11)
+        self.assertEqual(strategy.eigen_count, 3)
+        self.assertGreater(strategy.eigen_time, 0.0)
+        B = strategy.B.copy()
+        self.run_strategy(strategy, 1)
+        numpy.testing.assert_array_equal(B, strategy.B)
+
+        population = self.run_strategy(strategy, 250)
+        self.assertLess(min(ind.fitness.values[0] for ind in population), 1e-8)
+
+    def test_separable(self):
+        numpy.random.seed(42)
+        strategy = cma.StrategySeparable([5.0] * 10, 1.0)
+        self.assertEqual(strategy.C.shape, (10,))
+        self.assertFalse(hasattr(strategy, "eigen_interval"))
+
+        scaled = lambda ind: benchmarks.sphere(numpy.array(ind) * numpy.arange(1, 11))
+        population = self.run_strategy(strategy, 300, scaled)
+        self.assertLess(min(ind.fitness.values[0] for ind in population), 1e-8)
+        # The variances learned the scaling of the variables
+        self.assertGreater(strategy.C[0] / strategy.C[-1], 10.0)
+
+    def test_limited_memory(self):
+        numpy.random.seed(42)
+        strategy = cma.StrategyLimitedMemory([5.0] * 10, 1.0, m=3, nsteps=2)
+        population = self.run_strategy(strategy, 300)
+        self.assertLess(min(ind.fitness.values[0] for ind in population), 1e-8)
+        self.assertEqual(strategy.nvectors, 3)
+        self.assertEqual(strategy.P.shape, (3, 10))
+
+        # The implicit Cholesky factor A satisfies
+        # A A^T = (1 - ccov1) A_prev A_prev^T + ccov1 p p^T
+        A = numpy.identity(10)
+        for p in strategy.P:
+            A = numpy.linalg.cholesky((1 - strategy.ccov1) * numpy.dot(A, A.T)
+                                      + strategy.ccov1 * numpy.outer(p, p))
+        implicit = strategy._Az(numpy.identity(10)).T
+        numpy.testing.assert_allclose(numpy.dot(implicit, implicit.T), numpy.dot(A, A.T),
+                                      atol=1e-10)
+
+    def test_restarts_ipop(self):
+        numpy.random.seed(42)
+        toolbox = base.Toolbox()
+        toolbox.register("evaluate", benchmarks.sphere)
+        restarts = cma.Restarts(creator.Individual, [1.0] * 3, 0.5, regime="ipop",
+                                nrestarts=2, tolfun=1e-10)
+        halloffame, logbook = restarts.run(toolbox, verbose=False)
+        self.assertEqual(logbook.select("regime"), ["large"] * 3)
+        self.assertEqual(logbook.select("lambda"), [7, 14, 28])
+        for stop in logbook.select("stop"):
+            self.assertIn("TolFun", stop)
+        self.assertLess(halloffame[0].fitness.values[0], 1e-8)
+
+    def test_restarts_bipop(self):
+        numpy.random.seed(42)
+        toolbox = base.Toolbox()
+        toolbox.register("evaluate", benchmarks.rastrigin)
+        restarts = cma.Restarts(creator.Individual, lambda: numpy.random.uniform(-4, 4, 3), 2.0,
+                                nrestarts=3, maxevals=20000)
+        halloffame, logbook = restarts.run(toolbox, verbose=False)
+        regimes = logbook.select("regime")
+        nevals = logbook.select("nevals")
+        self.assertIn("small", regimes)
+        self.assertLessEqual(sum(nevals), 20000)
+        # The small restarts never spend more than the large ones after the first
+        large = sum(n for r, n in zip(regimes[1:], nevals[1:]) if r == "large")
+        small = sum(n for r, n in zip(regimes, nevals) if r == "small")
+        last_small = [n for r, n in zip(regimes, nevals) if r == "small"][-1]
+        self.assertLess(small - last_small, large)
+
+    def test_restarts_processes(self):
+        numpy.random.seed(42)
+        toolbox = base.Toolbox()
+        toolbox.register("evaluate", benchmarks.sphere)
+        restarts = cma.Restarts(creator.Individual, [1.0] * 3, 0.5, nrestarts=2,
+                                processes=2, tolfun=1e-10)
+        halloffame, logbook = restarts.run(toolbox, verbose=False)
+        self.assertEqual(sorted(logbook.select("restart")), list(range(len(logbook))))
+        self.assertIn("small", logbook.select("regime"))
+        self.assertLess(halloffame[0].fitness.values[0], 1e-8)
+
+    def test_generate_views(self):
+        creator.create("ArrayIndividual", numpy.ndarray, fitness=creator.FitnessMin)
+        try:
+            for cls in (cma.Strategy, cma.StrategySeparable, cma.StrategyLimitedMemory):
+                numpy.random.seed(42)
+                lists = cls([5.0] * 5, 1.0)
+                self.run_strategy(lists, 20)
+
+                numpy.random.seed(42)
+                arrays = cls([5.0] * 5, 1.0)
+                population = arrays.generate(creator.ArrayIndividual)
+                self.assertIsInstance(population[0], creator.ArrayIndividual)
+                self.assertFalse(population[0].fitness.valid)
+                # The individuals share the memory of a single sample matrix
+                self.assertTrue(all(numpy.shares_memory(ind, population[0].base)
+                                    for ind in population))
+                for ind in population:
+                    ind.fitness.values = benchmarks.sphere(ind)
+                arrays.update(population)
+                self.run_strategy(arrays, 19)
+                numpy.testing.assert_allclose(arrays.centroid, lists.centroid)
+                self.assertAlmostEqual(arrays.sigma, lists.sigma)
+        finally:
+            del creator.ArrayIndividual
+
+    def test_multiobjective_stacked_state(self):
+        creator.create("FitnessMin2", base.Fitness, weights=(-1.0, -1.0))
+        creator.create("Individual2", list, fitness=creator.FitnessMin2)
+        try:
+            numpy.random.seed(42)
+            evaluate = lambda ind: benchmarks.zdt1(numpy.clip(ind, 0.0, 1.0))
+            population = [creator.Individual2(numpy.random.uniform(0, 1, 5)) for _ in range(4)]
+            for ind in population:
+                ind.fitness.values = evaluate(ind)
+            strategy = cma.StrategyMultiObjective(population, sigma=0.3, mu=8, lambda_=6)
+            for _ in range(20):
+                offspring = strategy.generate(creator.Individual2)
+                for ind in offspring:
+                    ind.fitness.values = evaluate(ind)
+                strategy.update(offspring)
+
+            self.assertEqual(len(strategy.parents), 8)
+            self.assertEqual(strategy.A.shape, (8, 5, 5))
+            self.assertEqual(strategy.invCholesky.shape, (8, 5, 5))
+            self.assertEqual(strategy.pc.shape, (8, 5))
+            self.assertEqual(strategy.sigmas.shape, (8,))
+            numpy.testing.assert_allclose(numpy.matmul(strategy.A, strategy.invCholesky),
+                                          numpy.tile(numpy.identity(5), (8, 1, 1)), atol=1e-10)
+
+            # A' A'^T = alpha A A^T + beta v v^T for each factor
+            A, invCholesky = strategy.A.copy(), strategy.invCholesky.copy()
+            v = numpy.random.standard_normal((8, 5))
+            alpha = numpy.full(8, 0.9)
+            new_invCholesky, new_A = cma._rank_one_update(invCholesky.copy(), A.copy(),
+                                                            alpha, 0.1, v)
+            for i in range(8):
+                numpy.testing.assert_allclose(
+                    numpy.dot(new_A[i], new_A[i].T),
+                    0.9 * numpy.dot(A[i], A[i].T) + 0.1 * numpy.outer(v[i], v[i]), atol=1e-10)
+                numpy.testing.assert_allclose(numpy.dot(new_A[i], new_invCholesky[i]),
+                                              numpy.identity(5), atol=1e-10)
+        finally:
+            del creator.FitnessMin2
+            del creator.Individual2
+
+    def test_multiobjective_parent_factors(self):
+        creator.create("FitnessMin2", base.Fitness, weights=(-1.0, -1.0))
+        creator.create("Individual2", list, fitness=creator.FitnessMin2)
+        try:
+            numpy.random.seed(3)
+            population = [creator.Individual2(numpy.random.uniform(0, 1, 5)) for _ in range(4)]
+            for ind in population:
+                ind.fitness.values = benchmarks.zdt1(ind)
+            # As many offspring as parents, chosen at random since lambda_ != mu
+            strategy = cma.StrategyMultiObjective(population, sigma=1.0, mu=8, lambda_=4)
+            strategy.A[0] *= 1e6
+            strategy.A[1:] *= 1e-6
+            for _ in range(5):
+                for ind in strategy.generate(creator.Individual2):
+                    index = ind._ps[1]
+                    distance = numpy.linalg.norm(numpy.subtract(ind, population[index]))
+                    if index == 0:
+                        self.assertGreater(distance, 1e3)
+                    else:
+                        self.assertLess(distance, 1e-3)
+        finally:
+            del creator.FitnessMin2
+            del creator.Individual2
+
+    def test_ask_tell(self):
+        numpy.random.seed(42)
+        strategy = cma.Strategy([5.0] * 5, 1.0, lambda_=6)
+        asktell = cma.AskTell(strategy, creator.Individual, staleness=0)
+        candidates = [asktell.ask() for _ in range(8)]
+        self.assertEqual(asktell.version, 0)
+
+        # Results in any order, the update happens with the sixth result
+        for ind in reversed(candidates[2:]):
+            population = asktell.tell(ind, benchmarks.sphere(ind))
+        self.assertEqual(asktell.version, 1)
+        self.assertEqual(len(population), 6)
+
+        # The two remaining candidates are too stale
+        for ind in candidates[:2]:
+            self.assertIsNone(asktell.tell(ind, benchmarks.sphere(ind)))
+        self.assertEqual(asktell.ndiscarded, 2)
+
+        # The batch must contain at least the mu parents
+        self.assertRaises(ValueError, cma.AskTell, strategy, creator.Individual, batch=2)
+        self.assertEqual(asktell.nevals, 8)
+        self.assertRaises(ValueError, asktell.tell, candidates[0])
+
+    def test_ask_tell_executor(self):
+        numpy.random.seed(42)
+        for strategy in (cma.Strategy([5.0] * 5, 1.0),
+                         cma.StrategyOnePlusLambda(creator.Individual([5.0] * 5), 1.0)):
+            if isinstance(strategy, cma.StrategyOnePlusLambda):
+                strategy.parent.fitness.values = benchmarks.sphere(strategy.parent)
+            asktell = cma.AskTell(strategy, creator.Individual, staleness=2)
+            halloffame = tools.HallOfFame(1)
+            with ThreadPoolExecutor(4) as executor:
+                logbook = asktell.run(benchmarks.sphere, executor, maxevals=3000, inflight=8,
+                                      halloffame=halloffame, verbose=False)
+            self.assertEqual(asktell.nevals, 3000)
+            self.assertEqual(len(logbook), asktell.version)
+            self.assertLess(halloffame[0].fitness.values[0], 1e-8)
+
+    def test_surrogate(self):
+        self.assertEqual(cma._kendall_tau([1, 2, 3], [10, 20, 30]), 1.0)
+        self.assertEqual(cma._kendall_tau([1, 2, 3], [30, 20, 10]), -1.0)
+
+        numpy.random.seed(42)
+        surrogate = cma.Surrogate(cma.Strategy([1.0] * 5, 0.5), benchmarks.sphere)
+        halloffame = tools.HallOfFame(1)
+        population, logbook = surrogate.run(creator.Individual, 100, halloffame=halloffame,
+                                            verbose=False)
+        self.assertTrue(all(ind.fitness.valid for ind in population))
+        self.assertEqual(surrogate.nevals + surrogate.npredicted, 100 * len(population))
+        self.assertEqual(sum(logbook.select("nevals")), surrogate.nevals)
+        # Less than a third of the candidates are truly evaluated
+        self.assertLess(surrogate.nevals, 100 * len(population) / 3)
+        self.assertLess(halloffame[0].fitness.values[0], 1e-8)
+        self.assertEqual(halloffame[0].fitness.values, benchmarks.sphere(halloffame[0]))
+
+        # The individuals with predicted values are marked
+        population = surrogate.generate(creator.Individual)
+        evaluated = surrogate.evaluate(population)
+        predicted = [ind for ind in population if getattr(ind, "surrogate", False)]
+        self.assertGreater(len(predicted), 0)
+        self.assertEqual(len(evaluated) + len(predicted), len(population))
+        self.assertFalse(any(getattr(ind, "surrogate", False) for ind in evaluated))
+
+    def test_sampling(self):
+        rng = numpy.random.RandomState(42)
+        arz = cma._standard_normal(rng, 7, 4, "mirrored")
+        self.assertEqual(arz.shape, (7, 4))
+        numpy.testing.assert_array_equal(arz[0:6:2], -arz[1:6:2])
+        arz = cma._standard_normal(rng, 6, 4, "orthogonal")
+        gram = numpy.dot(arz[:4], arz[:4].T)
+        numpy.testing.assert_allclose(gram - numpy.diag(numpy.diag(gram)), 0.0, atol=1e-10)
+        self.assertRaises(RuntimeError, cma._standard_normal, rng, 6, 4, "sobol")
+        # The orthogonal samples are not biased in any direction
+        arz = numpy.array([cma._standard_normal(rng, 10, 10, "orthogonal") for _ in range(2000)])
+        self.assertLess(numpy.abs(arz.mean(axis=0)).max(), 0.15)
+
+        self.assertRaises(ValueError, cma.Strategy, [0.0] * 5, 1.0, lambda_=10, mu=6,
+                          sampling="mirrored")
+
+        for cls in (cma.Strategy, cma.StrategySeparable):
+            for sampling in ("mirrored", "orthogonal"):
+                numpy.random.seed(42)
+                strategy = cls([5.0] * 5, 1.0, lambda_=10, mu=5, sampling=sampling)
+                population = self.run_strategy(strategy, 200)
+                self.assertLess(min(ind.fitness.values[0] for ind in population), 1e-8)
+
+    def test_sequential_evaluation(self):
+        numpy.random.seed(42)
+        parent = creator.Individual([5.0] * 5)
+        parent.fitness.values = benchmarks.sphere(parent)
+        strategy = cma.StrategyOnePlusLambda(parent, 1.0, lambda_=4, sampling="mirrored")
+        nevals = 0
+        for _ in range(500):
+            population = strategy.generate(creator.Individual)
+            parent = strategy.parent
+            evaluated = strategy.evaluate(population, benchmarks.sphere)
+            nevals += len(evaluated)
+            # Only the last evaluated offspring may improve on the parent
+            self.assertFalse(any(parent.fitness < ind.fitness for ind in evaluated[:-1]))
+            if parent.fitness < evaluated[-1].fitness:
+                self.assertEqual(strategy.parent, evaluated[-1])
+        self.assertLess(nevals, 500 * 4)
+        self.assertLess(strategy.parent.fitness.values[0], 1e-8)
+
+    def test_batch(self):
+        # A single instance follows the same path as Strategy
+        numpy.random.seed(42)
+        strategy = cma.Strategy([5.0] * 5, 1.0)
+        self.run_strategy(strategy, 30)
+        numpy.random.seed(42)
+        batch = cma.StrategyBatch([[5.0] * 5], 1.0)
+        for _ in range(30):
+            X = batch.sample()
+            batch.tell(numpy.sum(X ** 2, axis=-1))
+        numpy.testing.assert_allclose(batch.centroids[0], strategy.centroid)
+        self.assertAlmostEqual(batch.sigma[0], strategy.sigma)
+
+        numpy.random.seed(42)
+        batch = cma.StrategyBatch(numpy.random.uniform(-5, 5, (20, 4)), [0.5] * 10 + [2.0] * 10)
+        while not batch.stopped.all():
+            populations = batch.generate(creator.Individual)
+            for population in populations:
+                for ind in population:
+                    ind.fitness.values = benchmarks.sphere(ind)
+            batch.update(populations)
+        self.assertTrue(all(len(conditions) > 0 for conditions in batch.conditions))
+        self.assertTrue(numpy.all(batch.best_values > -1e-10))
+        numpy.testing.assert_allclose(numpy.sum(batch.best ** 2, axis=1), -batch.best_values)
+
+        # Stopped instances are frozen
+        centroids = batch.centroids.copy()
+        populations = batch.generate(creator.Individual)
+        self.assertEqual(sum(len(population) for population in populations), 0)
+        batch.update(populations)
+        numpy.testing.assert_array_equal(centroids, batch.centroids)
+
+        # Noise makes the instances stagnate, the values of the stagnation
+        # window are kept in ring buffers of constant size
+        self.assertNotIsInstance(batch, cma.Strategy)
+        numpy.random.seed(42)
+        batch = cma.StrategyBatch(numpy.ones((5, 4)), 0.5, tolfun=0, tolx=0)
+        shape = batch._bests.shape
+        while not batch.stopped.all():
+            X = batch.sample()
+            batch.tell(numpy.sum(X ** 2, axis=-1) + numpy.random.standard_normal(X.shape[:2]))
+        self.assertEqual(batch._bests.shape, shape)
+        self.assertTrue(all("Stagnation" in conditions for conditions in batch.conditions))
+
+    def test_batch_repaired_individuals(self):
+        numpy.random.seed(42)
+        batch = cma.StrategyBatch(numpy.full((3, 5), 5.0), 1.0)
+        self.assertRaises(RuntimeError, batch.update, [[], [], []])
+        self.assertRaises(RuntimeError, batch.tell, numpy.zeros((3, batch.lambda_)))
+        for _ in range(20):
+            populations = batch.generate(creator.Individual)
+            for population in populations:
+                for ind in population:
+                    # Repair the individuals in place inside the box [4, inf)
+                    ind[:] = [max(x, 4.0) for x in ind]
+                    ind.fitness.values = benchmarks.sphere(ind)
+            batch.update(populations)
+        # The centroids are recombined from the repaired individuals
+        self.assertTrue(numpy.all(batch.centroids >= 4.0 - 1e-12))
+        self.assertTrue(numpy.all(batch.best >= 4.0))
+
+    def test_one_plus_lambda_factor(self):
+        numpy.random.seed(42)
+        ellipsoid = lambda ind: (sum(10 ** (6. * i / 4) * x ** 2 for i, x in enumerate(ind)),)
+        parent = creator.Individual([1.0] * 5)
+        parent.fitness.values = ellipsoid(parent)
+        strategy = cma.StrategyOnePlusLambda(parent, 0.5)
+        # The covariance matrix is not stored
+        self.assertNotIn("C", vars(strategy))
+        self.run_strategy(strategy, 3000, ellipsoid)
+        self.assertLess(strategy.parent.fitness.values[0], 1e-8)
+        numpy.testing.assert_allclose(numpy.dot(strategy.A, strategy.invCholesky),
+                                      numpy.identity(5), atol=1e-8)
+        numpy.testing.assert_allclose(strategy.C, numpy.dot(strategy.A, strategy.A.T))
+        # The factor learned the scaling of the variables
+        self.assertGreater(strategy.C[0, 0] / strategy.C[-1, -1], 100.0)
+
+        # The covariance matrix can still be set
+        C = numpy.diag(numpy.arange(1.0, 6.0)) + 0.1
+        strategy.C = C
+        numpy.testing.assert_allclose(strategy.C, C)
+        numpy.testing.assert_allclose(numpy.dot(strategy.A, strategy.invCholesky),
+                                      numpy.identity(5), atol=1e-10)
+
+        # Strategies pickled with the dense covariance matrix still load
+        C = strategy.C
+        state = dict(vars(strategy), C=C)
+        del state["invCholesky"]
+        old = cma.StrategyOnePlusLambda.__new__(cma.StrategyOnePlusLambda)
+        old.__dict__.update(state)
+        loaded = pickle.loads(pickle.dumps(old))
+        self.assertNotIn("C", vars(loaded))
+        numpy.testing.assert_allclose(numpy.dot(loaded.A, loaded.invCholesky),
+                                      numpy.identity(5), atol=1e-8)
+        self.run_strategy(loaded, 10, ellipsoid)
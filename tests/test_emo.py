@@ -0,0 +1,38 @@
+import unittest
+
+import numpy
+
+from deap import tools
+
+
+class ReferencePointsTest(unittest.TestCase):
+    def test_uniform_reference_points(self):
+        ref_points = tools.uniform_reference_points(3, p=4)
+        self.assertEqual(ref_points.shape, (15, 3))
+        numpy.testing.assert_allclose(ref_points.sum(axis=1), 1.0)
+        numpy.testing.assert_allclose(ref_points[0], [0.0, 0.0, 1.0])
+        numpy.testing.assert_allclose(ref_points[-1], [1.0, 0.0, 0.0])
+
+    def test_uniform_reference_points_copy(self):
+        ref_points = tools.uniform_reference_points(3, p=4, scaling=0.5)
+        ref_points[:] = 0
+        ref_points = tools.uniform_reference_points(3, p=4, scaling=0.5)
+        numpy.testing.assert_allclose(ref_points.sum(axis=1), 1.0)
+
+    def test_two_layer_reference_points(self):
+        ref_points = tools.two_layer_reference_points(8, 3, 2)
+        self.assertEqual(ref_points.shape, (120 + 36, 8))
+        self.assertEqual(len(numpy.unique(ref_points, axis=0)), len(ref_points))
+
+    def test_riesz_reference_points(self):
+        ref_points = tools.riesz_reference_points(3, 30, ngen=200)
+        self.assertEqual(ref_points.shape, (30, 3))
+        numpy.testing.assert_allclose(ref_points.sum(axis=1), 1.0)
+        self.assertTrue(numpy.all(ref_points >= 0))
+
+        dist = numpy.linalg.norm(ref_points[:, numpy.newaxis] - ref_points, axis=2)
+        numpy.fill_diagonal(dist, numpy.inf)
+        self.assertGreater(dist.min(), 0.1)
+
+        # Only the extreme points
+        numpy.testing.assert_array_equal(tools.riesz_reference_points(3, 3), numpy.eye(3))
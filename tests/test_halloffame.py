@@ -0,0 +1,110 @@
+import random
+import unittest
+
+import numpy
+
+from deap import base
+from deap import creator
+from deap import tools
+from deap.tools.support import _crowding_distances, _crowding_truncation
+
+
+class ParetoArchiveTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(42)
+        creator.create("FitnessMO", base.Fitness, weights=(-1.0, -1.0, 1.0))
+        creator.create("IndividualMO", list, fitness=creator.FitnessMO)
+
+    def tearDown(self):
+        del creator.FitnessMO
+        del creator.IndividualMO
+
+    def population(self, n, attr=lambda: random.randint(0, 9)):
+        population = list()
+        for _ in range(n):
+            ind = creator.IndividualMO(random.random() for _ in range(3))
+            ind.fitness.values = (attr(), attr(), attr())
+            population.append(ind)
+        return population
+
+    def test_same_front_as_pareto_front(self):
+        front = tools.ParetoFront()
+        archive = tools.ParetoArchive()
+        for _ in range(5):
+            population = self.population(50)
+            front.update(population)
+            archive.update(population)
+
+        self.assertEqual([ind.fitness.wvalues for ind in front],
+                         [ind.fitness.wvalues for ind in archive])
+        self.assertEqual(sorted(front), sorted(archive))
+        numpy.testing.assert_array_equal(archive.wvalues,
+                                         [ind.fitness.wvalues for ind in archive])
+
+    def test_maxsize(self):
+        archive = tools.ParetoArchive(maxsize=5)
+        archive.update(self.population(500, random.random))
+        self.assertEqual(len(archive), 5)
+
+    def test_crowding_truncation(self):
+        rs = numpy.random.RandomState(3)
+        for wvalues in (rs.rand(60, 2), rs.rand(60, 3), rs.randint(0, 4, (60, 3)).astype(float)):
+            for k in (0, 1, 10, 40):
+                # Recompute the distances after each removal
+                indices = numpy.arange(len(wvalues))
+                while len(indices) > k:
+                    distances = _crowding_distances(wvalues[indices])
+                    indices = numpy.delete(indices, numpy.argmin(distances))
+                numpy.testing.assert_array_equal(_crowding_truncation(wvalues, k), indices)
+
+    def test_epsilon(self):
+        archive = tools.ParetoArchive(epsilon=5.0)
+        archive.update(self.population(500))
+        boxes = numpy.floor(archive.wvalues / 5.0)
+        self.assertEqual(len(numpy.unique(boxes, axis=0)), len(archive))
+
+    def test_copy_on_insert(self):
+        archive = tools.ParetoArchive()
+        population = self.population(10)
+        archive.update(population)
+        for ind in archive:
+            self.assertFalse(any(ind is other for other in population))
+
+
+class HallOfFameTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(42)
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+    def tearDown(self):
+        del creator.FitnessMax
+        del creator.Individual
+
+    def population(self, n):
+        population = list()
+        for _ in range(n):
+            ind = creator.Individual(random.randint(0, 5) for _ in range(4))
+            ind.fitness.values = (sum(ind),)
+            population.append(ind)
+        return population
+
+    def test_hash_key(self):
+        hof = tools.HallOfFame(10)
+        hash_hof = tools.HallOfFame(10, hash_key=tuple)
+        for _ in range(10):
+            population = self.population(50)
+            hof.update(population)
+            hash_hof.update(population)
+
+        self.assertEqual(list(hof), list(hash_hof))
+        self.assertEqual(len(set(map(tuple, hash_hof))), len(hash_hof))
+        self.assertEqual(set(hash_hof.hashes), set(map(tuple, hash_hof)))
+
+    def test_keep_best(self):
+        hof = tools.HallOfFame(5, hash_key=tuple)
+        population = self.population(200)
+        hof.update(population)
+        best = sorted(set(sum(ind) for ind in population), reverse=True)
+        self.assertEqual(hof[0].fitness.values, (best[0],))
+        self.assertTrue(all(a.fitness >= b.fitness for a, b in zip(hof, hof[1:])))
@@ -0,0 +1,80 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from deap import algorithms
+from deap import base
+from deap import creator
+from deap import tools
+
+
+class HistoryTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(64)
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+        self.toolbox = base.Toolbox()
+        self.toolbox.register("attr_bool", random.randint, 0, 1)
+        self.toolbox.register("individual", tools.initRepeat, creator.Individual, self.toolbox.attr_bool, 10)
+        self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
+        self.toolbox.register("evaluate", lambda ind: (sum(ind),))
+        self.toolbox.register("mate", tools.cxTwoPoint)
+        self.toolbox.register("mutate", tools.mutFlipBit, indpb=0.1)
+        self.toolbox.register("select", tools.selTournament, tournsize=3)
+
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        del creator.FitnessMax
+        del creator.Individual
+        shutil.rmtree(self.tmpdir)
+
+    def run_history(self, history):
+        toolbox = base.Toolbox()
+        toolbox.__dict__.update(self.toolbox.__dict__)
+        toolbox.decorate("mate", history.decorator)
+        toolbox.decorate("mutate", history.decorator)
+
+        population = toolbox.population(n=20)
+        history.update(population)
+        population, _ = algorithms.eaSimple(population, toolbox, cxpb=0.5, mutpb=0.2,
+                                            ngen=5, verbose=False)
+        return population
+
+    def test_compact_history(self):
+        random.seed(64)
+        history = tools.History()
+        population = self.run_history(history)
+
+        random.seed(64)
+        compact = tools.CompactHistory()
+        compact_population = self.run_history(compact)
+
+        self.assertEqual(dict(history.genealogy_tree), dict(compact.genealogy_tree))
+        self.assertEqual(history.genealogy_history, dict(compact.genealogy_history))
+        for ind, compact_ind in zip(population, compact_population):
+            self.assertEqual(history.getGenealogy(ind), compact.getGenealogy(compact_ind))
+            self.assertEqual(history.getGenealogy(ind, max_depth=2),
+                             compact.getGenealogy(compact_ind, max_depth=2))
+
+    def test_compact_history_spill(self):
+        random.seed(64)
+        history = tools.History()
+        population = self.run_history(history)
+
+        random.seed(64)
+        filename = os.path.join(self.tmpdir, "history.db")
+        compact = tools.CompactHistory(filename, sample=lambda i: i % 10 == 0, buffer_size=4)
+        self.run_history(compact)
+
+        self.assertEqual(dict(history.genealogy_tree), dict(compact.genealogy_tree))
+        self.assertEqual(list(compact.genealogy_history), list(range(10, compact.genealogy_index + 1, 10)))
+        self.assertEqual(history.getGenealogy(population[0]), compact.getGenealogy(population[0]))
+        compact.close()
+
+        compact = tools.CompactHistory(filename)
+        self.assertEqual(dict(history.genealogy_tree), dict(compact.genealogy_tree))
+        compact.close()
@@ -1,5 +1,11 @@
+import json
+import os
+import shutil
+import tempfile
 import unittest
 
+import numpy
+
 from deap import tools
 
 
@@ -36,6 +42,92 @@ class LogbookTest(unittest.TestCase):
         print(self.logbook.stream)
 
 
+class ColumnarLogbookTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_same_stream(self):
+        logbook = tools.Logbook()
+        columnar = tools.ColumnarLogbook()
+        for gen in range(5):
+            record = dict(gen=gen, evals=100, fitness={'avg': 1.0 / (gen + 1), 'max': 10 * gen},
+                          length={'avg': 1.0, 'max': 30})
+            logbook.record(**record)
+            columnar.record(**record)
+            self.assertEqual(logbook.stream, columnar.stream)
+
+        self.assertEqual(logbook.select("gen", "evals"), columnar.select("gen", "evals"))
+        self.assertEqual(logbook.chapters["fitness"].select("avg"),
+                         columnar.chapters["fitness"].select("avg"))
+        self.assertEqual(list(logbook), list(columnar))
+        self.assertEqual(str(logbook), str(columnar))
+
+    def test_window_and_sinks(self):
+        jsonl = os.path.join(self.tmpdir, "log.jsonl")
+        npz = os.path.join(self.tmpdir, "log.npz")
+        logbook = tools.ColumnarLogbook(window=3, sinks=[tools.JSONLSink(jsonl), tools.NPZSink(npz)])
+        for gen in range(10):
+            logbook.record(gen=gen, max=numpy.float64(gen * 2), fitness={'avg': gen / 2.0})
+        logbook.close()
+
+        self.assertEqual(len(logbook), 3)
+        self.assertEqual(logbook.nrecords, 10)
+        self.assertEqual(logbook.select("gen"), [7, 8, 9])
+        self.assertEqual(logbook.chapters["fitness"].select("avg"), [3.5, 4.0, 4.5])
+
+        with open(jsonl) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["gen"] for r in records], list(range(10)))
+        self.assertEqual(records[-1]["fitness.avg"], 4.5)
+
+        arrays = tools.NPZSink.load(npz)
+        numpy.testing.assert_array_equal(arrays["max"], numpy.arange(10) * 2.0)
+
+    def test_npz_chunks(self):
+        npz = os.path.join(self.tmpdir, "log.npz")
+        sink = tools.NPZSink(npz, chunksize=4)
+        logbook = tools.ColumnarLogbook(window=1, sinks=[sink])
+        for gen in range(10):
+            record = dict(gen=gen)
+            if gen >= 6:
+                record["evals"] = 10
+            logbook.record(**record)
+            # At most a chunk of records is kept in memory
+            self.assertLess(sink.nrecords, 4)
+        logbook.close()
+
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ["log.00000.npz", "log.00001.npz", "log.00002.npz"])
+        arrays = tools.NPZSink.load(npz)
+        self.assertEqual(arrays["gen"].tolist(), list(range(10)))
+        self.assertEqual(arrays["evals"].tolist(), [None] * 6 + [10] * 4)
+
+    def test_csv_new_fields(self):
+        filename = os.path.join(self.tmpdir, "log.csv")
+        logbook = tools.ColumnarLogbook(sinks=[tools.CSVSink(filename)])
+        logbook.record(gen=0, evals=100)
+        logbook.record(gen=1, evals=50, fitness={'max': 2.0})
+        logbook.record(gen=2, evals=50)
+        logbook.close()
+
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines, ["gen,evals,fitness.max", "0,100,", "1,50,2.0", "2,50,"])
+
+    def test_missing_chapter(self):
+        logbook = tools.ColumnarLogbook(window=2)
+        logbook.record(gen=0)
+        logbook.record(gen=1, fitness={'max': 1.0})
+        logbook.record(gen=2)
+        logbook.record(gen=3, fitness={'max': 3.0})
+        self.assertEqual(logbook.select("gen"), [2, 3])
+        self.assertEqual(logbook.chapters["fitness"].select("max"), [None, 3.0])
+        self.assertEqual(len(str(logbook).splitlines()), 5)
+
+
 if __name__ == "__main__":
     suite = unittest.TestLoader().loadTestsFromTestCase(LogbookTest)
     unittest.TextTestRunner(verbosity=2).run(suite)
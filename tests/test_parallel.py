@@ -0,0 +1,313 @@
+import functools
+import os
+import random
+import tempfile
+import time
+import unittest
+
+import numpy
+
+from deap import algorithms
+from deap import base
+from deap import creator
+from deap import parallel
+from deap import tools
+
+
+def _evalOneMax(individual):
+    return sum(individual),
+
+
+def _evalTwoObj(individual):
+    return float(sum(individual)), float(len(individual) - sum(individual))
+
+
+def _evalIndividual(individual):
+    return float(isinstance(individual, creator.Individual) and individual.fitness.values == ()), \
+        float(sum(individual))
+
+
+class SharedMemoryMapTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The classes must exist in the workers to rebuild the individuals
+        creator.create("FitnessMulti", base.Fitness, weights=(1.0, -1.0))
+        creator.create("Individual", list, fitness=creator.FitnessMulti)
+        cls.map = parallel.SharedMemoryMap(processes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.map.close()
+        del creator.FitnessMulti
+        del creator.Individual
+
+    def test_shared_evaluation(self):
+        random.seed(42)
+        pop = [creator.Individual(random.randint(0, 1) for _ in range(20)) for _ in range(50)]
+        fitnesses = self.map(_evalTwoObj, pop)
+        self.assertEqual(fitnesses, [_evalTwoObj(ind) for ind in pop])
+
+        # Larger populations reallocate the block
+        pop = pop * 3
+        self.assertEqual(self.map(_evalTwoObj, pop), [_evalTwoObj(ind) for ind in pop])
+
+    def test_individual_argument(self):
+        # The function receives individuals on the shared and fallback paths
+        pop = [creator.Individual([i, 1]) for i in range(10)]
+        self.assertIsNotNone(parallel._numeric_matrix(pop))
+        self.assertEqual(self.map(_evalIndividual, pop), [(1.0, float(i + 1)) for i in range(10)])
+        pop[0].age = 3
+        self.assertIsNone(parallel._numeric_matrix(pop))
+        self.assertEqual(self.map(_evalIndividual, pop), [(1.0, float(i + 1)) for i in range(10)])
+
+    def test_fallback(self):
+        pop = [[1] * (i + 1) for i in range(10)]
+        self.assertEqual(self.map(_evalOneMax, pop), [_evalOneMax(ind) for ind in pop])
+        self.assertEqual(self.map(_evalOneMax, []), [])
+
+
+class BalancedMapTest(unittest.TestCase):
+    def test_balanced_chunks(self):
+        costs = numpy.array([10.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 9.0])
+        chunks = parallel._balanced_chunks(costs, 2)
+        loads = [costs[chunk].sum() for chunk in chunks]
+        self.assertEqual(sorted(sum(chunks, [])), list(range(len(costs))))
+        self.assertEqual(loads, [15.0, 14.0])
+
+    def test_latency_model(self):
+        model = parallel.LatencyModel()
+        self.assertEqual(model.predict([[0] * 3, [0]]).tolist(), [3.0, 1.0])
+        model.update([1, 2, 3, 4], [0.3, 0.5, 0.7, 0.9])
+        intercept, slope = model.coefficients
+        self.assertAlmostEqual(intercept, 0.1)
+        self.assertAlmostEqual(slope, 0.2)
+
+    def test_map(self):
+        pop = [[1] * random.randint(1, 50) for _ in range(100)]
+        with parallel.BalancedMap(processes=2) as bmap:
+            self.assertEqual(bmap(_evalOneMax, pop), [_evalOneMax(ind) for ind in pop])
+            self.assertEqual(bmap(_evalOneMax, pop), [_evalOneMax(ind) for ind in pop])
+            self.assertEqual(bmap(_evalOneMax, []), [])
+            self.assertIsNotNone(bmap.model.coefficients)
+            utilization = bmap.utilization()
+            self.assertTrue(0 < len(utilization) <= 2)
+            self.assertTrue(all(0 <= u <= 1 for u in utilization.values()))
+
+
+def _evalSleep(individual):
+    time.sleep(individual[0])
+    return individual[0],
+
+
+def _evalSleepDieOnce(individual, path):
+    # The first worker dies after sleeping, the second one completes
+    time.sleep(individual[0])
+    if not os.path.exists(path):
+        open(path, "w").close()
+        os._exit(1)
+    return individual[0],
+
+
+def _evalRaise(individual):
+    raise ValueError("bad individual")
+
+
+class TimeoutMapTest(unittest.TestCase):
+    def setUp(self):
+        creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMin)
+
+    def tearDown(self):
+        del creator.FitnessMin
+        del creator.Individual
+
+    def test_timeout(self):
+        pop = [creator.Individual([d]) for d in (0.0, 5.0, 0.01, 0.0)]
+        with parallel.TimeoutMap(processes=2, timeout=0.5, speculate=None) as tmap:
+            start = time.time()
+            self.assertEqual(tmap(_evalSleep, pop), [(0.0,), (float("inf"),), (0.01,), (0.0,)])
+            self.assertLess(time.time() - start, 3.0)
+            self.assertEqual(tmap.timeouts, 1)
+            self.assertEqual(tmap.record(), {"timeouts": 1})
+
+            # The killed worker was replaced
+            self.assertEqual(tmap(_evalSleep, pop[2:]), [(0.01,), (0.0,)])
+            self.assertEqual(tmap.timeouts, 0)
+            self.assertEqual(tmap.total_timeouts, 1)
+
+    def test_timeout_after_worker_death(self):
+        pop = [creator.Individual([0.6])]
+        with tempfile.TemporaryDirectory() as directory:
+            evaluate = functools.partial(_evalSleepDieOnce, path=os.path.join(directory, "died"))
+            with parallel.TimeoutMap(processes=1, timeout=1.0, speculate=None) as tmap:
+                # The evaluation sent again gets the full timeout
+                self.assertEqual(tmap(evaluate, pop), [(0.6,)])
+                self.assertEqual(tmap.timeouts, 0)
+
+    def test_speculation(self):
+        pop = [creator.Individual([0.01]) for _ in range(10)] + [creator.Individual([0.5])]
+        with parallel.TimeoutMap(processes=2, speculate=2.0) as tmap:
+            self.assertEqual(tmap(_evalSleep, pop), [tuple(ind) for ind in pop])
+            self.assertEqual(tmap.speculations, 1)
+
+    def test_error(self):
+        with parallel.TimeoutMap(processes=1) as tmap:
+            self.assertRaises(ValueError, tmap, _evalRaise, [creator.Individual([0])])
+            self.assertEqual(tmap(_evalSleep, [creator.Individual([0])]), [(0,)])
+
+    def test_logbook(self):
+        toolbox = base.Toolbox()
+        toolbox.register("evaluate", _evalSleep)
+        toolbox.register("mate", lambda a, b: (a, b))
+        toolbox.register("mutate", lambda a: (a,))
+        toolbox.register("select", tools.selRandom)
+        pop = [creator.Individual([0.0]) for _ in range(4)]
+        with parallel.TimeoutMap(processes=2, timeout=1.0) as tmap:
+            toolbox.register("map", tmap)
+            _, logbook = algorithms.eaSimple(pop, toolbox, 0.0, 0.0, 2, verbose=False)
+        self.assertEqual(logbook.select("timeouts"), [0, 0, 0])
+        self.assertIn("timeouts", logbook.header)
+
+
+def _evalOneMaxDeme(individual):
+    return sum(individual),
+
+
+def _evalFailing(individual):
+    raise ValueError("Invalid individual")
+
+
+def _evalDying(individual):
+    os._exit(3)
+
+
+class IslandModelTest(unittest.TestCase):
+    def setUp(self):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+        self.toolbox = base.Toolbox()
+        self.toolbox.register("attr_bool", random.randint, 0, 1)
+        self.toolbox.register("individual", tools.initRepeat, creator.Individual, self.toolbox.attr_bool, 30)
+        self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
+        self.toolbox.register("evaluate", _evalOneMaxDeme)
+        self.toolbox.register("mate", tools.cxTwoPoint)
+        self.toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
+        self.toolbox.register("select", tools.selTournament, tournsize=3)
+
+    def tearDown(self):
+        del creator.FitnessMax
+        del creator.Individual
+
+    def test_topologies(self):
+        self.assertEqual([parallel._ring(i, 4) for i in range(4)], [[1], [2], [3], [0]])
+        self.assertEqual(parallel._torus(0, 6), [1, 2, 3])
+        self.assertEqual(parallel._torus(4, 9), [1, 3, 5, 7])
+        self.assertEqual(parallel._complete(1, 3), [0, 2])
+        self.assertTrue(all(parallel._random(2, 4)[0] in (0, 1, 3) for _ in range(20)))
+
+    def test_run(self):
+        random.seed(42)
+        demes = [self.toolbox.population(n=30) for _ in range(4)]
+        stats = tools.Statistics(lambda ind: ind.fitness.values)
+        stats.register("max", numpy.max)
+        hof = tools.HallOfFame(2)
+        for topology in ("ring", "torus", "random", "complete"):
+            hof.clear()
+            islands = parallel.IslandModel(self.toolbox, 0.5, 0.2, topology=topology, interval=3, k=2,
+                                           replacement=tools.selWorst, stats=stats, halloffame=hof)
+            final, logbook = islands.run(demes, ngen=9)
+            self.assertEqual([len(deme) for deme in final], [30] * 4)
+            self.assertEqual(len(logbook), 4 * 10)
+            self.assertEqual(logbook.select("gen")[:5], [0, 0, 0, 0, 1])
+            self.assertEqual(logbook.select("deme")[:5], [0, 1, 2, 3, 0])
+            self.assertEqual(len(hof), 2)
+            self.assertEqual(hof[0].fitness.values[0], max(logbook.select("max")))
+
+    def test_deme_errors(self):
+        random.seed(42)
+        demes = [self.toolbox.population(n=10) for _ in range(2)]
+        self.toolbox.register("evaluate", _evalFailing)
+        islands = parallel.IslandModel(self.toolbox, 0.5, 0.2)
+        self.assertRaises(ValueError, islands.run, demes, ngen=2)
+
+        self.toolbox.register("evaluate", _evalDying)
+        islands = parallel.IslandModel(self.toolbox, 0.5, 0.2)
+        self.assertRaises(RuntimeError, islands.run, demes, ngen=2, poll=0.1)
+
+
+class MigRingTest(unittest.TestCase):
+    def test_duplicates(self):
+        # Equal individuals are replaced by identity, not by first occurrence
+        a, b = [0], [0]
+        populations = [[a, b], [[1], [2]]]
+        tools.migRing(populations, 1, lambda pop, k: pop[-k:])
+        self.assertIs(populations[0][0], a)
+        self.assertEqual(populations[0][1], [2])
+        self.assertIs(populations[1][1], b)
+
+
+def _evalKillOnce(individual, path):
+    # The first worker evaluating a negative individual dies
+    if individual[0] < 0 and not os.path.exists(path):
+        open(path, "w").close()
+        os._exit(1)
+    return float(sum(individual)),
+
+
+class BrokerTest(unittest.TestCase):
+    def setUp(self):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+    def tearDown(self):
+        del creator.FitnessMax
+        del creator.Individual
+
+    def test_map(self):
+        pop = [creator.Individual([i] * 200) for i in range(100)]
+        with parallel.Broker(batch_size=8) as broker:
+            broker.start_local_workers(2)
+            self.assertEqual(broker(_evalOneMax, pop), [_evalOneMax(ind) for ind in pop])
+            self.assertEqual(broker(_evalOneMax, pop[:3]), [_evalOneMax(ind) for ind in pop[:3]])
+            self.assertEqual(broker([].__len__, []), [])
+            self.assertRaises(TypeError, broker, _evalOneMax, [creator.Individual([None])])
+            self.assertEqual(broker(_evalOneMax, pop[:3]), [_evalOneMax(ind) for ind in pop[:3]])
+
+    def test_worker_loss(self):
+        pop = [creator.Individual([1.0] * 5) for _ in range(20)]
+        pop[7][0] = -1.0
+        with tempfile.TemporaryDirectory() as directory:
+            evaluate = functools.partial(_evalKillOnce, path=os.path.join(directory, "killed"))
+            with parallel.Broker(batch_size=2) as broker:
+                broker.start_local_workers(2)
+                self.assertEqual(broker(evaluate, pop),
+                                 [(sum(ind),) for ind in pop])
+                self.assertEqual(len(broker.workers), 1)
+                self.assertTrue(os.path.exists(os.path.join(directory, "killed")))
+
+    def test_no_worker(self):
+        pop = [creator.Individual([1.0] * 5) for _ in range(4)]
+        with parallel.Broker(timeout=0.2) as broker:
+            self.assertRaises(RuntimeError, broker, _evalOneMax, pop)
+
+
+def _mutate(individual):
+    return tools.mutGaussian(individual, 0.0, 1.0, 0.5)[0]
+
+
+class ThreadMapTest(unittest.TestCase):
+    def test_deterministic(self):
+        pop = [[0.0] * 10 for _ in range(50)]
+        results = []
+        for threads in (1, 4):
+            with parallel.ThreadMap(threads=threads, seed=7) as tmap:
+                results.append(tmap(_mutate, [list(ind) for ind in pop]))
+                results.append(tmap(_mutate, [list(ind) for ind in pop]))
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(results[1], results[3])
+        self.assertNotEqual(results[0], results[1])
+        self.assertEqual(pop, [[0.0] * 10 for _ in range(50)])
+
+    def test_iterables(self):
+        with parallel.ThreadMap(threads=2) as tmap:
+            self.assertEqual(tmap(pow, [1, 2, 3], [2, 2, 2]), [1, 4, 9])
@@ -157,6 +157,22 @@ class Pickling(unittest.TestCase):
 
         self.assertEqual(logbook, logbook_r, "Unpickled logbook != pickled logbook")
 
+    def test_pickle_old_halloffame(self):
+        ind = creator.IndList([1, 2, 3])
+        ind.fitness.values = (6.0,)
+        hof = tools.HallOfFame(2)
+        hof.update([ind])
+        # A hall of fame pickled before the hash keys were introduced
+        del hof.hash_key, hof.hashes
+        hof_r = pickle.loads(pickle.dumps(hof))
+
+        other = creator.IndList([4, 5, 6])
+        other.fitness.values = (15.0,)
+        hof_r.update([other])
+        hof_r.remove(0)
+        hof_r.clear()
+        self.assertEqual(len(hof_r), 0)
+
     @unittest.skipIf(sys.version_info < (2, 7), "Skipping test because Python version < 2.7 does not pickle partials.")
     def test_pickle_partial(self):
         func_s = pickle.dumps(self.toolbox.func)
@@ -0,0 +1,123 @@
+import multiprocessing
+import random
+import threading
+import unittest
+
+import numpy
+
+from deap import algorithms
+from deap import base
+from deap import cma
+from deap import rng
+from deap import tools
+
+
+class RegistryTest(unittest.TestCase):
+    def test_default(self):
+        self.assertIs(rng.get_rng(), random)
+
+    def test_using_rng(self):
+        generator = random.Random(1)
+        with rng.using_rng(generator):
+            self.assertIs(rng.get_rng(), generator)
+            with rng.using_rng(random.Random(2)):
+                self.assertIsNot(rng.get_rng(), generator)
+            self.assertIs(rng.get_rng(), generator)
+        self.assertIs(rng.get_rng(), random)
+
+    def test_thread_local(self):
+        seen = []
+        with rng.using_rng(random.Random(1)):
+            thread = threading.Thread(target=lambda: seen.append(rng.get_rng()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [random])
+
+    def test_operators(self):
+        toolbox = base.Toolbox()
+        toolbox.register("mate", tools.cxTwoPoint)
+        toolbox.register("mutate", tools.mutShuffleIndexes, indpb=0.2)
+
+        def vary():
+            population = [list(range(20)) for _ in range(10)]
+            population = tools.selTournament([_Ind(ind) for ind in population], 10, tournsize=3)
+            return algorithms.varAnd(population, toolbox, 0.5, 0.5)
+
+        with rng.using_rng(random.Random(42)):
+            first = vary()
+        state = random.getstate()
+        with rng.using_rng(random.Random(42)):
+            second = vary()
+        self.assertEqual(first, second)
+        # The global generator is untouched
+        self.assertEqual(state, random.getstate())
+
+
+def _noisy(individual):
+    noise = rng.get_rng().gauss(0, 1) + rng.get_numpy_rng().standard_normal()
+    return sum(individual) + noise,
+
+
+class StreamsTest(unittest.TestCase):
+    def test_philox_random(self):
+        a, b = rng.PhiloxRandom(5), rng.PhiloxRandom(5)
+        self.assertEqual([a.random() for _ in range(300)], [b.random() for _ in range(300)])
+        self.assertEqual(a.randint(0, 10**30), b.randint(0, 10**30))
+        self.assertEqual(a.sample(range(100), 10), b.sample(range(100), 10))
+        state = a.getstate()
+        values = [a.gauss(0, 1) for _ in range(5)]
+        a.setstate(state)
+        self.assertEqual(values, [a.gauss(0, 1) for _ in range(5)])
+        self.assertTrue(all(0 <= a.random() < 1 for _ in range(1000)))
+        self.assertNotEqual(rng.PhiloxRandom(6).random(), rng.PhiloxRandom(5).random())
+
+    def test_streams(self):
+        streams = rng.RandomStreams(42)
+        self.assertEqual(streams.key(1, 2), rng.RandomStreams(42).key(1, 2))
+        self.assertNotEqual(streams.key(1, 2), streams.key(2, 1))
+        self.assertNotEqual(streams.key(1, 2), rng.RandomStreams(43).key(1, 2))
+        with streams.using(1, 2):
+            first = rng.get_rng().random(), rng.get_numpy_rng().standard_normal()
+        with streams.using(1, 2):
+            second = rng.get_rng().random(), rng.get_numpy_rng().standard_normal()
+        self.assertEqual(first, second)
+        self.assertIs(rng.get_numpy_rng(), numpy.random)
+
+    def test_large_seeds(self):
+        for seed in (2**63, -2**63 - 1, 2**200):
+            self.assertEqual(rng.RandomStreams(seed).key(1, 2),
+                             rng.RandomStreams(seed % 2**64).key(1, 2))
+            self.assertEqual(rng.PhiloxRandom(seed).random(),
+                             rng.PhiloxRandom(seed % 2**128).random())
+        self.assertEqual(rng.RandomStreams(-1).key(3), rng.RandomStreams(2**64 - 1).key(3))
+
+    def test_cma(self):
+        def generate():
+            strategy = cma.Strategy(centroid=[0.0] * 5, sigma=1.0)
+            with rng.RandomStreams(1).using(0):
+                return strategy.generate(list)
+        self.assertEqual(generate(), generate())
+
+    def test_seeded_map(self):
+        population = [[float(i)] * 3 for i in range(40)]
+        results = [rng.SeededMap(seed=3)(_noisy, population)]
+        for processes in (1, 3):
+            pool = multiprocessing.Pool(processes)
+            try:
+                smap = rng.SeededMap(pool.map, seed=3)
+                results.append(smap(_noisy, population))
+                self.assertNotEqual(smap(_noisy, population), results[-1])
+            finally:
+                pool.terminate()
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+
+class _Fitness(base.Fitness):
+    weights = (1.0,)
+
+
+class _Ind(list):
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self.fitness = _Fitness((float(self[0]),))
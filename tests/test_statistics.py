@@ -1,8 +1,10 @@
-from operator import itemgetter
+from operator import attrgetter, itemgetter
 import unittest
 
 import numpy
 
+from deap import base
+from deap import creator
 from deap import tools
 
 
@@ -25,3 +27,63 @@ class LogbookTest(unittest.TestCase):
         mstats.register("max", numpy.max, axis=0)
         res = mstats.compile([[0.0, 1.0, 1.0, 5.0], [2.0, 5.0]])
         self.assertDictEqual(res, {'length': {'mean': 3.0, 'max': 4}, 'item': {'mean': 1.0, 'max': 2.0}})
+
+    def test_statistics_compile_reductions(self):
+        data = [[1.0, 2.0], [3.0, 5.0], [4.0, 9.0], [8.0, 1.0]]
+        s = tools.Statistics()
+        s.register("mean", numpy.mean, axis=0)
+        s.register("std", numpy.std, axis=0)
+        s.register("var", numpy.var, axis=0, ddof=1)
+        s.register("quartiles", numpy.quantile, q=[0.25, 0.75], axis=0)
+        s.register("median", numpy.percentile, q=50, axis=0)
+        s.register("max", max)
+        res = s.compile(data)
+
+        self.assertEqual(list(res), ["mean", "std", "var", "quartiles", "median", "max"])
+        numpy.testing.assert_allclose(res["mean"], numpy.mean(data, axis=0))
+        numpy.testing.assert_allclose(res["std"], numpy.std(data, axis=0))
+        numpy.testing.assert_allclose(res["var"], numpy.var(data, axis=0, ddof=1))
+        numpy.testing.assert_allclose(res["quartiles"], numpy.quantile(data, [0.25, 0.75], axis=0))
+        numpy.testing.assert_allclose(res["median"], numpy.percentile(data, 50, axis=0))
+        self.assertEqual(res["max"], [8.0, 1.0])
+
+    def test_statistics_unhashable_function(self):
+        class Range(object):
+            __hash__ = None
+
+            def __eq__(self, other):
+                return isinstance(other, Range)
+
+            def __call__(self, values):
+                return max(values) - min(values)
+
+        s = tools.Statistics()
+        s.register("range", Range())
+        s.register("mean", numpy.mean)
+        res = s.compile([1.0, 2.0, 6.0])
+        self.assertEqual(res["range"], 5.0)
+        self.assertEqual(res["mean"], 3.0)
+        self.assertEqual(numpy.ndim(res["mean"]), 0)
+
+    def test_multi_statistics_shared_key(self):
+        creator.create("FitnessMin", base.Fitness, weights=(-1.0, 1.0))
+        creator.create("Individual", list, fitness=creator.FitnessMin)
+        population = [creator.Individual([i]) for i in range(10)]
+        for ind in population:
+            ind.fitness.values = (ind[0] * 2.0, ind[0] - 3.0)
+
+        fit_stats = tools.Statistics(key=attrgetter("fitness.values"))
+        fit_stats.register("mean", numpy.mean, axis=0)
+        fit_stats.register("max", numpy.max, axis=0)
+        other_stats = tools.Statistics(key=attrgetter("fitness.values"))
+        other_stats.register("min", numpy.min, axis=0)
+        mstats = tools.MultiStatistics(fitness=fit_stats, other=other_stats)
+        res = mstats.compile(population)
+
+        values = [ind.fitness.values for ind in population]
+        numpy.testing.assert_array_equal(res["fitness"]["mean"], numpy.mean(values, axis=0))
+        numpy.testing.assert_array_equal(res["fitness"]["max"], numpy.max(values, axis=0))
+        numpy.testing.assert_array_equal(res["other"]["min"], numpy.min(values, axis=0))
+
+        del creator.FitnessMin
+        del creator.Individual